@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пакетного парсинга: get_products по одному против get_products_batch
+(OZON_CRAWLER_BATCH_SIZE - фоновый краулер забирает пакет fetch() из одной вкладки)
+
+Поднимает фейковый Ozon (scripts/fake_ozon_server.py) и на одном headless драйвере
+парсит одни и те же --queries запросов --rounds раз каждым способом.
+Отчет: время пакета, время на запрос, ошибки и запросы, дошедшие до фейкового Ozon.
+
+Запуск:
+    python scripts/batch_fetch_benchmark.py --queries 8 --rounds 5 --latency-ms 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Tuple
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from infrastructure.parsers.batch_fetch import BatchQuery  # noqa: E402
+from infrastructure.parsers.browser_config import BrowserConfig  # noqa: E402
+from infrastructure.parsers.ozon_parser import OzonParser  # noqa: E402
+from utils.deadline import Deadline  # noqa: E402
+from utils.rate_limiter import parsing_rate_limiter  # noqa: E402
+
+MODES = ("sequential", "batch")
+
+
+def upstream_requests(port: int) -> int:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stats") as response:
+        return json.load(response)["requests"]
+
+
+async def run_round(parser: OzonParser, mode: str, queries: List[BatchQuery], timeout: float) -> int:
+    """Один проход по всем запросам; возвращает число ошибок"""
+    if mode == "batch":
+        results = await parser.get_products_batch(queries, Deadline(timeout))
+        return sum(not result.ok or not result.products for result in results)
+    errors = 0
+    for query in queries:
+        try:
+            products = await parser.get_products(query.query, query.category_slug, deadline=Deadline(timeout))
+            errors += not products
+        except Exception:
+            errors += 1
+    return errors
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> Tuple[List[float], int, int]:
+    """Серия проходов одним способом; первый запрос прогревает браузер"""
+    parser = OzonParser(BrowserConfig(headless=True, base_url=f"http://127.0.0.1:{args.fake_port}"))
+    queries = [BatchQuery(f"{args.query} {index}", args.category) for index in range(args.queries)]
+    durations: List[float] = []
+    errors = 0
+    try:
+        await parser.get_products("warmup", args.category)
+        requests_before = upstream_requests(args.fake_port)
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            errors += await run_round(parser, mode, queries, args.timeout)
+            durations.append(time.perf_counter() - started)
+        requests = upstream_requests(args.fake_port) - requests_before
+    finally:
+        await parser.close(force=True)
+    print(f"   {mode}: {args.rounds * args.queries - errors} ok, {errors} ошибок")
+    return durations, errors, requests
+
+
+def report(mode: str, durations: List[float], errors: int, requests: int, queries: int) -> None:
+    if not durations:
+        print(f"{mode:<11} нет проходов")
+        return
+    values = np.array(durations) * 1000
+    print(
+        f"{mode:<11} пакет mean {values.mean():7.1f} ms   p95 {np.percentile(values, 95):7.1f} ms   "
+        f"на запрос {values.mean() / queries:6.1f} ms   ошибок {errors}   запросов к Ozon {requests}"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетного парсинга против поштучного")
+    parser.add_argument("--queries", type=int, default=8, help="Запросов в пакете")
+    parser.add_argument("--rounds", type=int, default=5, help="Проходов на способ")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Задержка фейкового Ozon")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="Бюджет одного прохода, сек")
+    parser.add_argument("--fake-port", type=int, default=8803)
+    parser.add_argument("--query", default="rtx 5070")
+    parser.add_argument("--category", default="videokarty-15721")
+    parser.add_argument("--modes", default=",".join(MODES), help="Способы через запятую")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    # Бенчмарк меряет навигации, а не паузы rate limiter между запросами
+    parsing_rate_limiter.min_delay_seconds = 0.0
+    parsing_rate_limiter.current_delay = 0.0
+
+    fake = subprocess.Popen([
+        sys.executable, os.path.join(SCRIPTS_DIR, "fake_ozon_server.py"),
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+    ])
+    try:
+        await asyncio.sleep(1.0)
+        results = {}
+        for mode in args.modes.split(","):
+            print(f"🧪 Способ {mode}...")
+            results[mode] = await run_mode(mode, args)
+        print()
+        for mode, (durations, errors, requests) in results.items():
+            report(mode, durations, errors, requests, args.queries)
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк холодного старта парсера Ozon: headed (Xvfb) против headless
+
+Для каждого режима измеряет:
+- время от запуска процесса до первого успешного парсинга
+- RSS дерева процессов (python + chromedriver + chrome [+ Xvfb]) в установившемся режиме
+
+Запуск:
+    python scripts/cold_start_benchmark.py --query "rtx 5070" --category videokarty-15721
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+XVFB_DISPLAY = ":99"
+
+
+def tree_rss_mb(pid: int) -> float:
+    """Суммарный RSS процесса и всех его потомков в МБ"""
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return 0.0
+
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+async def run_worker(args: argparse.Namespace) -> None:
+    """Рабочий процесс: первый парсинг, затем установившийся режим"""
+    sys.path.insert(0, SRC_DIR)
+    from infrastructure.parsers.ozon_parser import OzonParser
+
+    parser = OzonParser()
+    result: Dict[str, Optional[float]] = {"first_success_at": None, "steady_rss_mb": None}
+    try:
+        products = await parser.get_products(args.query, args.category)
+        if not products:
+            raise RuntimeError("Первый парсинг вернул 0 товаров")
+        result["first_success_at"] = time.time()
+
+        for _ in range(args.steady_requests):
+            await parser.get_products(args.query, args.category)
+        result["steady_rss_mb"] = tree_rss_mb(os.getpid())
+    finally:
+        await parser.close(force=True)
+
+    # Последняя строка stdout - результат для родительского процесса
+    print(json.dumps(result))
+
+
+def start_xvfb() -> subprocess.Popen:
+    """Запускает Xvfb и ждет появления сокета дисплея"""
+    if not shutil.which("Xvfb"):
+        raise RuntimeError("Xvfb не найден, headed режим недоступен")
+
+    process = subprocess.Popen(
+        ["Xvfb", XVFB_DISPLAY, "-screen", "0", "1920x1080x24", "-ac", "-noreset"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    socket_path = f"/tmp/.X11-unix/X{XVFB_DISPLAY.lstrip(':')}"
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if os.path.exists(socket_path):
+            return process
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Xvfb не запустился")
+
+
+def run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Optional[float]]:
+    """Запускает рабочий процесс в заданном режиме и собирает метрики"""
+    env = dict(os.environ)
+    env["OZON_HEADLESS"] = "true" if mode == "headless" else "false"
+    # Холодный старт: без постоянного профиля, иначе Chrome стартует с прогретым кэшем
+    env.pop("OZON_PROFILE_DIR", None)
+
+    started_at = time.time()
+    xvfb = None
+    if mode == "headed":
+        xvfb = start_xvfb()
+        env["DISPLAY"] = XVFB_DISPLAY
+    else:
+        env.pop("DISPLAY", None)
+
+    try:
+        completed = subprocess.run(
+            [
+                sys.executable, os.path.abspath(__file__), "--worker",
+                "--query", args.query,
+                "--category", args.category,
+                "--steady-requests", str(args.steady_requests),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=args.timeout,
+        )
+        xvfb_rss = tree_rss_mb(xvfb.pid) if xvfb else 0.0
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+
+    if completed.returncode != 0:
+        print(completed.stdout[-2000:])
+        print(completed.stderr[-2000:], file=sys.stderr)
+        raise RuntimeError(f"Рабочий процесс ({mode}) завершился с кодом {completed.returncode}")
+
+    worker_result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "cold_start_s": worker_result["first_success_at"] - started_at,
+        "steady_rss_mb": worker_result["steady_rss_mb"] + xvfb_rss,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", default="rtx 5070")
+    parser.add_argument("--category", default="videokarty-15721")
+    parser.add_argument("--modes", default="headed,headless", help="Список режимов через запятую")
+    parser.add_argument("--steady-requests", type=int, default=5, help="Запросов до замера RSS")
+    parser.add_argument("--timeout", type=int, default=300, help="Таймаут одного прогона, сек")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(run_worker(args))
+        return
+
+    results: List[tuple] = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        print(f"⏱️ Прогон в режиме {mode}...")
+        metrics = run_mode(mode, args)
+        results.append((mode, metrics))
+
+    print()
+    print(f"{'режим':<10} {'холодный старт, с':>18} {'RSS, МБ':>10}")
+    for mode, metrics in results:
+        print(f"{mode:<10} {metrics['cold_start_s']:>18.2f} {metrics['steady_rss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
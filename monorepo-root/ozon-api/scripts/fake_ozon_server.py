@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Фейковый Ozon для нагрузочных тестов без сети
+
+Отвечает на /api/entrypoint-api.bx/page/json/v2 в формате entrypoint-api:
+widgetStates с виджетом tileGridDesktop. Товары синтетические (детерминированные
+по запросу) или из записанного ответа (--payload). Задержка и доля блокировок
+настраиваются.
+
+Запуск:
+    python scripts/fake_ozon_server.py --port 8800 --latency-ms 300 --block-rate 0.05
+    OZON_BASE_URL=http://127.0.0.1:8800 python src/main.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+API_PATH = "/api/entrypoint-api.bx/page/json/v2"
+
+BLOCK_PAGE = """<!DOCTYPE html>
+<html><head><title>Доступ ограничен</title></head>
+<body><h1>Доступ ограничен</h1><p>Мы заметили подозрительную активность. Подтвердите, что вы не робот.</p></body></html>
+"""
+
+
+def synthetic_items(query: str, count: int, price_drift: float) -> List[Dict[str, Any]]:
+    """Товары в формате tileGridDesktop.items; набор SKU и базовые цены стабильны для запроса"""
+    seed = int(hashlib.md5(query.encode("utf-8")).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    drift = random.Random()
+    items = []
+    for index in range(count):
+        sku = 100000000 + (seed % 1000000) * 100 + index
+        base_price = rng.randint(5000, 250000)
+        price = int(base_price * (1 + drift.uniform(-price_drift, price_drift)))
+        items.append({
+            "sku": sku,
+            "action": {"link": f"/product/{sku}/"},
+            "mainState": [
+                {"type": "textAtom", "id": "name", "textAtom": {"text": f"{query} товар {index + 1}"}},
+                {
+                    "type": "priceV2",
+                    "priceV2": {
+                        "price": [
+                            {"text": f"{price:,}".replace(",", " ") + " ₽", "textStyle": "PRICE"},
+                            {"text": f"{int(price * 1.15):,}".replace(",", " ") + " ₽", "textStyle": "ORIGINAL_PRICE"},
+                        ],
+                        "discount": "−13%",
+                    },
+                },
+            ],
+            "tileImage": {"items": [{"type": "image", "image": {"link": f"https://ir.ozone.ru/fake/{sku}.jpg"}}]},
+        })
+    return items
+
+
+def extract_query(request: web.Request) -> str:
+    """Поисковый запрос: парсер не кодирует & внутри url=, поэтому text виден на верхнем уровне"""
+    text = request.query.get("text", "")
+    if not text:
+        inner = request.query.get("url", "")
+        inner_query = inner.split("?", 1)[1] if "?" in inner else ""
+        text = urllib.parse.parse_qs(inner_query).get("text", [""])[0]
+    return text.replace("+", " ") or "товар"
+
+
+def build_app(args: argparse.Namespace) -> web.Application:
+    recorded: Optional[Dict[str, Any]] = None
+    if args.payload:
+        with open(args.payload, "r", encoding="utf-8") as f:
+            recorded = json.load(f)
+
+    stats = {"requests": 0, "blocked": 0}
+
+    async def entrypoint(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        delay = max(0.0, random.gauss(args.latency_ms, args.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        if random.random() < args.block_rate:
+            stats["blocked"] += 1
+            return web.Response(text=BLOCK_PAGE, status=403, content_type="text/html")
+
+        if recorded is not None:
+            return web.json_response(recorded)
+
+        query = extract_query(request)
+        widget = {"items": synthetic_items(query, args.items, args.price_drift)}
+        return web.json_response({"widgetStates": {"tileGridDesktop-3823485-default-1": json.dumps(widget)}})
+
+    async def stats_handler(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_get(API_PATH, entrypoint)
+    app.router.add_get("/_stats", stats_handler)
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Фейковый Ozon entrypoint-api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Средняя задержка ответа")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="Стандартное отклонение задержки")
+    parser.add_argument("--block-rate", type=float, default=0.0, help="Доля ответов со страницей блокировки")
+    parser.add_argument("--items", type=int, default=36, help="Товаров в синтетической выдаче")
+    parser.add_argument("--price-drift", type=float, default=0.02, help="Случайное изменение цен между ответами")
+    parser.add_argument("--payload", help="Записанный JSON ответ entrypoint-api вместо синтетики")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"🧪 Фейковый Ozon на http://{args.host}:{args.port}{API_PATH}")
+    web.run_app(build_app(args), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
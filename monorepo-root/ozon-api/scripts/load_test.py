@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест GetRawProducts против фейкового Ozon
+
+С --spawn поднимает на одной машине без сети:
+- фейковый Ozon (scripts/fake_ozon_server.py) с заданной задержкой и долей блокировок
+- сервис (src/main.py) с OZON_BASE_URL на фейковый Ozon и headless Chrome
+и на каждом уровне конкурентности гоняет GetRawProducts заданное время.
+Отчет: пропускная способность, p50/p95/p99 задержки и коды ответов.
+
+Запуск:
+    python scripts/load_test.py --spawn --concurrency 1,2,4,8 --duration 30
+    python scripts/load_test.py --target 127.0.0.1:3002 --token "$OZON_API_TOKEN"
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import grpc
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import raw_product_pb2  # noqa: E402
+import raw_product_pb2_grpc  # noqa: E402
+
+LOAD_TEST_TOKEN = "load-test-token"
+
+
+async def run_level(
+    stub: raw_product_pb2_grpc.RawProductServiceStub,
+    args: argparse.Namespace,
+    concurrency: int,
+) -> Tuple[List[float], Counter, float]:
+    """Один уровень конкурентности: задержки успешных ответов, коды, длительность"""
+    latencies: List[float] = []
+    codes: Counter = Counter()
+    stop_at = time.monotonic() + args.duration
+    counter = 0
+
+    async def worker() -> None:
+        nonlocal counter
+        while time.monotonic() < stop_at:
+            counter += 1
+            request = raw_product_pb2.GetRawProductsRequest(
+                query=f"{args.query} {counter % args.distinct_queries}",
+                category=args.category,
+                auth_token=args.token,
+            )
+            started = time.perf_counter()
+            try:
+                response = await stub.GetRawProducts(request, timeout=args.deadline)
+                codes["OK" if response.total_count else "OK_EMPTY"] += 1
+                latencies.append(time.perf_counter() - started)
+            except grpc.aio.AioRpcError as e:
+                codes[e.code().name] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, codes, time.monotonic() - started
+
+
+def format_level(concurrency: int, latencies: List[float], codes: Counter, elapsed: float) -> str:
+    throughput = len(latencies) / elapsed if elapsed > 0 else 0.0
+    if latencies:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        percentiles = f"{p50:8.0f} {p95:8.0f} {p99:8.0f}"
+    else:
+        percentiles = f"{'-':>8} {'-':>8} {'-':>8}"
+    code_summary = ", ".join(f"{code}={count}" for code, count in sorted(codes.items()))
+    return f"{concurrency:>11} {throughput:8.2f} {percentiles}   {code_summary}"
+
+
+def spawn_environment(args: argparse.Namespace) -> List[subprocess.Popen]:
+    """Фейковый Ozon и сервис, настроенный на него"""
+    fake = subprocess.Popen([
+        sys.executable, os.path.join(SCRIPTS_DIR, "fake_ozon_server.py"),
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--block-rate", str(args.block_rate),
+    ] + (["--payload", args.payload] if args.payload else []))
+
+    env = dict(os.environ)
+    env.update({
+        "OZON_BASE_URL": f"http://127.0.0.1:{args.fake_port}",
+        "OZON_HEADLESS": "true",
+        "OZON_API_TOKEN": args.token,
+    })
+    env.pop("OZON_PROFILE_DIR", None)
+    service = subprocess.Popen(
+        [sys.executable, os.path.join(SRC_DIR, "main.py")],
+        env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    return [service, fake]
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    processes: List[subprocess.Popen] = []
+    if args.spawn:
+        processes = spawn_environment(args)
+    try:
+        async with grpc.aio.insecure_channel(args.target) as channel:
+            try:
+                await asyncio.wait_for(channel.channel_ready(), timeout=args.startup_timeout)
+            except asyncio.TimeoutError:
+                print(f"❌ gRPC сервер {args.target} не поднялся за {args.startup_timeout}с")
+                return 1
+            stub = raw_product_pb2_grpc.RawProductServiceStub(channel)
+
+            # Прогрев: первый запрос запускает браузер
+            warmup = raw_product_pb2.GetRawProductsRequest(
+                query=f"{args.query} warmup", category=args.category, auth_token=args.token
+            )
+            try:
+                await stub.GetRawProducts(warmup, timeout=args.startup_timeout)
+            except grpc.aio.AioRpcError as e:
+                print(f"⚠️ Прогрев завершился с {e.code().name}: {e.details()}")
+
+            print(f"{'concurrency':>11} {'ok/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}   codes")
+            for concurrency in args.concurrency:
+                print(format_level(concurrency, *await run_level(stub, args, concurrency)))
+        return 0
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест GetRawProducts")
+    parser.add_argument("--target", default="127.0.0.1:3002", help="Адрес gRPC сервера")
+    parser.add_argument("--token", default=os.getenv("OZON_API_TOKEN") or LOAD_TEST_TOKEN)
+    parser.add_argument("--concurrency", default="1,2,4,8",
+                        type=lambda value: [int(level) for level in value.split(",")])
+    parser.add_argument("--duration", type=float, default=30.0, help="Секунд на уровень конкурентности")
+    parser.add_argument("--deadline", type=float, default=60.0, help="gRPC дедлайн запроса, сек")
+    parser.add_argument("--query", default="rtx 5070")
+    parser.add_argument("--distinct-queries", type=int, default=50,
+                        help="Разных запросов в ротации (обходит кэши и задержку на запрос)")
+    parser.add_argument("--category", default="videokarty-15721")
+    parser.add_argument("--spawn", action="store_true", help="Поднять фейковый Ozon и сервис")
+    parser.add_argument("--fake-port", type=int, default=8800)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--block-rate", type=float, default=0.0)
+    parser.add_argument("--payload", help="Записанный ответ entrypoint-api для фейкового Ozon")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--verbose", action="store_true", help="Показывать вывод сервиса")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_async(parse_args())))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк ожидания загрузки страницы: опрос DOM (poll) против событий DevTools (cdp)
+
+Поднимает фейковый Ozon (scripts/fake_ozon_server.py) и для каждого режима
+OZON_PAGE_WAIT делает серию get_products на одном headless драйвере.
+Отчет: среднее, p50/p95 времени парсинга и число ошибок.
+
+Запуск:
+    python scripts/page_wait_benchmark.py --requests 30 --latency-ms 300
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from infrastructure.parsers.browser_config import BrowserConfig  # noqa: E402
+from infrastructure.parsers.ozon_parser import OzonParser  # noqa: E402
+from utils.rate_limiter import parsing_rate_limiter  # noqa: E402
+
+MODES = ("poll", "cdp")
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> List[float]:
+    """Серия парсингов в одном режиме ожидания; первый запрос прогревает браузер"""
+    config = BrowserConfig(
+        headless=True,
+        base_url=f"http://127.0.0.1:{args.fake_port}",
+        page_wait=mode,
+    )
+    parser = OzonParser(config)
+    latencies: List[float] = []
+    errors = 0
+    try:
+        await parser.get_products("warmup", args.category)
+        for index in range(args.requests):
+            started = time.perf_counter()
+            try:
+                products = await parser.get_products(f"{args.query} {index}", args.category)
+                if products:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+            except Exception:
+                errors += 1
+    finally:
+        await parser.close(force=True)
+    print(f"   {mode}: {len(latencies)} ok, {errors} ошибок")
+    return latencies
+
+
+def report(mode: str, latencies: List[float]) -> None:
+    if not latencies:
+        print(f"{mode:<6} нет успешных запросов")
+        return
+    values = np.array(latencies) * 1000
+    print(
+        f"{mode:<6} mean {values.mean():7.1f} ms   p50 {np.percentile(values, 50):7.1f} ms   "
+        f"p95 {np.percentile(values, 95):7.1f} ms"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк OZON_PAGE_WAIT: poll против cdp")
+    parser.add_argument("--requests", type=int, default=30, help="Запросов на режим")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Задержка фейкового Ozon")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--fake-port", type=int, default=8801)
+    parser.add_argument("--query", default="rtx 5070")
+    parser.add_argument("--category", default="videokarty-15721")
+    parser.add_argument("--modes", default=",".join(MODES), help="Режимы через запятую")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    # Бенчмарк меряет ожидание страницы, а не паузы rate limiter между запросами
+    parsing_rate_limiter.min_delay_seconds = 0.0
+    parsing_rate_limiter.current_delay = 0.0
+
+    fake = subprocess.Popen([
+        sys.executable, os.path.join(SCRIPTS_DIR, "fake_ozon_server.py"),
+        "--port", str(args.fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+    ])
+    try:
+        await asyncio.sleep(1.0)
+        results = {}
+        for mode in args.modes.split(","):
+            print(f"🧪 Режим {mode}...")
+            results[mode] = await run_mode(mode, args)
+        print()
+        for mode, latencies in results.items():
+            report(mode, latencies)
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
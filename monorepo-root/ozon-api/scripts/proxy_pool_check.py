@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Проверка пула прокси на локальных подставных прокси
+
+Поднимает фейковый Ozon (scripts/fake_ozon_server.py) и несколько HTTP прокси в этом
+процессе; первые --blocked из них отвечают страницей блокировки. Пул драйверов с
+OZON_PROXIES на эти прокси выполняет серию парсингов. Падает (код 1), если:
+- трафик к фейковому Ozon шел мимо прокси
+- заблокированный прокси не ушел в cool-down или за ним остался слот
+- слот менял прокси без причины (ротаций больше, чем блокировок)
+- здоровый прокси остался без трафика или парсинги не прошли
+
+Запуск:
+    python scripts/proxy_pool_check.py --slots 2 --proxies 3 --blocked 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import List, Optional
+
+import aiohttp
+from aiohttp import web
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(SCRIPTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from fake_ozon_server import BLOCK_PAGE  # noqa: E402
+
+
+class StandInProxy:
+    """Подставной HTTP прокси: пересылает запросы в absolute-form или отвечает блокировкой"""
+
+    def __init__(self, port: int, blocking: bool) -> None:
+        self.port = port
+        self.blocking = blocking
+        self.requests = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._runner: Optional[web.ServerRunner] = None
+
+    async def _handle(self, request: web.BaseRequest) -> web.Response:
+        self.requests += 1
+        if self.blocking:
+            return web.Response(text=BLOCK_PAGE, status=403, content_type="text/html")
+        async with self._session.get(str(request.url)) as upstream:
+            body = await upstream.read()
+            return web.Response(body=body, status=upstream.status, content_type=upstream.content_type)
+
+    async def start(self) -> None:
+        self._session = aiohttp.ClientSession()
+        self._runner = web.ServerRunner(web.Server(self._handle))
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+        if self._session is not None:
+            await self._session.close()
+
+
+async def run_requests(args: argparse.Namespace) -> int:
+    """Серия парсингов на пуле драйверов; возвращает число успешных"""
+    # Импорт после настройки окружения: пул прокси читает OZON_PROXIES при импорте
+    from infrastructure.parsers.driver_pool import DriverPool
+    from utils.deadline import Deadline
+    from utils.rate_limiter import parsing_rate_limiter
+    from utils.retry_policy import BLOCKED, BackoffPolicy, retry_policy
+
+    # Проверка меряет маршрут трафика, а не паузы между запросами и повторами
+    parsing_rate_limiter.min_delay_seconds = 0.0
+    parsing_rate_limiter.current_delay = 0.0
+    retry_policy.policies = {
+        **retry_policy.policies,
+        BLOCKED: BackoffPolicy(max_attempts=3, base_delay=0.2, max_delay=0.5),
+    }
+
+    pool = DriverPool(args.slots)
+    succeeded = 0
+
+    async def one(index: int) -> None:
+        nonlocal succeeded
+        parser = await pool.acquire()
+        try:
+            products = await pool.run(
+                parser, f"{args.query} {index}", args.category, None, None, Deadline(60), threading.Event()
+            )
+            succeeded += bool(products)
+        except Exception as e:
+            print(f"   запрос {index}: {type(e).__name__}: {e}")
+
+    try:
+        await asyncio.gather(*(one(index) for index in range(args.requests)))
+    finally:
+        await pool.close(force=True)
+    return succeeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Проверка OZON_PROXIES на подставных прокси")
+    parser.add_argument("--slots", type=int, default=2, help="Слотов пула драйверов")
+    parser.add_argument("--proxies", type=int, default=3, help="Подставных прокси")
+    parser.add_argument("--blocked", type=int, default=1, help="Сколько из них отвечают блокировкой")
+    parser.add_argument("--requests", type=int, default=12)
+    parser.add_argument("--fake-port", type=int, default=8802)
+    parser.add_argument("--proxy-port", type=int, default=8810, help="Порт первого прокси")
+    parser.add_argument("--query", default="rtx 5070")
+    parser.add_argument("--category", default="videokarty-15721")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    ports = [args.proxy_port + index for index in range(args.proxies)]
+    os.environ.update(
+        OZON_PROXIES=",".join(f"http://127.0.0.1:{port}" for port in ports),
+        OZON_BASE_URL=f"http://127.0.0.1:{args.fake_port}",
+        OZON_HEADLESS="true",
+        # Cool-down дольше проверки: заблокированный прокси не должен вернуться в работу
+        OZON_PROXY_BLOCK_COOLDOWN="600",
+    )
+
+    fake = subprocess.Popen([
+        sys.executable, os.path.join(SCRIPTS_DIR, "fake_ozon_server.py"),
+        "--port", str(args.fake_port), "--latency-ms", "50", "--jitter-ms", "10",
+    ])
+    proxies: List[StandInProxy] = [
+        StandInProxy(port, blocking=index < args.blocked) for index, port in enumerate(ports)
+    ]
+    try:
+        for proxy in proxies:
+            await proxy.start()
+        await asyncio.sleep(1.0)
+
+        succeeded = await run_requests(args)
+
+        from utils.proxy_pool import proxy_pool
+        stats = proxy_pool.get_statistics()
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{args.fake_port}/_stats") as response:
+                upstream_requests = (await response.json())["requests"]
+    finally:
+        for proxy in proxies:
+            await proxy.close()
+        fake.terminate()
+        fake.wait()
+
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    print(f"✅ Успешных парсингов: {succeeded}/{args.requests}")
+
+    failures = []
+    forwarded = sum(proxy.requests for proxy in proxies if not proxy.blocking)
+    if upstream_requests != forwarded:
+        failures.append(f"мимо прокси: Ozon получил {upstream_requests} запросов, прокси переслали {forwarded}")
+    blocks = 0
+    healthy = len(proxies) - args.blocked
+    for proxy, state in zip(proxies, stats["proxies"]):
+        if proxy.blocking:
+            blocks += state["blocks"]
+            if proxy.requests and (state["cooldown_seconds"] <= 0 or state["slots"]):
+                failures.append(f"{state['server']} заблокирован, но не выведен из работы")
+        elif healthy <= args.slots and not proxy.requests:
+            # Здоровых прокси не больше слотов - каждому должен достаться слот
+            failures.append(f"{state['server']} здоров, но не получил трафика")
+    if stats["rotations"] > blocks:
+        failures.append(f"ротаций {stats['rotations']} больше, чем блокировок {blocks}")
+    if succeeded < args.requests:
+        failures.append(f"успешных парсингов {succeeded} из {args.requests}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Трафик шел через прокси, заблокированные выведены в cool-down")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
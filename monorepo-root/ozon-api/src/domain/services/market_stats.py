@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Рыночная статистика цен (min, max, mean, median, IQR) на NumPy
+"""
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from domain.entities.product import Product
+
+# Множитель IQR для границ выбросов (классическое правило Тьюки)
+DEFAULT_IQR_MULTIPLIER = float(os.getenv("OZON_OUTLIER_IQR_MULTIPLIER", "1.5"))
+
+# Меньше товаров - квартили бессмысленны, фильтр не применяем
+MIN_PRODUCTS_FOR_FILTER = 4
+
+
+@dataclass
+class MarketStats:
+    """Статистика цен по результату запроса"""
+    min: int
+    max: int
+    mean: float
+    median: float
+    iqr: Tuple[int, int]    # Первый и третий квартили
+    total_count: int
+    product_id: str         # Самый дешевый товар
+
+
+def price_column(products: List[Product]) -> np.ndarray:
+    """Цены товаров одним столбцом float64"""
+    # Столбец собирается здесь, а не при парсинге: товары приходят и из кэша выдачи,
+    # кэша payload и пула процессов, где столбец пришлось бы хранить рядом со списком.
+    # fromiter с count - один проход без промежуточного списка
+    return np.fromiter((product.price for product in products), dtype=np.float64, count=len(products))
+
+
+def outlier_mask(prices: np.ndarray, multiplier: float = DEFAULT_IQR_MULTIPLIER) -> np.ndarray:
+    """Маска товаров внутри [Q1 - k*IQR, Q3 + k*IQR]"""
+    if prices.size < MIN_PRODUCTS_FOR_FILTER:
+        return np.ones(prices.size, dtype=bool)
+    q1, q3 = np.percentile(prices, [25, 75])
+    spread = multiplier * (q3 - q1)
+    return (prices >= q1 - spread) & (prices <= q3 + spread)
+
+
+def compute_market_stats(
+    products: List[Product],
+    filter_outliers: bool = False,
+    multiplier: float = DEFAULT_IQR_MULTIPLIER,
+) -> Tuple[List[Product], Optional[MarketStats]]:
+    """
+    Считает статистику цен; при filter_outliers отбрасывает аксессуары и
+    ошибочные объявления по правилу IQR. Возвращает (оставшиеся товары, статистика)
+    """
+    if not products:
+        return products, None
+
+    prices = price_column(products)
+    if filter_outliers:
+        mask = outlier_mask(prices, multiplier)
+        if not mask.all():
+            products = [product for product, keep in zip(products, mask) if keep]
+            prices = prices[mask]
+
+    q1, median, q3 = np.percentile(prices, [25, 50, 75])
+    cheapest = int(np.argmin(prices))
+    stats = MarketStats(
+        min=int(prices[cheapest]),
+        max=int(prices.max()),
+        mean=float(prices.mean()),
+        median=float(median),
+        iqr=(int(round(q1)), int(round(q3))),
+        total_count=int(prices.size),
+        product_id=products[cheapest].id,
+    )
+    return products, stats
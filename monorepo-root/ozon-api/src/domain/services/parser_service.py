@@ -9,7 +9,12 @@ class ParserService(ABC):
 
     @abstractmethod
     async def parse_products(
-        self, query: str, category_slug: str, platform_id: Optional[str] = None, exactmodels: Optional[str] = None
+        self,
+        query: str,
+        category_slug: str,
+        platform_id: Optional[str] = None,
+        exactmodels: Optional[str] = None,
+        deadline: Optional[Any] = None,
     ) -> List[Product]:
         """Парсить продукты с сайта"""
         pass
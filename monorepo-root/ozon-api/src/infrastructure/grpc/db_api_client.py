@@ -0,0 +1,46 @@
+import os
+from typing import List, Optional
+
+import grpc
+
+import raw_product_pb2
+import raw_product_pb2_grpc
+
+
+class DbApiClient:
+    """gRPC клиент db-api для конфигурации категорий и запросов"""
+
+    def __init__(self, address: Optional[str] = None, timeout_seconds: float = 10.0) -> None:
+        self.address = address or os.getenv("DB_API_URL", "marketvision-database-api:50051")
+        self.timeout_seconds = timeout_seconds
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._stub: Optional[raw_product_pb2_grpc.RawProductServiceStub] = None
+
+    def _get_stub(self) -> raw_product_pb2_grpc.RawProductServiceStub:
+        if self._stub is None:
+            # Внутренняя Docker сеть - insecure подключение, как у остальных сервисов
+            self._channel = grpc.aio.insecure_channel(self.address)
+            self._stub = raw_product_pb2_grpc.RawProductServiceStub(self._channel)
+        return self._stub
+
+    async def get_category_config(self, category_key: str) -> Optional[raw_product_pb2.Category]:
+        """Конфигурация категории (ozon_id - слаг категории Ozon)"""
+        response = await self._get_stub().GetCategoryConfig(
+            raw_product_pb2.GetCategoryConfigRequest(categoryKey=category_key),
+            timeout=self.timeout_seconds,
+        )
+        return response.category if response.HasField("category") else None
+
+    async def get_queries_for_category(self, category_key: str) -> List[raw_product_pb2.QueryConfig]:
+        """Список запросов категории"""
+        response = await self._get_stub().GetQueriesForCategory(
+            raw_product_pb2.GetQueriesForCategoryRequest(categoryKey=category_key),
+            timeout=self.timeout_seconds,
+        )
+        return list(response.queries)
+
+    async def close(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+            self._stub = None
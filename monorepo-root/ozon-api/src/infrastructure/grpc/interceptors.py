@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Цепочка grpc.aio интерцепторов: DDoS защита, аутентификация и валидация запроса
+до запуска обработчика. Отказ - context.abort, без сборки пустого ответа.
+Применяется ко всем RPC сервиса, включая streaming
+"""
+import hmac
+import time
+from abc import abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+import grpc
+from google.protobuf.descriptor import FieldDescriptor
+
+from utils.ddos_protection import ddos_protection
+from utils.logger import ozon_logger
+
+# Ограничение длины строковых полей запроса
+MAX_REQUEST_LENGTH = 100
+# Токены длиннее пользовательских полей и лимитом не ограничиваются
+LENGTH_EXEMPT_FIELDS = frozenset({"auth_token", "version_token"})
+# Обязательные поля по полному имени метода
+REQUIRED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "/raw_product.RawProductService/GetRawProducts": ("query", "category"),
+}
+# Названия полей в сообщениях об ошибках
+FIELD_LABELS = {
+    "query": "Query",
+    "category": "Category",
+    "platform_id": "Platform ID",
+    "exactmodels": "Exact models",
+}
+
+
+def peer_ip(context: grpc.aio.ServicerContext) -> str:
+    """IP клиента из peer ("ipv4:1.2.3.4:5678", "ipv6:[::1]:5678")"""
+    _, _, address = (context.peer() or "").partition(":")
+    host = address.rsplit(":", 1)[0] if ":" in address else address
+    return host.strip("[]") or "unknown"
+
+
+class InterceptorTimings:
+    """Время и отказы каждого интерцептора"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._rejected: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._max_seconds: Dict[str, float] = defaultdict(float)
+
+    def record(self, name: str, seconds: float, rejected: bool) -> None:
+        self._calls[name] += 1
+        self._seconds[name] += seconds
+        self._max_seconds[name] = max(self._max_seconds[name], seconds)
+        if rejected:
+            self._rejected[name] += 1
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику интерцепторов"""
+        return {
+            name: {
+                "calls": calls,
+                "rejected": self._rejected[name],
+                "avg_us": round(self._seconds[name] / calls * 1e6, 1),
+                "max_us": round(self._max_seconds[name] * 1e6, 1),
+            }
+            for name, calls in self._calls.items()
+        }
+
+
+# Глобальный экземпляр статистики интерцепторов
+interceptor_timings = InterceptorTimings()
+
+
+class CheckInterceptor(grpc.aio.ServerInterceptor):
+    """
+    Базовый интерцептор: оборачивает обработчик метода и выполняет check перед ним.
+    Для RPC с потоком запросов check получает request=None (проверяется только metadata)
+    """
+
+    name = "check"
+
+    @abstractmethod
+    async def check(self, request: Optional[Any], context: grpc.aio.ServicerContext, method: str) -> None:
+        """Отклоняет запрос через context.abort; возврат - запрос пропущен дальше"""
+
+    async def _timed_check(self, request: Optional[Any], context: grpc.aio.ServicerContext, method: str) -> None:
+        started = time.perf_counter()
+        try:
+            await self.check(request, context, method)
+        except BaseException:
+            interceptor_timings.record(self.name, time.perf_counter() - started, rejected=True)
+            raise
+        interceptor_timings.record(self.name, time.perf_counter() - started, rejected=False)
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method
+        check = self._timed_check
+
+        if handler.unary_unary:
+            async def unary_unary(request, context):
+                await check(request, context, method)
+                return await handler.unary_unary(request, context)
+
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary, handler.request_deserializer, handler.response_serializer
+            )
+
+        if handler.unary_stream:
+            async def unary_stream(request, context):
+                await check(request, context, method)
+                result = handler.unary_stream(request, context)
+                if hasattr(result, "__aiter__"):
+                    async for response in result:
+                        yield response
+                else:
+                    await result
+
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream, handler.request_deserializer, handler.response_serializer
+            )
+
+        if handler.stream_unary:
+            async def stream_unary(request_iterator, context):
+                await check(None, context, method)
+                return await handler.stream_unary(request_iterator, context)
+
+            return grpc.stream_unary_rpc_method_handler(
+                stream_unary, handler.request_deserializer, handler.response_serializer
+            )
+
+        async def stream_stream(request_iterator, context):
+            await check(None, context, method)
+            result = handler.stream_stream(request_iterator, context)
+            if hasattr(result, "__aiter__"):
+                async for response in result:
+                    yield response
+            else:
+                await result
+
+        return grpc.stream_stream_rpc_method_handler(
+            stream_stream, handler.request_deserializer, handler.response_serializer
+        )
+
+
+class DdosInterceptor(CheckInterceptor):
+    """DDoS защита: черный список, rate/burst лимиты, подозрительные паттерны"""
+
+    name = "ddos"
+
+    async def check(self, request, context, method):
+        request_data = {
+            field: getattr(request, field, "")
+            for field in ("query", "category", "platform_id", "exactmodels")
+        } if request is not None else {}
+        allowed, reason, _ = ddos_protection.is_request_allowed(peer_ip(context), request_data)
+        if not allowed:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"DDoS protection: {reason}")
+
+
+class AuthInterceptor(CheckInterceptor):
+    """
+    Проверка токена: поле auth_token запроса или metadata "authorization: Bearer ...".
+    Токен читается один раз при старте и сравнивается за постоянное время
+    """
+
+    name = "auth"
+
+    def __init__(self, token: Optional[str]) -> None:
+        self._token = token.encode() if token else None
+
+    @staticmethod
+    def _request_token(request, context) -> str:
+        token = getattr(request, "auth_token", "") if request is not None else ""
+        if token:
+            return token
+        for key, value in context.invocation_metadata() or ():
+            if key == "authorization" and value.startswith("Bearer "):
+                return value[7:]
+        return ""
+
+    async def check(self, request, context, method):
+        ip = peer_ip(context)
+        if self._token is None:
+            ozon_logger.logger.error("OZON_API_TOKEN environment variable is not set")
+            await context.abort(grpc.StatusCode.INTERNAL, "Server configuration error: OZON_API_TOKEN not set")
+        token = self._request_token(request, context).encode()
+        if not token or not hmac.compare_digest(token, self._token):
+            ozon_logger.log_auth_failed(ip)
+            ddos_protection.record_failed_auth(ip)
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid or missing authentication token")
+        ozon_logger.log_auth_success(ip)
+
+
+class ValidationInterceptor(CheckInterceptor):
+    """Обязательные поля и лимит длины строковых полей за один проход по дескриптору"""
+
+    name = "validation"
+
+    async def check(self, request, context, method):
+        if request is None:
+            return
+        for field_name in REQUIRED_FIELDS.get(method, ()):
+            if not getattr(request, field_name, "").strip():
+                label = FIELD_LABELS.get(field_name, field_name)
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"{label} cannot be empty")
+        for field in request.DESCRIPTOR.fields:
+            if (
+                field.type != FieldDescriptor.TYPE_STRING
+                or field.label == FieldDescriptor.LABEL_REPEATED
+                or field.name in LENGTH_EXEMPT_FIELDS
+            ):
+                continue
+            length = len(getattr(request, field.name).strip())
+            if length > MAX_REQUEST_LENGTH:
+                ozon_logger.log_request_rejected(field.name, length, MAX_REQUEST_LENGTH, peer_ip(context))
+                label = FIELD_LABELS.get(field.name, field.name)
+                await context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    f"{label} too long. Maximum length is {MAX_REQUEST_LENGTH} characters",
+                )
+
+
+def build_interceptors(token: Optional[str]) -> Tuple[grpc.aio.ServerInterceptor, ...]:
+    """Цепочка в порядке выполнения: дешевые отказы по IP раньше проверки токена"""
+    return (DdosInterceptor(), AuthInterceptor(token), ValidationInterceptor())
@@ -1,64 +1,112 @@
 import asyncio
 import os
-import time
-from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 import grpc
 
 import raw_product_pb2
 import raw_product_pb2_grpc
+from domain.services.market_stats import MarketStats, compute_market_stats
+from infrastructure.grpc.db_api_client import DbApiClient
+from infrastructure.grpc.interceptors import build_interceptors, interceptor_timings, peer_ip
+from infrastructure.parsers.parse_pool import parse_pool
+from infrastructure.services.background_crawler import BackgroundCrawler, CrawlerConfig
+from infrastructure.services.delta_tracker import DeltaTracker
 from infrastructure.services.ozon_parser_service import OzonParserService
+from infrastructure.services.result_cache import ResultCache, ResultCacheConfig, make_cache_key
 from utils.logger import ozon_logger
-from utils.ddos_protection import ddos_protection
-
-# Константы для валидации
-MAX_REQUEST_LENGTH = 100
-
-
-class RateLimiter:
-    """Простой rate limiter для защиты от спама"""
-    
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
-    
-    def is_allowed(self, client_id: str) -> bool:
-        """Проверяет, разрешен ли запрос от клиента"""
-        now = time.time()
-        
-        # Удаляем старые запросы
-        self.requests[client_id] = [
-            req_time for req_time in self.requests[client_id] 
-            if now - req_time < self.window_seconds
-        ]
-        
-        # Проверяем лимит
-        if len(self.requests[client_id]) >= self.max_requests:
-            return False
-        
-        # Добавляем текущий запрос
-        self.requests[client_id].append(now)
-        return True
-    
-    def get_remaining_requests(self, client_id: str) -> int:
-        """Возвращает количество оставшихся запросов"""
-        now = time.time()
-        self.requests[client_id] = [
-            req_time for req_time in self.requests[client_id] 
-            if now - req_time < self.window_seconds
-        ]
-        return max(0, self.max_requests - len(self.requests[client_id]))
+from utils.priority_scheduler import BACKGROUND, INTERACTIVE
+from utils.adaptive_concurrency import adaptive_limit
+from utils.admission_control import AdmissionRejected, admission_controller
+from utils.circuit_breaker import CircuitOpenError
+from utils.client_quota import QuotaExceeded, client_quotas, current_request_cost
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.outbound_budget import outbound_budget
+from utils.proxy_pool import proxy_pool
+from utils.retry_policy import retry_policy
+
+# Допустимые классы приоритета (поле priority или metadata x-priority)
+PRIORITY_CLASSES = (INTERACTIVE, BACKGROUND)
+
+# Фоновый краулер (создается в serve(), если включен)
+background_crawler: Optional[BackgroundCrawler] = None
+# Сервис, запущенный в serve() (для статистики)
+raw_product_service: Optional["OzonRawProductService"] = None
+# Единственный экземпляр дельта-трекера на процесс
+delta_tracker = DeltaTracker.from_env()
+
+
+def get_runtime_statistics() -> Dict[str, Any]:
+    """Статистика фоновой работы для HTTP /stats"""
+    stats: Dict[str, Any] = {
+        "outbound_budget": outbound_budget.get_statistics(),
+        "delta": delta_tracker.get_statistics(),
+        "retries": retry_policy.get_statistics(),
+        "parse_pool": parse_pool.get_statistics(),
+        "interceptors": interceptor_timings.get_statistics(),
+        "client_quotas": client_quotas.get_statistics(),
+        "adaptive_concurrency": adaptive_limit.get_statistics(),
+        "proxies": proxy_pool.get_statistics(),
+    }
+    if raw_product_service is not None:
+        parser_service = raw_product_service.parser_service
+        stats["drivers"] = parser_service.pool.get_statistics()
+        stats["hedging"] = parser_service.hedging.get_statistics()
+    if background_crawler is not None:
+        stats["crawler"] = background_crawler.get_statistics()
+        stats["result_cache"] = background_crawler.cache.get_statistics()
+    return stats
 
 
 class OzonRawProductService(raw_product_pb2_grpc.RawProductServiceServicer):
     """gRPC сервис для Ozon API с типизацией и обработкой ошибок"""
 
-    def __init__(self) -> None:
+    def __init__(self, result_cache: Optional[ResultCache] = None) -> None:
         self.parser_service = OzonParserService()
-        # Используем продвинутую DDoS защиту вместо простого rate limiter
+        # Кэш результатов включается вместе с фоновым краулером
+        self.result_cache = result_cache
+        self.delta_tracker = delta_tracker
+
+    @staticmethod
+    def _resolve_priority(request, context: grpc.ServicerContext) -> str:
+        """Приоритет из поля priority, затем из metadata x-priority; по умолчанию interactive"""
+        priority = getattr(request, "priority", "")
+        if not priority:
+            for key, value in context.invocation_metadata() or ():
+                if key == "x-priority":
+                    priority = value
+                    break
+        return (priority or INTERACTIVE).strip().lower()
+
+    @staticmethod
+    def _resolve_client_id(context: grpc.ServicerContext, client_ip: str) -> str:
+        """Клиент для квот из metadata x-client-id; без него - IP клиента"""
+        for key, value in context.invocation_metadata() or ():
+            if key == "x-client-id" and value.strip():
+                return value.strip()
+        return client_ip
+
+    def _market_stats_to_grpc(
+        self, stats: Optional[MarketStats], query: str, category: str
+    ) -> Optional[raw_product_pb2.MarketStats]:
+        """Конвертация статистики цен в gRPC сообщение"""
+        if stats is None:
+            return None
+        return raw_product_pb2.MarketStats(
+            query=query,
+            category=category,
+            source="ozon",
+            min=stats.min,
+            max=stats.max,
+            mean=stats.mean,
+            median=stats.median,
+            iqr=list(stats.iqr),
+            total_count=stats.total_count,
+            product_id=stats.product_id,
+            created_at=datetime.now().isoformat(),
+        )
 
     async def GetRawProducts(
         self,
@@ -78,128 +126,62 @@ class OzonRawProductService(raw_product_pb2_grpc.RawProductServiceServicer):
         Raises:
             grpc.RpcError: При ошибках парсинга или валидации
         """
-        # Получаем IP клиента для DDoS защиты
-        client_ip = context.peer().split(':')[0] if context.peer() else 'unknown'
-        
-        # Подготавливаем данные запроса для анализа
-        request_data = {
-            'query': getattr(request, 'query', ''),
-            'category': getattr(request, 'category', ''),
-            'platform_id': getattr(request, 'platform_id', ''),
-            'exactmodels': getattr(request, 'exactmodels', ''),
-            'auth_token': getattr(request, 'auth_token', '')
-        }
-        
-        # Проверяем DDoS защиту
-        allowed, reason, details = ddos_protection.is_request_allowed(client_ip, request_data)
-        if not allowed:
-            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
-            context.set_details(f"DDoS protection: {reason}")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-        
+        # Бюджет времени клиента передается до парсера
+        deadline = Deadline.from_grpc_context(context)
+
+        # DDoS защита, токен и длины полей уже проверены интерцепторами
+        client_ip = peer_ip(context)
         query = request.query
         category = request.category
-        
-        # Проверка аутентификации
-        auth_token = getattr(request, "auth_token", "")
-        expected_token = os.getenv("OZON_API_TOKEN")
-        
         ozon_logger.log_grpc_request("GetRawProducts", {"query": query, "category": category}, client_ip)
-        
-        if not expected_token:
-            ozon_logger.logger.error("OZON_API_TOKEN environment variable is not set")
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details("Server configuration error: OZON_API_TOKEN not set")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-        
-        if not auth_token or auth_token != expected_token:
-            ozon_logger.log_auth_failed(client_ip)
-            ddos_protection.record_failed_auth(client_ip)
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details("Invalid or missing authentication token")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-        
-        ozon_logger.log_auth_success(client_ip)
-        platform_id: Optional[str] = getattr(request, "platform_id", None)
-        if not platform_id:
-            platform_id = None
-        exactmodels: Optional[str] = getattr(request, "exactmodels", None)
-        if not exactmodels:
-            exactmodels = None
-
-        # Валидация размера platform_id
-        if platform_id and len(platform_id.strip()) > MAX_REQUEST_LENGTH:
-            ozon_logger.log_request_rejected("platform_id", len(platform_id.strip()), MAX_REQUEST_LENGTH, client_ip)
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details(f"Platform ID too long. Maximum length is {MAX_REQUEST_LENGTH} characters")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-
-        # Валидация размера exactmodels
-        if exactmodels and len(exactmodels.strip()) > MAX_REQUEST_LENGTH:
-            ozon_logger.log_request_rejected("exactmodels", len(exactmodels.strip()), MAX_REQUEST_LENGTH, client_ip)
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details(f"Exact models too long. Maximum length is {MAX_REQUEST_LENGTH} characters")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-
-        # Валидация входных данных
-        if not query or not query.strip():
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details("Query cannot be empty")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-
-        # Валидация размера запроса
-        if len(query.strip()) > MAX_REQUEST_LENGTH:
-            ozon_logger.log_request_rejected("query", len(query.strip()), MAX_REQUEST_LENGTH, client_ip)
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details(f"Query too long. Maximum length is {MAX_REQUEST_LENGTH} characters")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
+        platform_id: Optional[str] = request.platform_id or None
+        exactmodels: Optional[str] = request.exactmodels or None
 
-        if not category or not category.strip():
+        # Класс приоритета: поле запроса или metadata x-priority
+        priority = self._resolve_priority(request, context)
+        if priority not in PRIORITY_CLASSES:
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details("Category cannot be empty")
-            return raw_product_pb2.GetRawProductsResponse(
-                products=[], total_count=0, source="ozon"
-            )
-
-        # Валидация размера категории
-        if len(category.strip()) > MAX_REQUEST_LENGTH:
-            ozon_logger.log_request_rejected("category", len(category.strip()), MAX_REQUEST_LENGTH, client_ip)
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details(f"Category too long. Maximum length is {MAX_REQUEST_LENGTH} characters")
+            context.set_details(f"Unknown priority '{priority}'. Allowed: {', '.join(PRIORITY_CLASSES)}")
             return raw_product_pb2.GetRawProductsResponse(
                 products=[], total_count=0, source="ozon"
             )
 
         ozon_logger.log_parsing_start(query, category, client_ip)
+        ozon_logger.logger.info(f"Приоритет: {priority}")
         if platform_id:
             ozon_logger.logger.info(f"Платформа: {platform_id}")
 
+        # Стоимость парсинга (браузеро-секунды + исходящие запросы) списывается с квоты клиента
+        cost = None
         try:
-            # Проверяем доступность парсера
-            if not await self.parser_service.is_available():
-                context.set_code(grpc.StatusCode.UNAVAILABLE)
-                context.set_details("Parser service is currently unavailable")
-                return raw_product_pb2.GetRawProductsResponse(
-                    products=[], total_count=0, source="ozon"
-                )
+            # Свежий результат фонового краулера отдаем без браузера
+            cache_key = make_cache_key(query, category, platform_id, exactmodels)
+            products = self.result_cache.get_fresh(cache_key) if self.result_cache else None
+            if products is not None:
+                ozon_logger.logger.info(f"Ответ из кэша: {query} ({len(products)} товаров)")
+            else:
+                # Проверяем доступность парсера
+                if not await self.parser_service.is_available():
+                    context.set_code(grpc.StatusCode.UNAVAILABLE)
+                    context.set_details("Parser service is currently unavailable")
+                    return raw_product_pb2.GetRawProductsResponse(
+                        products=[], total_count=0, source="ozon"
+                    )
 
-            products = await self.parser_service.parse_products(
-                query, category, platform_id, exactmodels
-            )
+                if client_quotas.enabled:
+                    cost = client_quotas.begin(self._resolve_client_id(context, client_ip))
+                    current_request_cost.set(cost)
+
+                # Ограниченная очередь перед браузером: отклоняем сразу, если дедлайн не успеть
+                async with admission_controller.admit(deadline.remaining(), priority):
+                    products = await self.parser_service.parse_products(
+                        query, category, platform_id, exactmodels, deadline
+                    )
+                if self.result_cache is not None and products:
+                    self.result_cache.put(cache_key, products)
+
+            # Статистика цен и фильтр выбросов до сериализации
+            products, stats = compute_market_stats(products, request.filter_outliers)
             grpc_products = []
 
             for product in products:
@@ -219,11 +201,57 @@ class OzonRawProductService(raw_product_pb2_grpc.RawProductServiceServicer):
                     print(f"⚠️ Ошибка конвертации товара {product.id}: {e}")
                     continue
 
+            # Клиент с токеном прошлой версии получает только изменения
+            delta = self.delta_tracker.diff(
+                cache_key + (request.filter_outliers,), grpc_products, request.version_token
+            )
+
             ozon_logger.log_parsing_success(query, len(grpc_products), 0, client_ip)  # duration будет добавлен позже
             return raw_product_pb2.GetRawProductsResponse(
-                products=grpc_products, total_count=len(grpc_products), source="ozon"
+                products=delta.products,
+                total_count=len(grpc_products),
+                source="ozon",
+                market_stats=self._market_stats_to_grpc(stats, query, category),
+                version_token=delta.version_token,
+                is_delta=delta.is_delta,
+                removed_ids=delta.removed_ids,
             )
 
+        except QuotaExceeded as e:
+            retry_after_ms = int(e.retry_after_seconds * 1000)
+            context.set_trailing_metadata(
+                (("retry-after-ms", str(retry_after_ms)),) + client_quotas.metadata(e.quota)
+            )
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(f"Quota exceeded for client '{e.client_id}'. Retry after {retry_after_ms}ms")
+            return raw_product_pb2.GetRawProductsResponse(
+                products=[], total_count=0, source="ozon"
+            )
+        except AdmissionRejected as e:
+            retry_after_ms = int(e.retry_after_seconds * 1000)
+            context.set_trailing_metadata((("retry-after-ms", str(retry_after_ms)),))
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(f"Overloaded: {e.reason}. Retry after {retry_after_ms}ms")
+            return raw_product_pb2.GetRawProductsResponse(
+                products=[], total_count=0, source="ozon"
+            )
+        except DeadlineExceeded as e:
+            ozon_logger.logger.info(f"Парсинг прерван на этапе {e.stage}: {e}")
+            context.set_code(
+                grpc.StatusCode.CANCELLED if e.cancelled else grpc.StatusCode.DEADLINE_EXCEEDED
+            )
+            context.set_details(str(e))
+            return raw_product_pb2.GetRawProductsResponse(
+                products=[], total_count=0, source="ozon"
+            )
+        except CircuitOpenError as e:
+            retry_after_ms = int(e.retry_after_seconds * 1000)
+            context.set_trailing_metadata((("retry-after-ms", str(retry_after_ms)),))
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details(f"Parser service is currently unavailable. Retry after {retry_after_ms}ms")
+            return raw_product_pb2.GetRawProductsResponse(
+                products=[], total_count=0, source="ozon"
+            )
         except grpc.RpcError:
             # Переброс gRPC ошибок как есть
             raise
@@ -240,15 +268,32 @@ class OzonRawProductService(raw_product_pb2_grpc.RawProductServiceServicer):
             return raw_product_pb2.GetRawProductsResponse(
                 products=[], total_count=0, source="ozon"
             )
+        finally:
+            # Состояние квоты - в любом ответе, рядом с retry-after-ms других отказов
+            if cost is not None:
+                context.set_trailing_metadata(
+                    tuple(context.trailing_metadata() or ()) + client_quotas.metadata(cost.quota, cost.units)
+                )
 
 
 async def serve() -> None:
     """Запуск gRPC сервера с правильной обработкой жизненного цикла"""
-    server = grpc.aio.server(ThreadPoolExecutor(max_workers=10))
-    ozon_service = OzonRawProductService()
+    # Жесткий лимит RPC на уровне сервера; очередь парсинга ограничивает admission control
+    # Токен читается один раз: интерцепторы отклоняют запросы до обработчика
+    server = grpc.aio.server(
+        ThreadPoolExecutor(max_workers=10),
+        interceptors=build_interceptors(os.getenv("OZON_API_TOKEN")),
+        maximum_concurrent_rpcs=admission_controller.config.max_concurrent_rpcs,
+    )
+    global background_crawler, raw_product_service
+    crawler_config = CrawlerConfig.from_env()
+    result_cache = ResultCache(ResultCacheConfig.from_env()) if crawler_config.enabled else None
+    ozon_service = OzonRawProductService(result_cache)
+    raw_product_service = ozon_service
     raw_product_pb2_grpc.add_RawProductServiceServicer_to_server(
         ozon_service, server
     )
+    warm_up_task: Optional[asyncio.Future] = None
     listen_addr = "[::]:3002"
     server.add_insecure_port(listen_addr)
 
@@ -258,11 +303,22 @@ async def serve() -> None:
 
     try:
         await server.start()
+        # /ready станет зеленым после прогрева драйвера и пробного запроса
+        warm_up_task = asyncio.ensure_future(ozon_service.parser_service.warm_up())
+        if crawler_config.enabled:
+            background_crawler = BackgroundCrawler(
+                ozon_service.parser_service, result_cache, DbApiClient(), crawler_config
+            )
+            await background_crawler.start()
         await server.wait_for_termination()
     except KeyboardInterrupt:
         print("🛑 Получен сигнал прерывания, завершаем сервер...")
     finally:
         print("🔄 Graceful shutdown...")
+        if warm_up_task is not None:
+            warm_up_task.cancel()
+        if background_crawler is not None:
+            await background_crawler.stop()
         # Принудительно закрываем браузер при завершении сервиса
         try:
             await ozon_service.parser_service.close(force=True)
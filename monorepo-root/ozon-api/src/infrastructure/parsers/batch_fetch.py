@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Пакетная загрузка entrypoint-api из вкладки: fetch() внутри страницы на origin Ozon
+с ограниченной конкурентностью, все ответы одним round trip WebDriver
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from domain.entities.product import Product
+from infrastructure.parsers.page_classifier import PageSnapshot, classify_snapshot
+
+# Таймаут одного fetch внутри страницы
+BATCH_FETCH_TIMEOUT_SECONDS = 30
+
+# arguments: urls, concurrency, timeoutMs, callback (execute_async_script)
+BATCH_FETCH_SCRIPT = """
+const [urls, concurrency, timeoutMs, done] = arguments;
+const results = new Array(urls.length);
+let next = 0;
+async function worker() {
+    while (next < urls.length) {
+        const index = next++;
+        const controller = new AbortController();
+        const timer = setTimeout(() => controller.abort(), timeoutMs);
+        try {
+            const response = await fetch(urls[index], {
+                credentials: "include",
+                headers: {"Accept": "application/json"},
+                signal: controller.signal,
+            });
+            results[index] = {
+                status: response.status,
+                contentType: response.headers.get("content-type") || "",
+                url: response.url,
+                body: await response.text(),
+            };
+        } catch (error) {
+            results[index] = {status: 0, contentType: "", url: urls[index], body: "", error: String(error)};
+        } finally {
+            clearTimeout(timer);
+        }
+    }
+}
+const workers = [];
+for (let i = 0; i < Math.min(concurrency, urls.length); i++) {
+    workers.push(worker());
+}
+Promise.all(workers).then(() => done(results));
+"""
+
+
+@dataclass
+class BatchQuery:
+    """Один запрос пакета"""
+    query: str
+    category_slug: str
+    platform_id: Optional[str] = None
+    exactmodels: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    """Результат запроса пакета: товары или ошибка (остальные запросы пакета не страдают)"""
+    query: BatchQuery
+    products: List[Product] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def classify_response(response: Dict[str, Any]) -> str:
+    """Тип ответа fetch тем же классификатором, что и загруженной страницы"""
+    body = response.get("body") or ""
+    return classify_snapshot(PageSnapshot(
+        ready_state="complete",
+        content_type=response.get("contentType", ""),
+        url=response.get("url", ""),
+        title="",
+        has_pre=False,
+        text=body[:2000],
+        text_length=len(body),
+    ))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Конфигурация браузера для парсера Ozon
+"""
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.env import env_bool
+
+
+@dataclass
+class BrowserConfig:
+    """Конфигурация Chrome для парсера"""
+    # Headless режим не требует X сервера (Xvfb/fluxbox)
+    headless: bool = False
+    window_size: str = "1920,1080"
+
+    # Персистентный профиль (user-data-dir): пусто - временный профиль на каждый запуск
+    profile_dir: Optional[str] = None
+    profile_max_size_mb: int = 300
+    profile_compact_interval_seconds: int = 6 * 3600
+
+    # Адрес Ozon; для нагрузочных тестов подменяется локальным фейковым сервером
+    base_url: str = "https://www.ozon.ru"
+
+    # Ожидание загрузки: "poll" - опрос DOM, "cdp" - события DevTools (Network.loadingFinished)
+    page_wait: str = "poll"
+
+    # Сколько fetch() пакетного режима выполняется в странице одновременно
+    batch_concurrency: int = 4
+
+    # Вкладок (слотов пула) на один процесс Chrome; 1 - отдельный браузер на слот
+    tabs_per_browser: int = 1
+
+    # Потоковый разбор tileGridDesktop.items без полного дерева widgetStates
+    stream_parse: bool = False
+
+    @classmethod
+    def from_env(cls) -> "BrowserConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            headless=env_bool("OZON_HEADLESS", False),
+            window_size=os.getenv("OZON_WINDOW_SIZE", "1920,1080"),
+            profile_dir=os.getenv("OZON_PROFILE_DIR") or None,
+            profile_max_size_mb=int(os.getenv("OZON_PROFILE_MAX_MB", "300")),
+            profile_compact_interval_seconds=int(os.getenv("OZON_PROFILE_COMPACT_INTERVAL", str(6 * 3600))),
+            base_url=os.getenv("OZON_BASE_URL", "https://www.ozon.ru").rstrip("/"),
+            page_wait=os.getenv("OZON_PAGE_WAIT", "poll").lower(),
+            batch_concurrency=int(os.getenv("OZON_BATCH_CONCURRENCY", "4")),
+            tabs_per_browser=max(1, int(os.getenv("OZON_TABS_PER_BROWSER", "1"))),
+            stream_parse=env_bool("OZON_STREAM_PARSE", False),
+        )
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Ожидание загрузки документа по событиям DevTools Protocol (Network.loadingFinished)
+вместо опроса DOM через WebDriver
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+
+class CdpDocumentWaiter:
+    """
+    Отдельное DevTools подключение к вкладке драйвера.
+    Создается на одну навигацию: подключиться до driver.get, дождаться документа, закрыть
+    """
+
+    def __init__(self, debugger_address: str, window_handle: str) -> None:
+        self.debugger_address = debugger_address
+        self.window_handle = window_handle
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._frame_id: Optional[str] = None
+        self._next_id = 0
+
+    @classmethod
+    def for_driver(cls, driver) -> Optional["CdpDocumentWaiter"]:
+        """Waiter для текущей вкладки или None, если DevTools адрес неизвестен"""
+        address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+        if not address:
+            return None
+        return cls(address, driver.current_window_handle)
+
+    async def connect(self) -> None:
+        """Подключается к вкладке и включает события Network"""
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+        async with self._session.get(f"http://{self.debugger_address}/json") as response:
+            targets = await response.json(content_type=None)
+        # Дескриптор окна chromedriver - id DevTools цели (старые версии добавляют префикс CDwindow-)
+        target_id = self.window_handle.upper().removeprefix("CDWINDOW-")
+        target = next(
+            (
+                target for target in targets
+                if target.get("type") == "page" and target.get("id", "").upper() == target_id
+            ),
+            None,
+        )
+        if target is None:
+            # Чужая вкладка дала бы события другой навигации - лучше откатиться на опрос DOM
+            raise RuntimeError(f"DevTools: вкладка {self.window_handle} не найдена")
+        # id главного фрейма вкладки совпадает с id цели
+        self._frame_id = target["id"]
+        self._ws = await self._session.ws_connect(target["webSocketDebuggerUrl"], max_msg_size=0)
+        await self._send("Network.enable")
+
+    async def _send(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        self._next_id += 1
+        await self._ws.send_str(json.dumps({"id": self._next_id, "method": method, "params": params or {}}))
+
+    async def wait_document(self, timeout: float) -> Dict[str, Any]:
+        """
+        Ждет окончания загрузки основного документа навигации
+
+        Returns:
+            {"status": HTTP статус, "mime_type": ..., "failed": bool}
+
+        Raises:
+            asyncio.TimeoutError: Документ не загрузился за timeout
+        """
+        document_request: Optional[str] = None
+        result: Dict[str, Any] = {"status": None, "mime_type": None, "failed": False}
+        stop_at = time.monotonic() + timeout
+        while True:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            message = await self._ws.receive(timeout=remaining)
+            if message.type != aiohttp.WSMsgType.TEXT:
+                raise RuntimeError(f"DevTools соединение закрыто: {message.type}")
+            event = json.loads(message.data)
+            method = event.get("method")
+            params = event.get("params", {})
+
+            if (
+                method == "Network.requestWillBeSent"
+                and params.get("type") == "Document"
+                and params.get("frameId") == self._frame_id
+            ):
+                # Документы iframe не в счет; редирект переиспользует requestId -
+                # достаточно запомнить последний документ главного фрейма
+                document_request = params.get("requestId")
+            elif method == "Network.responseReceived" and params.get("requestId") == document_request:
+                response = params.get("response", {})
+                result["status"] = response.get("status")
+                result["mime_type"] = response.get("mimeType")
+            elif method == "Network.loadingFinished" and params.get("requestId") == document_request:
+                return result
+            elif method == "Network.loadingFailed" and params.get("requestId") == document_request:
+                result["failed"] = True
+                return result
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
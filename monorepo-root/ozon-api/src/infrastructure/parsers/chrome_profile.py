@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Персистентный профиль Chrome (user-data-dir) для слота драйвера
+"""
+import json
+import os
+import shutil
+import time
+from typing import List
+
+from utils.logger import ozon_logger
+
+# Кэши, которые можно удалить без потери cookies, localStorage и репутации
+CACHE_DIRS: List[str] = [
+    "Default/Cache",
+    "Default/Code Cache",
+    "Default/GPUCache",
+    "Default/DawnCache",
+    "Default/Service Worker/CacheStorage",
+    "Default/Service Worker/ScriptCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "Crashpad",
+]
+
+# Lock-файлы, которые Chrome оставляет после аварийного завершения
+LOCK_FILES: List[str] = ["SingletonLock", "SingletonSocket", "SingletonCookie"]
+
+# JSON файлы, без которых профиль считается поврежденным
+STATE_FILES: List[str] = ["Local State", "Default/Preferences"]
+
+COMPACTION_MARKER = ".last_compaction"
+
+
+class ChromeProfile:
+    """Профиль Chrome одного слота: размер, компактизация, сброс при повреждении"""
+
+    def __init__(self, base_dir: str, slot: int, max_size_mb: int, compact_interval_seconds: int) -> None:
+        # Каждый слот получает свою директорию: браузеры пула не делят профиль
+        self.path = os.path.join(os.path.abspath(base_dir), f"slot-{slot}")
+        self.slot = slot
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.compact_interval_seconds = compact_interval_seconds
+
+    def prepare(self) -> str:
+        """Готовит профиль к запуску Chrome и возвращает путь к нему"""
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, exist_ok=True)
+            self.mark_compacted()
+        self._remove_stale_locks()
+
+        if self.is_corrupted():
+            self.reset("поврежденные файлы состояния")
+        elif self.size_bytes() > self.max_size_bytes or self.is_compaction_due():
+            self.compact()
+
+        return self.path
+
+    def is_corrupted(self) -> bool:
+        """Проверяет, что файлы состояния Chrome читаются как JSON"""
+        for relative_path in STATE_FILES:
+            state_path = os.path.join(self.path, relative_path)
+            if not os.path.exists(state_path):
+                continue
+            try:
+                with open(state_path, "r", encoding="utf-8") as state_file:
+                    json.load(state_file)
+            except (OSError, ValueError):
+                return True
+        return False
+
+    def size_bytes(self) -> int:
+        """Размер профиля на диске"""
+        total = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    continue
+        return total
+
+    def is_compaction_due(self) -> bool:
+        """Прошел ли интервал с последней компактизации"""
+        marker = os.path.join(self.path, COMPACTION_MARKER)
+        try:
+            return time.time() - os.path.getmtime(marker) >= self.compact_interval_seconds
+        except OSError:
+            return True
+
+    def mark_compacted(self) -> None:
+        """Запоминает время компактизации"""
+        marker = os.path.join(self.path, COMPACTION_MARKER)
+        with open(marker, "w", encoding="utf-8") as marker_file:
+            marker_file.write(str(time.time()))
+
+    def compact(self) -> None:
+        """Удаляет кэши (только когда Chrome не запущен); сбрасывает профиль, если лимит все равно превышен"""
+        before = self.size_bytes()
+        for relative_path in CACHE_DIRS:
+            shutil.rmtree(os.path.join(self.path, relative_path), ignore_errors=True)
+        after = self.size_bytes()
+        ozon_logger.logger.info(
+            f"🧹 Профиль слота {self.slot} компактизирован: {before // 1024} KB -> {after // 1024} KB"
+        )
+
+        if after > self.max_size_bytes:
+            self.reset(f"размер {after // (1024 * 1024)} MB превышает лимит после компактизации")
+            return
+        self.mark_compacted()
+
+    def reset(self, reason: str) -> None:
+        """Полностью пересоздает профиль"""
+        ozon_logger.logger.warning(f"♻️ Сброс профиля слота {self.slot}: {reason}")
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
+        self.mark_compacted()
+
+    def _remove_stale_locks(self) -> None:
+        """Удаляет lock-файлы, оставшиеся от упавшего процесса Chrome"""
+        for name in LOCK_FILES:
+            lock_path = os.path.join(self.path, name)
+            if os.path.lexists(lock_path):
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    continue
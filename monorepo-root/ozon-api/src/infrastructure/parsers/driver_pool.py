@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Пул драйверов Chrome: каждый парсер работает в своем потоке и не блокирует event loop
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, List, Optional, TypeVar
+
+from domain.entities.product import Product
+from infrastructure.parsers.batch_fetch import BatchQuery, BatchResult
+from infrastructure.parsers.browser_config import BrowserConfig
+from infrastructure.parsers.ozon_parser import OzonParser
+from infrastructure.parsers.shared_browser import SharedBrowser
+from utils.client_quota import current_request_cost
+from utils.deadline import Deadline, DeadlineExceeded
+
+T = TypeVar("T")
+
+
+class DriverPool:
+    """Фиксированный набор парсеров (слотов драйвера) с выдачей свободного"""
+
+    def __init__(self, size: int = 1, config: Optional[BrowserConfig] = None) -> None:
+        config = config or BrowserConfig.from_env()
+        size = max(1, size)
+        tabs = config.tabs_per_browser
+        # При tabs_per_browser > 1 соседние слоты - вкладки одного Chrome
+        self.browsers: List[SharedBrowser] = (
+            [SharedBrowser(config, index) for index in range((size + tabs - 1) // tabs)] if tabs > 1 else []
+        )
+        self.parsers: List[OzonParser] = [
+            OzonParser(config, slot=slot, browser=self.browsers[slot // tabs] if self.browsers else None)
+            for slot in range(size)
+        ]
+        self._idle: Deque[OzonParser] = deque(self.parsers)
+        self._available = asyncio.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self.parsers)
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    async def acquire(self, deadline: Optional[Deadline] = None) -> OzonParser:
+        """
+        Ждет свободный парсер, но не дольше дедлайна запроса
+
+        Raises:
+            DeadlineExceeded: Драйвер не освободился до дедлайна
+        """
+        timeout = deadline.remaining() if deadline is not None else None
+        try:
+            return await asyncio.wait_for(self._wait_idle(), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("driver_pool") from None
+
+    async def _wait_idle(self) -> OzonParser:
+        async with self._available:
+            await self._available.wait_for(lambda: bool(self._idle))
+            return self._idle.popleft()
+
+    def try_acquire(self) -> Optional[OzonParser]:
+        """Свободный парсер или None, без ожидания"""
+        return self._idle.popleft() if self._idle else None
+
+    async def release(self, parser: OzonParser) -> None:
+        async with self._available:
+            self._idle.append(parser)
+            self._available.notify()
+
+    async def run(
+        self,
+        parser: OzonParser,
+        query: str,
+        category_slug: str,
+        platform_id: Optional[str],
+        exactmodels: Optional[str],
+        deadline: Deadline,
+        stop: threading.Event,
+        on_finished: Optional[Callable[[], None]] = None,
+    ) -> List[Product]:
+        """
+        Парсинг на выбранном драйвере в отдельном потоке; парсер возвращается в пул,
+        когда поток действительно закончил работу с браузером.
+        stop - сигнал прерывания: парсер остановится на ближайшей границе этапа.
+        on_finished вызывается в цикле событий, когда поток закончил работу
+        """
+        return await self._run_in_thread(
+            parser,
+            lambda thread_deadline: parser.get_products(
+                query, category_slug, platform_id, exactmodels, thread_deadline
+            ),
+            deadline,
+            stop,
+            on_finished,
+        )
+
+    async def run_batch(
+        self,
+        parser: OzonParser,
+        queries: List[BatchQuery],
+        deadline: Deadline,
+        stop: threading.Event,
+    ) -> List[BatchResult]:
+        """Пакетный парсинг (fetch() из вкладки) на выбранном драйвере, как run"""
+        return await self._run_in_thread(
+            parser, lambda thread_deadline: parser.get_products_batch(queries, thread_deadline), deadline, stop
+        )
+
+    async def _run_in_thread(
+        self,
+        parser: OzonParser,
+        make_coroutine: Callable[[Deadline], Coroutine[Any, Any, T]],
+        deadline: Deadline,
+        stop: threading.Event,
+        on_finished: Optional[Callable[[], None]] = None,
+    ) -> T:
+        # Внутри потока дедлайн не обращается к gRPC контексту, только к stop
+        remaining = deadline.remaining()
+        thread_deadline = Deadline(remaining, is_cancelled=stop.is_set)
+
+        def work() -> T:
+            return asyncio.run(make_coroutine(thread_deadline))
+
+        future = asyncio.get_running_loop().run_in_executor(None, work)
+        if on_finished is not None:
+            future.add_done_callback(lambda _: on_finished())
+        # Браузер занят до конца потока - стоимость списывается, даже если ответ уже не нужен
+        cost = current_request_cost.get()
+        if cost is not None:
+            started_at = time.monotonic()
+            outbound_before = parser.outbound_requests
+            future.add_done_callback(
+                lambda _: cost.add(time.monotonic() - started_at, parser.outbound_requests - outbound_before)
+            )
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            stop.set()
+            raise
+        finally:
+            if future.done():
+                await self.release(parser)
+            else:
+                future.add_done_callback(lambda done: self._release_abandoned(parser, done))
+
+    async def warm_up(self, query: str, category_slug: str, deadline: Deadline) -> None:
+        """Прогрев одного драйвера пробным запросом (в потоке, как и парсинг)"""
+        parser = await self.acquire()
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: asyncio.run(parser.warm_up(query, category_slug, deadline))
+            )
+        finally:
+            await self.release(parser)
+
+    def _release_abandoned(self, parser: OzonParser, future: asyncio.Future) -> None:
+        """Брошенный (проигравший или отмененный) парсинг вернул драйвер"""
+        if not future.cancelled():
+            future.exception()  # Результат никому не нужен - не логируем как необработанный
+        asyncio.ensure_future(self.release(parser))
+
+    async def close(self, force: bool = False) -> None:
+        for parser in self.parsers:
+            await parser.close(force=force)
+        if force:
+            for browser in self.browsers:
+                await browser.close()
+
+    def get_statistics(self) -> dict:
+        """Слоты пула и общие браузеры"""
+        return {
+            "pool_size": self.size,
+            "idle": self.idle,
+            "browsers": [browser.get_statistics() for browser in self.browsers],
+        }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Потоковый разбор ответа entrypoint-api без построения полного дерева JSON:
+из текста страницы декодируется только строка виджета tileGridDesktop,
+а товары из ее массива items читаются по одному
+"""
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Iterator, Optional, Tuple
+
+# Ключ виджета верхнего уровня; (?<!\\) отсекает экранированные кавычки внутри строк других виджетов
+WIDGET_KEY_PATTERN = r'(?<!\\)"({prefix}[^"\\]*)"\s*:\s*"'
+
+# Тело JSON строки до закрывающей кавычки: обычные символы и экранированные последовательности
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"\s*")
+
+
+def _skip_ws(text: str, index: int) -> int:
+    return _whitespace.match(text, index).end()
+
+
+def _expect(text: str, index: int, char: str) -> int:
+    index = _skip_ws(text, index)
+    if text[index:index + 1] != char:
+        raise json.JSONDecodeError(f"Ожидался '{char}'", text, index)
+    return index + 1
+
+
+def iter_raw_widget_spans(page_text: str, prefix: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    (id виджета, начало, конец) JSON литерала строки виджета в page_text для ключей,
+    начинающихся с prefix: page_text[начало:конец] - литерал в кавычках, без декодирования
+
+    Raises:
+        json.JSONDecodeError: Строка виджета оборвана
+    """
+    for match in re.finditer(WIDGET_KEY_PATTERN.format(prefix=re.escape(prefix)), page_text):
+        end = _STRING_BODY.match(page_text, match.end()).end()
+        if page_text[end:end + 1] != '"':
+            raise json.JSONDecodeError("Unterminated string starting at", page_text, match.end() - 1)
+        yield match.group(1), match.end() - 1, end + 1
+
+
+def iter_widget_strings(page_text: str, prefix: str) -> Iterator[Tuple[str, str]]:
+    """
+    (id виджета, декодированная строка виджета) для ключей, начинающихся с prefix.
+    Декодируется только значение найденного ключа
+
+    Raises:
+        json.JSONDecodeError: Строка виджета оборвана
+    """
+    for widget_id, start, _ in iter_raw_widget_spans(page_text, prefix):
+        value, _ = scanstring(page_text, start + 1)
+        yield widget_id, value
+
+
+def find_array(text: str, key: str) -> Optional[int]:
+    """
+    Позиция массива key в объекте верхнего уровня или None, если ключа нет.
+    Значения других ключей пропускаются поштучно
+
+    Raises:
+        json.JSONDecodeError: Текст - не объект JSON
+    """
+    index = _expect(text, 0, "{")
+    index = _skip_ws(text, index)
+    if text[index:index + 1] == "}":
+        return None
+    while True:
+        index = _expect(text, index, '"')
+        name, index = scanstring(text, index)
+        index = _skip_ws(text, _expect(text, index, ":"))
+        if name == key and text[index:index + 1] == "[":
+            return index
+        _, index = _decoder.raw_decode(text, index)
+        index = _skip_ws(text, index)
+        if text[index:index + 1] == "}":
+            return None
+        index = _expect(text, index, ",")
+
+
+def iter_array(text: str, index: int) -> Iterator[Any]:
+    """
+    Элементы массива, начинающегося в index, по одному
+
+    Raises:
+        json.JSONDecodeError: Массив оборван или поврежден
+    """
+    index = _skip_ws(text, _expect(text, index, "["))
+    if text[index:index + 1] == "]":
+        return
+    while True:
+        item, index = _decoder.raw_decode(text, index)
+        yield item
+        index = _skip_ws(text, index)
+        if text[index:index + 1] == "]":
+            return
+        index = _skip_ws(text, _expect(text, index, ","))
+
+
+def iter_items(widget_data: str) -> Optional[Iterator[Any]]:
+    """
+    Элементы массива items строки виджета по одному; None - массива нет
+
+    Raises:
+        json.JSONDecodeError: Строка виджета - не объект JSON (элементы - при чтении)
+    """
+    index = find_array(widget_data, "items")
+    return None if index is None else iter_array(widget_data, index)
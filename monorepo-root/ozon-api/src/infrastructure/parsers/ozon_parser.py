@@ -1,29 +1,103 @@
 import asyncio
+import hashlib
 import json
 import os
 import time
 import urllib.parse
-from typing import Any, Dict, List, Optional
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
-import undetected_chromedriver as uc
-from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 from domain.entities.product import Product
+from infrastructure.parsers.batch_fetch import (
+    BATCH_FETCH_SCRIPT,
+    BATCH_FETCH_TIMEOUT_SECONDS,
+    BatchQuery,
+    BatchResult,
+    classify_response,
+)
+from infrastructure.parsers.browser_config import BrowserConfig
+from infrastructure.parsers.cdp_wait import CdpDocumentWaiter
+from infrastructure.parsers.chrome_profile import ChromeProfile
+from infrastructure.parsers.json_stream import iter_items, iter_raw_widget_spans, iter_widget_strings
+from infrastructure.parsers.page_classifier import (
+    BLOCKED_PAGE,
+    EMPTY_PAGE,
+    ERROR_PAGE,
+    JSON_PAGE,
+    LOADING_PAGE,
+    same_document,
+    wait_for_page,
+)
+from infrastructure.parsers.parse_pool import parse_pool
+from utils.adaptive_concurrency import adaptive_limit
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.outbound_budget import outbound_budget
+from utils.proxy_pool import Proxy, proxy_pool
 from utils.rate_limiter import parsing_rate_limiter
+from utils.retry_policy import BLOCKED, DRIVER, JSON, PAGE_LOAD, ParseAttemptError, classify_error, retry_policy
+
+if TYPE_CHECKING:
+    import undetected_chromedriver as uc
+
+    from infrastructure.parsers.shared_browser import SharedBrowser
+
+# Значения по умолчанию, если клиент не задал дедлайн
+PAGE_LOAD_TIMEOUT_SECONDS = 300
+CONTENT_WAIT_SECONDS = 10
+
+# Сколько последних распарсенных tileGridDesktop хранить для пропуска повторного парсинга
+PAYLOAD_CACHE_SIZE = 256
+# Хэш сетки считается кусками этого размера (символов)
+DIGEST_CHUNK_CHARS = 1 << 20
+
+# Тексты pre и body одной командой: WebElement ссылки не переживают переключение вкладок
+PAGE_TEXT_SCRIPT = """
+return {
+    pre: Array.from(document.querySelectorAll("pre"), (pre) => pre.innerText),
+    body: document.body ? document.body.innerText : "",
+};
+"""
 
 
 class OzonParser:
     """Парсер Ozon с использованием undetected-chromedriver"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        config: Optional[BrowserConfig] = None,
+        slot: int = 0,
+        browser: Optional["SharedBrowser"] = None,
+    ):
+        self.config = config or BrowserConfig.from_env()
+        self.slot = slot
+        # Общий Chrome: слот работает во вкладке, а не в собственном браузере
+        self.browser = browser
         self.driver = None
-        self.base_url = "https://www.ozon.ru"
+        # Исходящий прокси запущенного этим парсером Chrome (None - напрямую)
+        self.proxy: Optional[Proxy] = None
+        self.base_url = self.config.base_url
         self._driver_initialized = False
+        # Персистентный профиль хранится отдельно для каждого слота драйвера
+        self.profile: Optional[ChromeProfile] = None
+        if self.config.profile_dir and browser is None:
+            self.profile = ChromeProfile(
+                self.config.profile_dir,
+                slot,
+                self.config.profile_max_size_mb,
+                self.config.profile_compact_interval_seconds,
+            )
+        # Хэш tileGridDesktop -> уже распарсенные товары (неизменившаяся выдача не парсится)
+        self._payload_cache: "OrderedDict[Tuple[str, str, str], List[Product]]" = OrderedDict()
+        self.payload_cache_hits = 0
+        # Исходящие запросы этого слота (пул списывает их с квоты клиента)
+        self.outbound_requests = 0
+
+    def _consume_outbound(self) -> None:
+        """Каждая навигация или fetch расходует глобальный бюджет исходящих запросов"""
+        outbound_budget.consume()
+        self.outbound_requests += 1
 
     async def _init_driver(self):
         """Инициализация драйвера с поддержкой локального ChromeDriver"""
@@ -32,77 +106,47 @@ class OzonParser:
             try:
                 # Проверяем, что драйвер еще работает
                 self.driver.current_url
-                print("✅ Драйвер уже инициализирован и работает")
-                return
             except Exception as e:
                 print(f"⚠️ Драйвер не работает, пересоздаем: {e}")
                 self.driver = None
                 self._driver_initialized = False
+            else:
+                if proxy_pool.needs_rotation(self._proxy_owner().slot):
+                    # Прокси задается при запуске Chrome - смена прокси означает перезапуск
+                    print(f"🔀 Прокси слота {self.slot} в cool-down, перезапускаем браузер с другим")
+                    self._discard_driver()
+                else:
+                    # Гигиена профиля может перезапустить драйвер
+                    self._maintain_profile()
+                if self.driver is not None:
+                    print("✅ Драйвер уже инициализирован и работает")
+                    return
         
+        if self.driver is None and self.browser is not None:
+            self.driver = await self.browser.open_tab()
+            self._driver_initialized = True
+            return
+
         if self.driver is None:
-            print("🔧 Создаем драйвер Chrome...")
-            options = uc.ChromeOptions()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-plugins")
-            options.add_argument("--disable-images")
-            options.add_argument("--disable-javascript")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--disable-web-security")
-            options.add_argument("--allow-running-insecure-content")
-            options.add_argument("--ignore-ssl-errors")
-            options.add_argument("--ignore-certificate-errors")
-            options.add_argument("--no-first-run")
-            options.add_argument("--no-default-browser-check")
-            options.add_argument("--disable-background-timer-throttling")
-            options.add_argument("--disable-backgrounding-occluded-windows")
-            options.add_argument("--disable-renderer-backgrounding")
-            options.add_argument("--disable-features=TranslateUI")
-            options.add_argument("--disable-ipc-flooding-protection")
-            # Убираем проблемные опции для совместимости с ARM64
-            # options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            # options.add_experimental_option("useAutomationExtension", False)
-            options.add_argument(
-                "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
+            mode = "headless" if self.config.headless else "headed"
+            print(f"🔧 Создаем драйвер Chrome ({mode})...")
+            user_data_dir = self.profile.prepare() if self.profile else None
+            if user_data_dir:
+                print(f"📂 Профиль Chrome: {user_data_dir}")
+            self.proxy = proxy_pool.assign(self.slot)
+            if self.proxy is not None:
+                print(f"🌍 Прокси слота {self.slot}: {self.proxy.server}")
 
             try:
-                # Сначала пробуем найти ChromeDriver в разных местах
-                chromedriver_paths = [
-                    "chromedriver.exe",  # В текущей папке
-                    "chromedriver",  # В текущей папке (Linux)
-                    os.path.join(os.path.dirname(__file__), "chromedriver.exe"),
-                    os.path.join(os.path.dirname(__file__), "chromedriver"),
-                    "C:\\chromedriver\\chromedriver.exe",  # Стандартная папка Windows
-                    "/usr/local/bin/chromedriver",  # Стандартная папка Linux
-                    "/usr/bin/chromedriver",  # Альтернативная папка Linux
-                ]
-
-                chromedriver_found = None
-                for path in chromedriver_paths:
-                    if os.path.exists(path):
-                        chromedriver_found = path
-                        print(f"✅ Найден ChromeDriver: {path}")
-                        break
-
-                if chromedriver_found:
-                    # Используем найденный ChromeDriver
-                    print(f"🔧 Используем локальный ChromeDriver: {chromedriver_found}")
-                    self.driver = uc.Chrome(
-                        driver_executable_path=chromedriver_found, options=options
-                    )
-                else:
-                    # Если ChromeDriver не найден, пробуем обычный Selenium
-                    print("⚠️ ChromeDriver не найден, пробуем обычный Selenium...")
-                    try:
-                        self.driver = webdriver.Chrome(options=options)
-                    except Exception as e:
-                        print(f"❌ Ошибка с обычным Selenium: {e}")
-                        # Последняя попытка - без опций
-                        print("🔧 Пробуем без опций...")
-                        self.driver = webdriver.Chrome()
+                try:
+                    self._launch_chrome(user_data_dir)
+                except Exception as e:
+                    if not self.profile:
+                        raise
+                    # Chrome не стартует с профилем - считаем профиль поврежденным
+                    print(f"⚠️ Chrome не запустился с профилем, сбрасываем профиль: {e}")
+                    self.profile.reset(f"Chrome не запустился: {type(e).__name__}")
+                    self._launch_chrome(user_data_dir)
 
                 print("✅ Драйвер Chrome создан")
                 print(f"🔧 Chrome версия: {self.driver.capabilities.get('browserVersion', 'unknown')}")
@@ -128,6 +172,127 @@ class OzonParser:
                 print(f"🔧 Детали: {str(e)}")
                 raise
 
+    def _build_options(self, user_data_dir: Optional[str] = None) -> "uc.ChromeOptions":
+        """Опции Chrome (новый объект на каждый запуск - uc не допускает переиспользование)"""
+        # Браузерный стек (~0.3 с импорта) грузится при первом запуске Chrome, а не при старте сервиса
+        import undetected_chromedriver as uc
+
+        options = uc.ChromeOptions()
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-plugins")
+        options.add_argument("--disable-images")
+        options.add_argument("--disable-javascript")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-web-security")
+        options.add_argument("--allow-running-insecure-content")
+        options.add_argument("--ignore-ssl-errors")
+        options.add_argument("--ignore-certificate-errors")
+        options.add_argument("--no-first-run")
+        options.add_argument("--no-default-browser-check")
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-features=TranslateUI")
+        options.add_argument("--disable-ipc-flooding-protection")
+        options.add_argument(f"--window-size={self.config.window_size}")
+        if self.config.headless:
+            # Headless режим работает без X сервера (Xvfb/fluxbox не нужны)
+            options.add_argument("--headless=new")
+        if user_data_dir:
+            # uc сохраняет указанный через аргумент профиль при quit()
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+        if self.proxy is not None:
+            options.add_argument(f"--proxy-server={self.proxy.server}")
+            # Без этого Chrome ходит на localhost мимо прокси (фейковый Ozon в проверках)
+            options.add_argument("--proxy-bypass-list=<-loopback>")
+        if self.config.page_wait == "cdp" or self.config.tabs_per_browser > 1:
+            # driver.get не ждет load: окончание загрузки сообщит DevTools или классификатор,
+            # а общая для вкладок WebDriver сессия не блокируется на время загрузки
+            options.page_load_strategy = "none"
+        # Убираем проблемные опции для совместимости с ARM64
+        # options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        # options.add_experimental_option("useAutomationExtension", False)
+        options.add_argument(
+            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )
+        return options
+
+    def _launch_chrome(self, user_data_dir: Optional[str] = None) -> None:
+        """Запуск Chrome через локальный ChromeDriver или обычный Selenium"""
+        import undetected_chromedriver as uc
+        from selenium import webdriver
+
+        options = self._build_options(user_data_dir)
+
+        # Сначала пробуем найти ChromeDriver в разных местах
+        chromedriver_paths = [
+            "chromedriver.exe",  # В текущей папке
+            "chromedriver",  # В текущей папке (Linux)
+            os.path.join(os.path.dirname(__file__), "chromedriver.exe"),
+            os.path.join(os.path.dirname(__file__), "chromedriver"),
+            "C:\\chromedriver\\chromedriver.exe",  # Стандартная папка Windows
+            "/usr/local/bin/chromedriver",  # Стандартная папка Linux
+            "/usr/bin/chromedriver",  # Альтернативная папка Linux
+        ]
+
+        chromedriver_found = None
+        for path in chromedriver_paths:
+            if os.path.exists(path):
+                chromedriver_found = path
+                print(f"✅ Найден ChromeDriver: {path}")
+                break
+
+        if chromedriver_found:
+            # Используем найденный ChromeDriver
+            print(f"🔧 Используем локальный ChromeDriver: {chromedriver_found}")
+            self.driver = uc.Chrome(
+                driver_executable_path=chromedriver_found,
+                options=options,
+                headless=self.config.headless,
+            )
+        else:
+            # Если ChromeDriver не найден, пробуем обычный Selenium
+            print("⚠️ ChromeDriver не найден, пробуем обычный Selenium...")
+            try:
+                self.driver = webdriver.Chrome(options=options)
+            except Exception as e:
+                print(f"❌ Ошибка с обычным Selenium: {e}")
+                # Последняя попытка - без опций (кроме headless и профиля)
+                print("🔧 Пробуем без опций...")
+                fallback_options = webdriver.ChromeOptions()
+                if self.config.headless:
+                    fallback_options.add_argument("--headless=new")
+                if user_data_dir:
+                    fallback_options.add_argument(f"--user-data-dir={user_data_dir}")
+                self.driver = webdriver.Chrome(options=fallback_options)
+
+    def _maintain_profile(self) -> None:
+        """Периодическая гигиена профиля работающего браузера"""
+        if not self.profile or not self.profile.is_compaction_due():
+            return
+
+        # HTTP кэш чистим на лету через DevTools, cookies при этом сохраняются
+        try:
+            self.driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except Exception as e:
+            print(f"⚠️ Не удалось очистить кэш браузера: {e}")
+        self.profile.mark_compacted()
+
+        size_mb = self.profile.size_bytes() // (1024 * 1024)
+        if size_mb > self.config.profile_max_size_mb:
+            # Файловые кэши удаляются только при остановленном Chrome - перезапускаем
+            print(f"🧹 Профиль слота {self.slot} превышает лимит ({size_mb} MB), перезапускаем драйвер")
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"⚠️ Ошибка при закрытии драйвера: {e}")
+            self.driver = None
+            self._driver_initialized = False
+            self.profile.compact()
+
     def _build_api_url(
         self,
         query: str,
@@ -140,7 +305,7 @@ class OzonParser:
         encoded_query = query.replace(" ", "+")
 
         # Базовый URL для API Ozon
-        base_url = "https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2"
+        base_url = f"{self.base_url}/api/entrypoint-api.bx/page/json/v2"
 
         # Используем переданный category_slug 
         print(f"🎯 Используем slug категории: {category_slug} для запроса '{query}'")
@@ -183,8 +348,19 @@ class OzonParser:
         category_slug: str,
         platform_id: str = None,
         exactmodels: str = None,
+        deadline: Optional[Deadline] = None,
     ) -> List[Product]:
-        """Получение продуктов по запросу"""
+        """
+        Получение продуктов по запросу
+
+        Args:
+            deadline: Бюджет времени запроса; парсинг прерывается на ближайшей
+                границе этапа, когда бюджет исчерпан или RPC отменен
+
+        Raises:
+            DeadlineExceeded: Бюджет исчерпан или запрос отменен клиентом
+        """
+        deadline = deadline or Deadline()
         start_time = time.time()
         print(f"🔍 Парсинг Ozon для запроса: {query} в категории {category_slug}")
         if platform_id:
@@ -193,19 +369,26 @@ class OzonParser:
             print(f"🔎 С exactmodels: {exactmodels}")
         
         # Ждем перед запросом согласно rate limiting
+        deadline.check("rate_limit")
         await parsing_rate_limiter.wait_before_request(query)
         
-        max_retries = 3
-        for attempt in range(max_retries):
+        retry_policy.on_request()
+        attempt = 0
+        attempts_by_class: Counter = Counter()
+        previous_delay = 0.0
+        while True:
+            attempt += 1
             try:
-                print(f"🔄 Попытка {attempt + 1} из {max_retries}")
+                deadline.check("attempt")
+                print(f"🔄 Попытка {attempt}")
+                attempt_started = time.monotonic()
 
                 # Инициализация драйвера
                 await self._init_driver()
 
                 # Дополнительная проверка состояния драйвера
                 if self.driver is None:
-                    raise Exception("Драйвер не был инициализирован")
+                    raise ParseAttemptError(DRIVER, "Драйвер не был инициализирован")
 
                 url = self._build_api_url(
                     query, category_slug, platform_id, exactmodels
@@ -215,64 +398,53 @@ class OzonParser:
 
                 # Загрузка страницы
                 print("⏳ Начинаем загрузку страницы...")
+                deadline.check("page_load")
+                self._consume_outbound()
+                # DevTools подключение открывается до навигации, чтобы не пропустить события
+                waiter = await self._open_cdp_waiter()
                 try:
-                    self.driver.get(url)
-                except Exception as e:
-                    print(f"❌ Ошибка загрузки страницы: {e}")
-                    # Не закрываем драйвер, просто пробуем еще раз
-                    if attempt < max_retries - 1:
-                        print("🔄 Повторяем попытку загрузки...")
-                        await asyncio.sleep(2)
-                        continue
-                    else:
-                        raise Exception(f"Не удалось загрузить страницу после {max_retries} попыток")
+                    self._navigate(url, deadline)
+                    if waiter is not None:
+                        await self._wait_document(waiter, deadline)
+                finally:
+                    if waiter is not None:
+                        await waiter.close()
                 print("✅ Страница загружена")
 
                 # Проверяем текущий URL
                 current_url = self.driver.current_url
                 print(f"📍 Текущий URL: {current_url}")
 
-                # Ждем загрузки контента
+                # Ждем загрузки контента: классификатор отличает JSON от блокировки,
+                # пустой страницы и ошибки за сотни миллисекунд, не дожидаясь таймаута
                 print("⏳ Ждем загрузки контента...")
-                wait = WebDriverWait(self.driver, 10)
-
-                try:
-                    # Ждем появления JSON данных
-                    wait.until(EC.presence_of_element_located((By.TAG_NAME, "pre")))
-                    print("✅ JSON данные найдены")
-                except TimeoutException:
-                    print("⚠️ JSON данные не найдены, проверяем body...")
-                    # Если pre не найден, проверяем body
-                    body_text = self.driver.find_element(By.TAG_NAME, "body").text
-                    if not body_text.strip():
-                        print("❌ Body пустой, возможно страница не загрузилась")
-                        if attempt < max_retries - 1:
-                            print("🔄 Повторяем попытку...")
-                            continue
-                        else:
-                            raise Exception(
-                                "Страница не загрузилась после всех попыток"
-                            )
+                deadline.check("content_wait")
+                page_kind = await wait_for_page(
+                    self.driver, deadline.cap(CONTENT_WAIT_SECONDS), expected_url=url
+                )
+                if page_kind == BLOCKED_PAGE:
+                    raise ParseAttemptError(BLOCKED, "Ozon вернул страницу блокировки или капчи")
+                if page_kind == EMPTY_PAGE:
+                    raise ParseAttemptError(PAGE_LOAD, "Body пустой, страница не загрузилась")
+                if page_kind == ERROR_PAGE:
+                    raise ParseAttemptError(PAGE_LOAD, "Вместо JSON загрузилась страница ошибки")
+                if page_kind == LOADING_PAGE:
+                    raise ParseAttemptError(PAGE_LOAD, "Страница не догрузилась за отведенное время")
+                print("✅ JSON данные найдены")
 
                 # Извлекаем JSON данные
                 print("🔍 Извлекаем JSON данные...")
-                json_data = self._extract_json_from_page()
+                deadline.check("extract")
+                page_text = self._extract_page_text()
 
-                if json_data is None:
-                    print("❌ Не удалось извлечь JSON данные")
-                    if attempt < max_retries - 1:
-                        print("🔄 Повторяем попытку...")
-                        continue
-                    else:
-                        raise Exception(
-                            "Не удалось извлечь JSON данные после всех попыток"
-                        )
+                if page_text is None:
+                    raise ParseAttemptError(JSON, "Не удалось извлечь JSON данные")
 
-                # Парсим продукты
+                # Парсим продукты; страница передается разбору без своей ссылки
                 print("🔍 Парсим продукты из JSON...")
-                products = self._parse_products_from_json(
-                    json_data, query, category_slug
-                )
+                parsing = self._parse_page_text(page_text, query, category_slug)
+                del page_text
+                products = await parsing
 
                 processing_time = int((time.time() - start_time) * 1000)
                 print(f"✅ Парсинг завершен за {processing_time}ms")
@@ -280,64 +452,376 @@ class OzonParser:
 
                 # Отмечаем успешный запрос
                 parsing_rate_limiter.on_request_success()
+                adaptive_limit.on_success(time.monotonic() - attempt_started)
+                proxy_pool.report(self._proxy_owner().proxy)
 
                 return products
 
+            except (DeadlineExceeded, asyncio.CancelledError) as e:
+                # Ответ уже никто не прочитает - останавливаем загрузку и освобождаем вкладку
+                print(f"⏹️ Парсинг прерван: {e or 'RPC отменен'}")
+                self._reset_page()
+                raise
+
             except Exception as e:
-                print(f"❌ Ошибка в попытке {attempt + 1}: {e}")
-                
-                # Проверяем, является ли ошибка блокировкой
-                if "connection_limits" in str(e) or "Too many concurrent connections" in str(e):
+                error_class = classify_error(e)
+                attempts_by_class[error_class] += 1
+                print(f"❌ Ошибка в попытке {attempt} ({error_class}): {e}")
+                proxy_pool.report(self._proxy_owner().proxy, error_class)
+
+                if error_class == BLOCKED:
                     print("🚫 Обнаружена блокировка Ozon")
                     parsing_rate_limiter.on_request_blocked()
-                
-                if attempt < max_retries - 1:
-                    print("🔄 Повторяем попытку...")
-                    await asyncio.sleep(2)
-                else:
-                    print("❌ Все попытки исчерпаны")
+                    adaptive_limit.on_blocked()
+                elif error_class == PAGE_LOAD:
+                    adaptive_limit.on_timeout()
+                elif error_class == DRIVER:
+                    # Браузер в неизвестном состоянии - следующая попытка запустит новый
+                    self._discard_driver()
+
+                delay = retry_policy.next_delay(
+                    error_class, attempts_by_class[error_class], previous_delay, attempt
+                )
+                if delay is None:
+                    print("❌ Попытки исчерпаны")
                     raise
+                previous_delay = delay
+                print(f"🔄 Повторяем попытку через {delay:.1f}s...")
+                await asyncio.sleep(deadline.cap(delay))
 
-        return []
+    async def get_products_batch(
+        self,
+        queries: List[BatchQuery],
+        deadline: Optional[Deadline] = None,
+    ) -> List[BatchResult]:
+        """
+        Пакетный парсинг: вкладка на origin Ozon сама вызывает entrypoint-api через fetch()
+        для всех запросов пакета (не больше batch_concurrency одновременно) и возвращает
+        ответы одним execute_async_script. Пакет занимает примерно время одной навигации.
+
+        Ошибка отдельного запроса (блокировка, не JSON) попадает в его BatchResult;
+        исключение поднимается, только если не удалось выполнить пакет целиком.
+        Повторы - на стороне вызывающего.
+
+        Raises:
+            DeadlineExceeded: Бюджет исчерпан или запрос отменен клиентом
+        """
+        deadline = deadline or Deadline()
+        if not queries:
+            return []
+        start_time = time.time()
+        print(f"📚 Пакетный парсинг Ozon: {len(queries)} запросов")
+
+        for batch_query in queries:
+            deadline.check("rate_limit")
+            await parsing_rate_limiter.wait_before_request(batch_query.query)
+
+        try:
+            await self._init_driver()
+            if self.driver is None:
+                raise ParseAttemptError(DRIVER, "Драйвер не был инициализирован")
+            await self._ensure_origin(deadline)
+
+            urls = [
+                self._build_api_url(q.query, q.category_slug, q.platform_id, q.exactmodels)
+                for q in queries
+            ]
+            deadline.check("batch_fetch")
+            # Каждый fetch - такой же исходящий запрос к Ozon, как навигация
+            for _ in urls:
+                self._consume_outbound()
+            self.driver.set_script_timeout(deadline.cap(PAGE_LOAD_TIMEOUT_SECONDS))
+            responses = self.driver.execute_async_script(
+                BATCH_FETCH_SCRIPT,
+                urls,
+                self.config.batch_concurrency,
+                int(deadline.cap(BATCH_FETCH_TIMEOUT_SECONDS) * 1000),
+            )
+        except (DeadlineExceeded, asyncio.CancelledError) as e:
+            print(f"⏹️ Пакетный парсинг прерван: {e or 'RPC отменен'}")
+            self._reset_page()
+            raise
+        except Exception as e:
+            if classify_error(e) == DRIVER:
+                self._discard_driver()
+            raise
+
+        results = [await self._batch_result(q, response) for q, response in zip(queries, responses)]
+        if any(classify_error(r.error) == BLOCKED for r in results if r.error is not None):
+            print("🚫 Обнаружена блокировка Ozon в пакете")
+            parsing_rate_limiter.on_request_blocked()
+            adaptive_limit.on_blocked()
+            proxy_pool.report(self._proxy_owner().proxy, BLOCKED)
+        elif any(r.ok for r in results):
+            parsing_rate_limiter.on_request_success()
+            # Время пакета несравнимо с одной страницей - без замера латентности
+            adaptive_limit.on_success()
+            proxy_pool.report(self._proxy_owner().proxy)
+
+        processing_time = int((time.time() - start_time) * 1000)
+        succeeded = sum(1 for r in results if r.ok)
+        print(f"✅ Пакет завершен за {processing_time}ms: {succeeded}/{len(results)} успешно")
+        return results
+
+    async def warm_up(self, query: str, category_slug: str, deadline: Deadline) -> None:
+        """
+        Запуск Chrome и пробный запрос entrypoint-api без разбора товаров
 
-    def _extract_json_from_page(self) -> Optional[Dict[str, Any]]:
-        """Извлечение JSON данных со страницы"""
+        Raises:
+            ParseAttemptError: Пробная страница - не JSON (блокировка, ошибка, таймаут)
+        """
+        await self._init_driver()
+        if self.driver is None:
+            raise ParseAttemptError(DRIVER, "Драйвер не был инициализирован")
+        deadline.check("page_load")
+        self._consume_outbound()
+        url = self._build_api_url(query, category_slug)
+        self._navigate(url, deadline)
+        page_kind = await wait_for_page(self.driver, deadline.cap(CONTENT_WAIT_SECONDS), expected_url=url)
+        if page_kind != JSON_PAGE:
+            error_class = BLOCKED if page_kind == BLOCKED_PAGE else PAGE_LOAD
+            raise ParseAttemptError(error_class, f"Пробный запрос вернул страницу типа {page_kind}")
+
+    async def _ensure_origin(self, deadline: Deadline) -> None:
+        """Вкладка должна быть на origin Ozon: fetch() идет с его cookies и без CORS"""
+        if self.driver.current_url.startswith(self.base_url):
+            return
+        print(f"🌐 Открываем {self.base_url} для пакетных запросов")
+        deadline.check("page_load")
+        self._consume_outbound()
+        try:
+            self.driver.set_page_load_timeout(deadline.cap(PAGE_LOAD_TIMEOUT_SECONDS))
+            self.driver.get(f"{self.base_url}/")
+        except TimeoutException as e:
+            raise ParseAttemptError(PAGE_LOAD, f"Таймаут загрузки страницы: {e}") from e
+        # Главная - HTML, поэтому ждем только выхода из состояния загрузки и проверяем блокировку
+        page_kind = await wait_for_page(self.driver, deadline.cap(CONTENT_WAIT_SECONDS))
+        if page_kind == BLOCKED_PAGE:
+            raise ParseAttemptError(BLOCKED, "Ozon вернул страницу блокировки или капчи")
+        if page_kind == LOADING_PAGE:
+            raise ParseAttemptError(PAGE_LOAD, "Страница не догрузилась за отведенное время")
+
+    async def _batch_result(self, batch_query: BatchQuery, response: Dict[str, Any]) -> BatchResult:
+        """Разбор одного ответа пакета"""
+        kind = classify_response(response)
+        if kind == BLOCKED_PAGE:
+            error = ParseAttemptError(BLOCKED, f"HTTP {response.get('status')}: страница блокировки")
+            return BatchResult(batch_query, error=error)
+        if kind != JSON_PAGE:
+            reason = response.get("error") or f"HTTP {response.get('status')}: ответ не JSON ({kind})"
+            return BatchResult(batch_query, error=ParseAttemptError(PAGE_LOAD, reason))
+        try:
+            # Тело забирается из ответа: разбор освобождает его, не дожидаясь конца пакета
+            products = await self._parse_page_text(
+                response.pop("body"), batch_query.query, batch_query.category_slug
+            )
+        except ParseAttemptError as e:
+            return BatchResult(batch_query, error=e)
+        return BatchResult(batch_query, products=products)
+
+    async def _open_cdp_waiter(self) -> Optional[CdpDocumentWaiter]:
+        """DevTools waiter для режима page_wait=cdp; None - ждем опросом"""
+        if self.config.page_wait != "cdp":
+            return None
+        waiter = CdpDocumentWaiter.for_driver(self.driver)
+        if waiter is None:
+            return None
+        try:
+            await waiter.connect()
+            return waiter
+        except Exception as e:
+            print(f"⚠️ DevTools недоступен, ждем загрузку опросом: {e}")
+            await waiter.close()
+            return None
+
+    async def _wait_document(self, waiter: CdpDocumentWaiter, deadline: Deadline) -> None:
+        """Ждет Network.loadingFinished основного документа"""
+        try:
+            document = await waiter.wait_document(deadline.cap(PAGE_LOAD_TIMEOUT_SECONDS))
+        except asyncio.TimeoutError as e:
+            raise ParseAttemptError(PAGE_LOAD, "Таймаут загрузки документа (DevTools)") from e
+        if document["failed"]:
+            raise ParseAttemptError(PAGE_LOAD, "Загрузка документа прервана (Network.loadingFailed)")
+        print(f"📡 Документ загружен: HTTP {document['status']}, {document['mime_type']}")
+
+    def _navigate(self, url: str, deadline: Deadline) -> None:
+        """driver.get с таймаутом загрузки в пределах дедлайна"""
+        try:
+            self.driver.set_page_load_timeout(deadline.cap(PAGE_LOAD_TIMEOUT_SECONDS))
+            # Вкладка уже показывает этот URL (повтор, прошлый замер того же запроса):
+            # сравнение адреса в wait_for_page не отличит старый документ от нового
+            if same_document(self.driver.current_url, url):
+                self.driver.get("about:blank")
+            self.driver.get(url)
+        except TimeoutException as e:
+            raise ParseAttemptError(PAGE_LOAD, f"Таймаут загрузки страницы: {e}") from e
+
+    def _reset_page(self) -> None:
+        """Возвращает драйвер в чистое состояние после прерванного парсинга"""
+        if self.driver is None:
+            return
+        try:
+            self.driver.execute_script("window.stop();")
+            # Таймаут загрузки мог быть урезан дедлайном запроса
+            self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+            self.driver.get("about:blank")
+        except Exception as e:
+            # Драйвер в неизвестном состоянии - пересоздадим при следующем запросе
+            print(f"⚠️ Не удалось сбросить страницу, драйвер будет пересоздан: {e}")
+            self._discard_driver()
+
+    def _proxy_owner(self) -> "OzonParser":
+        """Парсер, запускающий Chrome слота: у вкладки - хост общего браузера"""
+        return self.browser.host if self.browser is not None else self
+
+    def _discard_driver(self) -> None:
+        """Закрывает драйвер; следующий запрос запустит новый браузер"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
+        self._driver_initialized = False
+
+    def _extract_page_text(self) -> Optional[str]:
+        """Текст JSON со страницы (pre просмотрщика или body); декодирует _parse_page_text"""
         try:
             # Проверяем, что драйвер существует
             if self.driver is None:
                 print("❌ Драйвер не инициализирован")
                 return None
-                
-            # Ищем pre элемент с JSON
-            pre_elements = self.driver.find_elements(By.TAG_NAME, "pre")
 
-            for pre in pre_elements:
-                try:
-                    text = pre.text.strip()
-                    if text and text.startswith("{"):
-                        json_data = json.loads(text)
-                        print("✅ JSON данные успешно извлечены из pre элемента")
-                        return json_data
-                except json.JSONDecodeError:
-                    continue
-
-            # Если pre не найден, проверяем body
-            body_text = self.driver.find_element(By.TAG_NAME, "body").text.strip()
-            if body_text and body_text.startswith("{"):
-                try:
-                    json_data = json.loads(body_text)
-                    print("✅ JSON данные успешно извлечены из body")
-                    return json_data
-                except json.JSONDecodeError:
-                    pass
+            page_text = self.driver.execute_script(PAGE_TEXT_SCRIPT) or {}
 
-            print("❌ Не удалось найти валидный JSON на странице")
+            # Ищем pre элемент с JSON, если pre не найден - проверяем body
+            for text in page_text.get("pre", []) + [page_text.get("body")]:
+                text = (text or "").strip()
+                if text.startswith("{"):
+                    print(f"✅ JSON текст извлечен со страницы ({len(text) // 1024} KB)")
+                    return text
+
+            print("❌ Не удалось найти JSON на странице")
             return None
 
         except Exception as e:
             print(f"❌ Ошибка извлечения JSON: {e}")
             return None
 
+    async def _parse_page_text(self, page_text: str, query: str, category_slug: str) -> List[Product]:
+        """
+        Декодирование JSON и парсинг товаров; большие страницы уходят в пул процессов,
+        чтобы json.loads не держал GIL процесса с event loop.
+        Неизменившаяся выдача узнается по хэшу сырой строки сетки до любого декодирования.
+        Вызывающий не держит свою ссылку на page_text: при потоковом разборе страница
+        освобождается сразу после декодирования сетки, до разбора товаров
+
+        Raises:
+            ParseAttemptError: Текст страницы - не валидный JSON
+        """
+        digest = self._payload_digest(page_text)
+        payload_key = (digest, query, category_slug)
+        if digest is not None:
+            cached = self._cached_payload(payload_key)
+            if cached is not None:
+                return cached
+        try:
+            if parse_pool.should_offload(len(page_text)):
+                print(f"⚙️ Парсинг страницы {len(page_text) // 1024} KB в пуле процессов")
+                products = await parse_pool.parse(page_text, query, category_slug)
+            else:
+                grids = self._stream_grids(page_text)
+                if grids:
+                    # Дальше нужна только сетка: страница не держится в памяти, пока разбираются товары
+                    del page_text
+                    products = self._parse_grids_streaming(grids, query, category_slug)
+                else:
+                    products = self._parse_products_from_json(json.loads(page_text), query, category_slug)
+        except json.JSONDecodeError as e:
+            raise ParseAttemptError(JSON, f"Битый JSON: {e}") from e
+        if digest is not None:
+            self._store_payload(payload_key, products)
+        return products
+
+    def _parse_products_from_text(self, page_text: str, query: str, category_slug: str) -> List[Product]:
+        """
+        Парсинг товаров из текста страницы: потоково (stream_parse) или через полное дерево
+
+        Raises:
+            json.JSONDecodeError: Текст страницы - не валидный JSON
+        """
+        grids = self._stream_grids(page_text)
+        if grids:
+            return self._parse_grids_streaming(grids, query, category_slug)
+        return self._parse_products_from_json(json.loads(page_text), query, category_slug)
+
+    def _stream_grids(self, page_text: str) -> List[Tuple[str, str]]:
+        """
+        Декодированные строки tileGridDesktop для потокового разбора (stream_parse).
+        Пусто - потоковый разбор выключен или сетки нет: нужен полный разбор (он же покажет ошибку Ozon)
+
+        Raises:
+            json.JSONDecodeError: Строка сетки оборвана
+        """
+        if not self.config.stream_parse:
+            return []
+        return list(iter_widget_strings(page_text, "tileGridDesktop"))
+
+    def _parse_grids_streaming(
+        self, grids: List[Tuple[str, str]], query: str, category_slug: str
+    ) -> List[Product]:
+        """
+        Товары tileGridDesktop без дерева widgetStates: items строки сетки читаются
+        и превращаются в Product по одному. Строки забираются из grids - разобранная
+        сетка освобождается до следующей
+
+        Raises:
+            json.JSONDecodeError: Сетка повреждена
+        """
+        while grids:
+            widget_id, widget_data = grids.pop(0)
+            try:
+                products = self._parse_grid_items(iter_items(widget_data), query, category_slug)
+            except ValueError as e:
+                # Сканер не справился - разбираем сетку деревом (битая сетка - JSONDecodeError)
+                print(f"⚠️ Потоковый разбор не удался, разбираем сетку целиком: {e}")
+                widget_content = json.loads(widget_data)
+                items = widget_content.get("items") if isinstance(widget_content, dict) else None
+                products = self._parse_grid_items(items, query, category_slug)
+            if products is None:
+                continue
+            print(f"📦 Потоково извлечено {len(products)} продуктов из {widget_id}")
+            return products
+        print("📦 В сетке нет товаров")
+        return []
+
+    def _parse_grid_items(
+        self, items: Optional[Iterable[Dict[str, Any]]], query: str, category_slug: str
+    ) -> Optional[List[Product]]:
+        """Product из items сетки; None - в сетке нет items"""
+        if items is None:
+            return None
+        products = []
+        for item in items:
+            product = self._parse_single_product(item, query, category_slug)
+            if product:
+                products.append(product)
+        return products
+
+    def _cached_payload(self, payload_key: Tuple[str, str, str]) -> Optional[List[Product]]:
+        cached = self._payload_cache.get(payload_key)
+        if cached is None:
+            return None
+        self._payload_cache.move_to_end(payload_key)
+        self.payload_cache_hits += 1
+        print(f"♻️ Выдача не изменилась, парсинг пропущен ({len(cached)} товаров)")
+        return list(cached)
+
+    def _store_payload(self, payload_key: Tuple[str, str, str], products: List[Product]) -> None:
+        self._payload_cache[payload_key] = list(products)
+        if len(self._payload_cache) > PAYLOAD_CACHE_SIZE:
+            self._payload_cache.popitem(last=False)
+
     def _parse_products_from_json(
         self, json_data: Dict[str, Any], query: str, category_slug: str
     ) -> List[Product]:
@@ -385,6 +869,25 @@ class OzonParser:
 
         return products
 
+    @staticmethod
+    def _payload_digest(page_text: str) -> Optional[str]:
+        """
+        Быстрый хэш сырых (еще экранированных) строк tileGridDesktop для обнаружения
+        неизменившейся выдачи; None - сетки на странице нет
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        found = False
+        try:
+            for _, start, end in iter_raw_widget_spans(page_text, "tileGridDesktop"):
+                # Кусками: копия сетки целиком удвоила бы пик памяти на большой странице
+                for offset in range(start, end, DIGEST_CHUNK_CHARS):
+                    digest.update(page_text[offset:min(offset + DIGEST_CHUNK_CHARS, end)].encode("utf-8"))
+                found = True
+        except ValueError:
+            # Оборванная страница не кэшируется; ошибку покажет разбор
+            return None
+        return digest.hexdigest() if found else None
+
     def _parse_single_product(
         self, item: Dict[str, Any], query: str, category_slug: str
     ) -> Optional[Product]:
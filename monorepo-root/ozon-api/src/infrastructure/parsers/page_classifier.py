@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Быстрая классификация загруженной страницы: JSON, блокировка/капча, пустая, ошибка
+"""
+import asyncio
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+JSON_PAGE = "json"
+BLOCKED_PAGE = "blocked"
+EMPTY_PAGE = "empty"
+ERROR_PAGE = "error"
+LOADING_PAGE = "loading"
+
+# Признаки антибот-страниц Ozon и типовых челленджей
+BLOCK_MARKERS = (
+    "доступ ограничен",
+    "подтвердите, что вы не робот",
+    "captcha",
+    "challenge",
+    "antibot",
+    "access denied",
+    "too many requests",
+    "connection_limits",
+    "too many concurrent connections",
+)
+ERROR_MARKERS = (
+    "502 bad gateway",
+    "503 service",
+    "504 gateway",
+    "internal server error",
+    "страница не найдена",
+)
+
+# Один execute_script вместо нескольких WebDriver команд на опрос
+SNAPSHOT_SCRIPT = """
+const body = document.body;
+const text = body ? (body.innerText || "") : "";
+return {
+    readyState: document.readyState,
+    contentType: document.contentType || "",
+    url: document.URL || "",
+    title: document.title || "",
+    hasPre: !!document.querySelector("pre"),
+    text: text.slice(0, 2000),
+    textLength: text.length,
+};
+"""
+
+
+@dataclass
+class PageSnapshot:
+    ready_state: str
+    content_type: str
+    url: str
+    title: str
+    has_pre: bool
+    text: str
+    text_length: int
+
+    @classmethod
+    def from_script(cls, data: Dict[str, Any]) -> "PageSnapshot":
+        return cls(
+            ready_state=data.get("readyState", ""),
+            content_type=data.get("contentType", ""),
+            url=data.get("url", ""),
+            title=data.get("title", ""),
+            has_pre=bool(data.get("hasPre")),
+            text=data.get("text", ""),
+            text_length=int(data.get("textLength", 0)),
+        )
+
+
+def same_document(actual_url: str, expected_url: str) -> bool:
+    """document.URL - та же навигация (браузер мог по-другому перекодировать символы)"""
+    return urllib.parse.unquote(actual_url) == urllib.parse.unquote(expected_url)
+
+
+def classify_snapshot(snapshot: PageSnapshot, expected_url: Optional[str] = None) -> str:
+    """
+    Тип страницы по одному снимку.
+    expected_url - адрес навигации: пока вкладка показывает другой документ (прошлый запрос
+    в переиспользуемой вкладке), новая страница еще не пришла
+    """
+    if (
+        expected_url
+        and not snapshot.url.startswith("chrome-error://")
+        and not same_document(snapshot.url, expected_url)
+    ):
+        return LOADING_PAGE
+    text = snapshot.text.lstrip()
+    if text.startswith("{") and (snapshot.has_pre or "json" in snapshot.content_type):
+        # При page_load_strategy="none" тело может еще дописываться - обрезанный JSON
+        # не прошел бы json.loads, поэтому ждем окончания загрузки документа
+        return JSON_PAGE if snapshot.ready_state == "complete" else LOADING_PAGE
+
+    haystack = f"{snapshot.title}\n{snapshot.text}".lower()
+    if any(marker in haystack for marker in BLOCK_MARKERS):
+        return BLOCKED_PAGE
+    if snapshot.url.startswith("chrome-error://") or any(marker in haystack for marker in ERROR_MARKERS):
+        return ERROR_PAGE
+    if snapshot.ready_state != "complete":
+        return LOADING_PAGE
+    if not text:
+        return EMPTY_PAGE
+    # Полностью загруженная HTML страница без JSON - не то, что мы запрашивали
+    return ERROR_PAGE
+
+
+async def wait_for_page(
+    driver,
+    timeout: float,
+    poll_interval: float = 0.05,
+    empty_grace: float = 0.3,
+    expected_url: Optional[str] = None,
+) -> str:
+    """
+    Опрашивает страницу короткими интервалами, пока ее тип не станет ясен.
+    Пустой body ждем еще empty_grace: JS челленджи дорисовывают страницу после load.
+    expected_url - не принимать документ с другим адресом (см. classify_snapshot)
+    """
+    started = time.monotonic()
+    empty_since = None
+    kind = LOADING_PAGE
+    while True:
+        snapshot = PageSnapshot.from_script(driver.execute_script(SNAPSHOT_SCRIPT) or {})
+        kind = classify_snapshot(snapshot, expected_url)
+        now = time.monotonic()
+        if kind == EMPTY_PAGE:
+            empty_since = empty_since or now
+            if now - empty_since >= empty_grace:
+                return kind
+        elif kind != LOADING_PAGE:
+            return kind
+        if now - started >= timeout:
+            return kind
+        await asyncio.sleep(poll_interval)
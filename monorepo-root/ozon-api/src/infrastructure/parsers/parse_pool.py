@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Пул процессов для декодирования JSON и парсинга товаров больших страниц.
+json.loads многомегабайтного widgetStates держит GIL и тормозит event loop,
+который обслуживает gRPC и health check; в отдельном процессе - нет
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import List, Optional, Tuple
+
+from domain.entities.product import Product
+from utils.logger import ozon_logger
+
+PRODUCT_FIELDS = tuple(field.name for field in fields(Product))
+
+# Парсер воркера (создается при первом вызове в процессе пула)
+_worker_parser = None
+
+
+@dataclass
+class ParsePoolConfig:
+    """Конфигурация пула процессов парсинга"""
+    processes: int = 0                  # 0 - пул выключен, все парсится в потоке драйвера
+    offload_min_bytes: int = 1_000_000  # Страницы меньше порога быстрее распарсить на месте
+
+    @classmethod
+    def from_env(cls) -> "ParsePoolConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            processes=int(os.getenv("OZON_PARSE_PROCESSES", "0")),
+            offload_min_bytes=int(os.getenv("OZON_PARSE_OFFLOAD_BYTES", "1000000")),
+        )
+
+
+def parse_page_rows(page_text: str, query: str, category_slug: str) -> List[Tuple]:
+    """
+    Выполняется в процессе пула: текст страницы -> строки товаров.
+    Обратно передаются плоские кортежи, а не объекты - pickle компактнее и быстрее
+
+    Raises:
+        json.JSONDecodeError: Текст страницы - не JSON
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        from infrastructure.parsers.browser_config import BrowserConfig
+        from infrastructure.parsers.ozon_parser import OzonParser
+        # Окружение наследуется от родителя - режим разбора (OZON_STREAM_PARSE) тот же
+        _worker_parser = OzonParser(BrowserConfig.from_env())
+    products = _worker_parser._parse_products_from_text(page_text, query, category_slug)
+    return [tuple(getattr(product, name) for name in PRODUCT_FIELDS) for product in products]
+
+
+class ParsePool:
+    """Ленивый ProcessPoolExecutor с порогом размера страницы"""
+
+    def __init__(self, config: ParsePoolConfig) -> None:
+        self.config = config
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Пул создается лениво из потоков драйверов - без блокировки их могло бы стать два
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.offloaded = 0
+        self.inline = 0
+        self.offloaded_bytes = 0
+
+        if config.processes > 0:
+            ozon_logger.logger.info(f"Пул процессов парсинга: {config}")
+
+    def should_offload(self, size: int) -> bool:
+        if self.config.processes > 0 and size >= self.config.offload_min_bytes:
+            return True
+        self.inline += 1
+        return False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: форк процесса с потоками драйверов и Chrome дочерними процессами небезопасен
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.config.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def parse(self, page_text: str, query: str, category_slug: str) -> List[Product]:
+        """Парсит страницу в процессе пула"""
+        self.offloaded += 1
+        self.offloaded_bytes += len(page_text)
+        rows = await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), parse_page_rows, page_text, query, category_slug
+        )
+        return [Product(*row) for row in rows]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику пула"""
+        return {
+            "processes": self.config.processes,
+            "offload_min_bytes": self.config.offload_min_bytes,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "offloaded_mb": round(self.offloaded_bytes / (1024 * 1024), 1),
+        }
+
+
+# Глобальный экземпляр пула парсинга
+parse_pool = ParsePool(ParsePoolConfig.from_env())
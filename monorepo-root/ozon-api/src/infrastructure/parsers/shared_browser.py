@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Несколько вкладок одного Chrome как независимые слоты парсинга.
+WebDriver сессия одна, поэтому команды вкладок сериализуются блокировкой,
+а навигация не ждет загрузку (pageLoadStrategy=none) и не держит сессию
+"""
+import threading
+from typing import Any, Callable, Optional, Set
+
+from selenium.common.exceptions import WebDriverException
+
+from infrastructure.parsers.browser_config import BrowserConfig
+from infrastructure.parsers.ozon_parser import OzonParser
+from utils.proxy_pool import proxy_pool
+
+
+class SharedBrowser:
+    """Один процесс Chrome, раздающий вкладки слотам пула"""
+
+    def __init__(self, config: BrowserConfig, index: int = 0) -> None:
+        # Хост-парсер только запускает Chrome (опции, профиль, fallback на Selenium)
+        self.host = OzonParser(config, slot=index)
+        self.index = index
+        self.lock = threading.RLock()
+        self.generation = 0
+        self._claimed: Set[str] = set()
+        self._active: Optional[str] = None
+
+        # Statistics
+        self.restarts = 0
+        self.tabs_closed = 0
+
+    @property
+    def tabs(self) -> int:
+        return len(self._claimed)
+
+    def _alive(self) -> bool:
+        try:
+            self.host.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    async def open_tab(self) -> "TabDriver":
+        """
+        Новая вкладка; мертвый браузер перезапускается (его вкладки уже потеряны).
+        Браузер на плохом прокси тоже перезапускается - вкладки в работе получат
+        ошибку драйвера и быстро повторят попытку уже на новом прокси
+        """
+        with self.lock:
+            rotate = self.host.driver is not None and proxy_pool.needs_rotation(self.host.slot)
+            if self.host.driver is None or rotate or not self._alive():
+                if self.generation:
+                    reason = "сменяет прокси" if rotate else "не отвечает"
+                    print(f"♻️ Браузер {self.index} {reason}, перезапускаем")
+                    self.restarts += 1
+                self.host._discard_driver()
+                await self.host._init_driver()
+                self.generation += 1
+                self._claimed.clear()
+                self._active = None
+
+            driver = self.host.driver
+            # Первая вкладка занимает окно, с которым стартовал Chrome
+            unclaimed = [handle for handle in driver.window_handles if handle not in self._claimed]
+            if unclaimed:
+                handle = unclaimed[0]
+                driver.switch_to.window(handle)
+            else:
+                driver.switch_to.new_window("tab")
+                handle = driver.current_window_handle
+            self._active = handle
+            self._claimed.add(handle)
+            print(f"🗂️ Браузер {self.index}: открыта вкладка {handle} ({len(self._claimed)} всего)")
+            return TabDriver(self, handle, self.generation)
+
+    def call(self, tab: "TabDriver", command: Callable[[Any], Any]) -> Any:
+        """Выполняет команду WebDriver в контексте вкладки"""
+        with self.lock:
+            if tab.generation != self.generation or self.host.driver is None:
+                raise WebDriverException("invalid session id: браузер вкладки перезапущен")
+            driver = self.host.driver
+            if self._active != tab.handle:
+                driver.switch_to.window(tab.handle)
+                self._active = tab.handle
+            return command(driver)
+
+    def close_tab(self, tab: "TabDriver") -> None:
+        """Закрывает вкладку (в т.ч. упавшую), не трогая остальные"""
+        with self.lock:
+            if tab.generation != self.generation or tab.handle not in self._claimed:
+                return
+            self._claimed.discard(tab.handle)
+            self._active = None
+            self.tabs_closed += 1
+            try:
+                driver = self.host.driver
+                driver.switch_to.window(tab.handle)
+                driver.close()
+            except Exception as e:
+                # Упавшая вкладка может не закрываться - браузер проверится при открытии следующей
+                print(f"⚠️ Не удалось закрыть вкладку {tab.handle}: {e}")
+
+    async def close(self) -> None:
+        with self.lock:
+            self._claimed.clear()
+            self._active = None
+            await self.host.close(force=True)
+
+    def get_statistics(self) -> dict:
+        return {"tabs": self.tabs, "restarts": self.restarts, "tabs_closed": self.tabs_closed}
+
+
+class TabDriver:
+    """
+    Вкладка общего браузера с тем подмножеством интерфейса WebDriver, которое
+    использует парсер. quit() закрывает только эту вкладку
+    """
+
+    def __init__(self, browser: SharedBrowser, handle: str, generation: int) -> None:
+        self.browser = browser
+        self.handle = handle
+        self.generation = generation
+
+    def get(self, url: str) -> None:
+        self.browser.call(self, lambda driver: driver.get(url))
+
+    def execute_script(self, script: str, *args) -> Any:
+        return self.browser.call(self, lambda driver: driver.execute_script(script, *args))
+
+    def execute_async_script(self, script: str, *args) -> Any:
+        return self.browser.call(self, lambda driver: driver.execute_async_script(script, *args))
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> Any:
+        return self.browser.call(self, lambda driver: driver.execute_cdp_cmd(cmd, params))
+
+    # Таймауты - общие для сессии; при нескольких вкладках загрузку не ждем (pageLoadStrategy=none)
+    def set_page_load_timeout(self, seconds: float) -> None:
+        self.browser.call(self, lambda driver: driver.set_page_load_timeout(seconds))
+
+    def set_script_timeout(self, seconds: float) -> None:
+        self.browser.call(self, lambda driver: driver.set_script_timeout(seconds))
+
+    @property
+    def current_url(self) -> str:
+        return self.browser.call(self, lambda driver: driver.current_url)
+
+    @property
+    def current_window_handle(self) -> str:
+        return self.handle
+
+    @property
+    def capabilities(self) -> dict:
+        return self.browser.call(self, lambda driver: driver.capabilities)
+
+    def quit(self) -> None:
+        self.browser.close_tab(self)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Фоновый краулер: держит кэш результатов теплым по запросам категорий из db-api
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from infrastructure.grpc.db_api_client import DbApiClient
+from infrastructure.parsers.batch_fetch import BatchQuery
+from infrastructure.services.ozon_parser_service import OzonParserService
+from infrastructure.services.result_cache import CacheKey, ResultCache, make_cache_key
+from utils.admission_control import AdmissionRejected, admission_controller
+from utils.deadline import Deadline
+from utils.env import env_bool
+from utils.logger import ozon_logger
+from utils.outbound_budget import outbound_budget
+from utils.priority_scheduler import BACKGROUND
+
+
+@dataclass
+class CrawlerConfig:
+    """Конфигурация фонового краулера"""
+    enabled: bool = False
+    categories: List[str] = field(default_factory=list)   # Ключи категорий db-api
+    queries_refresh_seconds: float = 600.0                 # Как часто перечитывать запросы из db-api
+    tick_seconds: float = 5.0                              # Пауза, когда обновлять нечего
+    scrape_timeout_seconds: float = 60.0                   # Бюджет одного фонового парсинга
+    batch_size: int = 1                                    # Запросов за одну навигацию (fetch из вкладки)
+
+    @classmethod
+    def from_env(cls) -> "CrawlerConfig":
+        """Создает конфигурацию из переменных окружения"""
+        categories = os.getenv("OZON_CRAWLER_CATEGORIES", "")
+        return cls(
+            enabled=env_bool("OZON_CRAWLER_ENABLED", False),
+            categories=[key.strip() for key in categories.split(",") if key.strip()],
+            queries_refresh_seconds=float(os.getenv("OZON_CRAWLER_QUERIES_REFRESH", "600")),
+            batch_size=max(1, int(os.getenv("OZON_CRAWLER_BATCH_SIZE", "1"))),
+        )
+
+
+@dataclass
+class CrawlTarget:
+    """Запрос категории, который краулер поддерживает свежим"""
+    query: str
+    category_slug: str
+    platform_id: Optional[str] = None
+    exactmodels: Optional[str] = None
+
+    @property
+    def key(self) -> CacheKey:
+        return make_cache_key(self.query, self.category_slug, self.platform_id, self.exactmodels)
+
+
+class BackgroundCrawler:
+    """Обновляет запросы по мере устаревания, в пределах глобального бюджета исходящих запросов"""
+
+    def __init__(
+        self,
+        parser_service: OzonParserService,
+        cache: ResultCache,
+        db_client: DbApiClient,
+        config: CrawlerConfig,
+    ) -> None:
+        self.parser_service = parser_service
+        self.cache = cache
+        self.db_client = db_client
+        self.config = config
+        self._targets: Dict[CacheKey, CrawlTarget] = {}
+        self._retry_at: Dict[CacheKey, float] = {}
+        self._targets_loaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.crawled = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """Запускает фоновый цикл"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            ozon_logger.logger.info(f"🕷️ Фоновый краулер запущен для категорий: {', '.join(self.config.categories)}")
+
+    async def stop(self) -> None:
+        """Останавливает фоновый цикл"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.db_client.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if time.time() - self._targets_loaded_at >= self.config.queries_refresh_seconds:
+                    await self._load_targets()
+
+                targets = self._next_due(self.config.batch_size)
+                # Фоновая работа использует только запас бюджета сверх резерва для клиентов
+                if not targets or not outbound_budget.has_headroom():
+                    await asyncio.sleep(self.config.tick_seconds)
+                    continue
+
+                if len(targets) > 1:
+                    await self._crawl_batch(targets)
+                else:
+                    await self._crawl(targets[0])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                ozon_logger.logger.error(f"Ошибка фонового краулера: {e}")
+                await asyncio.sleep(self.config.tick_seconds)
+
+    async def _load_targets(self) -> None:
+        """Загружает список Ozon запросов для каждой категории из db-api"""
+        targets: Dict[CacheKey, CrawlTarget] = {}
+        for category_key in self.config.categories:
+            try:
+                category = await self.db_client.get_category_config(category_key)
+                if category is None or not category.ozon_id:
+                    ozon_logger.logger.warning(f"Категория {category_key} не найдена или без ozon_id")
+                    continue
+                for query_config in await self.db_client.get_queries_for_category(category_key):
+                    if query_config.platform != "ozon":
+                        continue
+                    target = CrawlTarget(
+                        query=query_config.query,
+                        category_slug=category.ozon_id,
+                        platform_id=query_config.platform_id or None,
+                        exactmodels=query_config.exactmodels or None,
+                    )
+                    targets[target.key] = target
+            except Exception as e:
+                ozon_logger.logger.error(f"Не удалось загрузить запросы категории {category_key}: {e}")
+
+        # При недоступности db-api продолжаем работать со старым списком
+        if targets or not self._targets:
+            self._targets = targets
+        self._targets_loaded_at = time.time()
+        ozon_logger.logger.info(f"🕷️ Краулер отслеживает {len(self._targets)} запросов")
+
+    def _next_due(self, limit: int = 1) -> List[CrawlTarget]:
+        """До limit самых просроченных запросов, которым пора обновиться"""
+        now = time.time()
+        due_targets = []
+        for key, target in self._targets.items():
+            entry = self.cache.get_entry(key)
+            due = max(entry.next_due if entry else 0.0, self._retry_at.get(key, 0.0))
+            if due <= now:
+                due_targets.append((due, target))
+        due_targets.sort(key=lambda item: item[0])
+        return [target for _, target in due_targets[:limit]]
+
+    async def _crawl(self, target: CrawlTarget) -> None:
+        key = target.key
+        deadline = Deadline(self.config.scrape_timeout_seconds)
+        try:
+            async with admission_controller.admit(deadline.remaining(), BACKGROUND):
+                products = await self.parser_service.parse_products(
+                    target.query, target.category_slug, target.platform_id, target.exactmodels, deadline
+                )
+        except AdmissionRejected:
+            # Браузер занят клиентами - попробуем позже
+            self._retry_at[key] = time.time() + self.config.tick_seconds
+            return
+        except Exception as e:
+            self.failed += 1
+            self._retry_at[key] = time.time() + self.cache.config.min_interval_seconds
+            ozon_logger.logger.warning(f"🕷️ Фоновое обновление '{target.query}' не удалось: {e}")
+            return
+
+        self._retry_at.pop(key, None)
+        if not products:
+            self._retry_at[key] = time.time() + self.cache.config.min_interval_seconds
+            return
+
+        entry = self.cache.put(key, products)
+        self.crawled += 1
+        ozon_logger.logger.info(
+            f"🕷️ Обновлен '{target.query}': {len(products)} товаров, "
+            f"следующее обновление через {entry.interval_seconds / 60:.0f} мин"
+        )
+
+    async def _crawl_batch(self, targets: List[CrawlTarget]) -> None:
+        """Пакет просроченных запросов за одну навигацию и один слот admission control"""
+        # Каждый запрос пакета - исходящий запрос к Ozon: пакет урезается до запаса бюджета
+        while len(targets) > 1 and not outbound_budget.has_headroom(len(targets)):
+            targets = targets[:-1]
+        deadline = Deadline(self.config.scrape_timeout_seconds)
+        try:
+            async with admission_controller.admit(deadline.remaining(), BACKGROUND):
+                results = await self.parser_service.parse_batch(
+                    [
+                        BatchQuery(target.query, target.category_slug, target.platform_id, target.exactmodels)
+                        for target in targets
+                    ],
+                    deadline,
+                )
+        except AdmissionRejected:
+            retry_at = time.time() + self.config.tick_seconds
+            for target in targets:
+                self._retry_at[target.key] = retry_at
+            return
+        except Exception as e:
+            self.failed += len(targets)
+            retry_at = time.time() + self.cache.config.min_interval_seconds
+            for target in targets:
+                self._retry_at[target.key] = retry_at
+            ozon_logger.logger.warning(f"🕷️ Фоновое обновление пакета из {len(targets)} запросов не удалось: {e}")
+            return
+
+        for target, result in zip(targets, results):
+            key = target.key
+            self._retry_at.pop(key, None)
+            if not result.ok or not result.products:
+                if not result.ok:
+                    self.failed += 1
+                    ozon_logger.logger.warning(f"🕷️ Фоновое обновление '{target.query}' не удалось: {result.error}")
+                self._retry_at[key] = time.time() + self.cache.config.min_interval_seconds
+                continue
+            self.cache.put(key, result.products)
+            self.crawled += 1
+        ozon_logger.logger.info(
+            f"🕷️ Обновлен пакет: {sum(result.ok for result in results)}/{len(targets)} запросов"
+        )
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику краулера"""
+        return {
+            "targets": len(self._targets),
+            "crawled": self.crawled,
+            "failed": self.failed,
+        }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Дельта-ответы: клиент присылает токен последней версии и получает только изменения
+"""
+import hashlib
+import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Hashable, List, Optional
+
+
+@dataclass
+class Snapshot:
+    """Версия результата: цены товаров на момент ответа"""
+    version_token: str
+    prices: Dict[str, int]
+
+
+@dataclass
+class DeltaResult:
+    """Что отправить клиенту"""
+    version_token: str
+    products: List[Any]              # Все товары или только добавленные/переоцененные
+    removed_ids: List[str]
+    is_delta: bool
+
+
+def version_token_for(prices: Dict[str, int]) -> str:
+    """Токен версии зависит только от содержимого: одинаковая выдача - одинаковый токен"""
+    digest = hashlib.blake2b(digest_size=12)
+    for sku in sorted(prices):
+        digest.update(f"{sku}:{prices[sku]};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DeltaTracker:
+    """Хранит несколько последних версий на ключ и считает дельты между ними"""
+
+    def __init__(self, max_keys: int = 2000, versions_per_key: int = 4) -> None:
+        self.max_keys = max_keys
+        self.versions_per_key = versions_per_key
+        self._snapshots: "OrderedDict[Hashable, Deque[Snapshot]]" = OrderedDict()
+
+        # Statistics
+        self.full_responses = 0
+        self.delta_responses = 0
+        self.products_skipped = 0
+
+    @classmethod
+    def from_env(cls) -> "DeltaTracker":
+        """Создает трекер из переменных окружения"""
+        return cls(
+            max_keys=int(os.getenv("OZON_DELTA_MAX_KEYS", "2000")),
+            versions_per_key=int(os.getenv("OZON_DELTA_VERSIONS_PER_KEY", "4")),
+        )
+
+    def diff(self, key: Hashable, products: List[Any], client_token: str = "") -> DeltaResult:
+        """
+        Запоминает текущую версию и возвращает дельту относительно версии клиента.
+        products - товары с полями id и price; неизвестный (устаревший) токен - полный ответ
+        """
+        prices = {product.id: int(product.price) for product in products}
+        token = version_token_for(prices)
+        previous = self._find(key, client_token) if client_token else None
+        self._remember(key, Snapshot(token, prices))
+
+        if previous is None:
+            self.full_responses += 1
+            return DeltaResult(token, products, [], is_delta=False)
+
+        changed = [product for product in products if previous.prices.get(product.id) != prices[product.id]]
+        removed = [sku for sku in previous.prices if sku not in prices]
+        self.delta_responses += 1
+        self.products_skipped += len(products) - len(changed)
+        return DeltaResult(token, changed, removed, is_delta=True)
+
+    def _find(self, key: Hashable, token: str) -> Optional[Snapshot]:
+        for snapshot in self._snapshots.get(key, ()):
+            if snapshot.version_token == token:
+                return snapshot
+        return None
+
+    def _remember(self, key: Hashable, snapshot: Snapshot) -> None:
+        versions = self._snapshots.get(key)
+        if versions is None:
+            versions = deque(maxlen=self.versions_per_key)
+            self._snapshots[key] = versions
+        # Повтор той же версии не вытесняет более старые
+        if not versions or versions[-1].version_token != snapshot.version_token:
+            versions.append(snapshot)
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_keys:
+            self._snapshots.popitem(last=False)
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику дельта-ответов"""
+        return {
+            "keys": len(self._snapshots),
+            "full_responses": self.full_responses,
+            "delta_responses": self.delta_responses,
+            "products_skipped": self.products_skipped,
+        }
@@ -1,18 +1,35 @@
 import asyncio
 import json
+import os
+import threading
+import time
 from typing import Any, Dict, List, Optional
 
 from domain.entities.product import Product
 from domain.services.parser_service import ParserService
-from infrastructure.parsers.ozon_parser import OzonParser
+from infrastructure.parsers.batch_fetch import BatchQuery, BatchResult
+from infrastructure.parsers.driver_pool import DriverPool
+from infrastructure.parsers.parse_pool import parse_pool
+from infrastructure.services.price_history import price_history
+from utils.admission_control import admission_controller
+from utils.circuit_breaker import CircuitBreaker, parser_circuit_breaker
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.hedging import HedgingConfig, HedgingPolicy
+from utils.outbound_budget import outbound_budget
+from utils.readiness import readiness
 
 
 class OzonParserService(ParserService):
     """Сервис парсинга Ozon с типизацией и обработкой ошибок"""
 
-    def __init__(self) -> None:
-        self.parser = OzonParser()
-        self._is_available = True
+    def __init__(self, breaker: Optional[CircuitBreaker] = None) -> None:
+        # Пул драйверов; хедж занимает отдельный слот admission control, поэтому
+        # одновременных навигаций не больше OZON_MAX_CONCURRENT_SCRAPES
+        self.pool = DriverPool(int(os.getenv("OZON_DRIVER_POOL_SIZE", "1")))
+        self.hedging = HedgingPolicy(HedgingConfig.from_env())
+        # Доступность определяет circuit breaker: после сбоев цепь размыкается
+        # и сама восстанавливается через пробные запросы
+        self.breaker = breaker or parser_circuit_breaker
 
     async def parse_products(
         self,
@@ -20,6 +37,7 @@ class OzonParserService(ParserService):
         category_slug: str,
         platform_id: Optional[str] = None,
         exactmodels: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> List[Product]:
         """
         Парсить продукты с Ozon
@@ -29,12 +47,15 @@ class OzonParserService(ParserService):
             category_slug: Слаг категории
             platform_id: ID платформы (опционально)
             exactmodels: ID модели (опционально)
+            deadline: Бюджет времени запроса (опционально)
 
         Returns:
             Список продуктов
 
         Raises:
             ValueError: При некорректных входных данных
+            CircuitOpenError: Парсер временно отключен после серии ошибок
+            DeadlineExceeded: Бюджет исчерпан или запрос отменен клиентом
             RuntimeError: При ошибках парсинга
         """
         if not query or not query.strip():
@@ -43,6 +64,7 @@ class OzonParserService(ParserService):
         if not category_slug or not category_slug.strip():
             raise ValueError("Category slug cannot be empty")
 
+        self.breaker.before_request()
         try:
             print(f"🔍 Парсинг Ozon для запроса: {query} в категории {category_slug}")
 
@@ -53,25 +75,153 @@ class OzonParserService(ParserService):
                     f"🔎 Получен exactmodels от Product-Filter-Service: {exactmodels}"
                 )
 
-            # Получаем продукты напрямую через парсер
-            products = await self.parser.get_products(
-                query, category_slug, platform_id, exactmodels
+            products = await self._scrape(
+                query, category_slug, platform_id, exactmodels, deadline or Deadline()
             )
 
             print(f"✅ Парсинг завершен. Найдено {len(products)} продуктов")
+            self.breaker.record_success()
+            # Успешный парсинг доказывает готовность не хуже пробного запроса
+            readiness.mark_ready("парсинг")
+            # Каждый замер сохраняем в локальную историю цен
+            await price_history.record_async(products)
             return products
 
+        except (DeadlineExceeded, asyncio.CancelledError):
+            # Исчерпанный бюджет клиента - не сбой парсера
+            self.breaker.record_neutral()
+            raise
         except Exception as e:
             print(f"❌ Ошибка парсинга: {e}")
-            self._is_available = False
+            self.breaker.record_failure()
             raise RuntimeError(f"Parsing failed: {str(e)}") from e
 
+    async def parse_batch(self, queries: List[BatchQuery], deadline: Optional[Deadline] = None) -> List[BatchResult]:
+        """
+        Пакет запросов за одну навигацию: товары забираются fetch() из вкладки
+        (используется фоновым обходом, без хеджирования)
+
+        Returns:
+            Результаты в порядке запросов; ошибка одного запроса не роняет остальные
+
+        Raises:
+            CircuitOpenError: Парсер временно отключен после серии ошибок
+            DeadlineExceeded: Бюджет исчерпан
+            RuntimeError: Не удалось получить ни одного результата
+        """
+        self.breaker.before_request()
+        deadline = deadline or Deadline()
+        try:
+            parser = await self.pool.acquire(deadline)
+            results = await self.pool.run_batch(parser, queries, deadline, threading.Event())
+        except (DeadlineExceeded, asyncio.CancelledError):
+            self.breaker.record_neutral()
+            raise
+        except Exception as e:
+            print(f"❌ Ошибка пакетного парсинга: {e}")
+            self.breaker.record_failure()
+            raise RuntimeError(f"Batch parsing failed: {str(e)}") from e
+
+        if not any(result.ok for result in results):
+            self.breaker.record_failure()
+            raise RuntimeError(f"Batch parsing failed: {results[0].error if results else 'empty batch'}")
+        self.breaker.record_success()
+        readiness.mark_ready("парсинг")
+        for result in results:
+            if result.ok:
+                await price_history.record_async(result.products)
+        print(f"✅ Пакетный парсинг: {sum(result.ok for result in results)}/{len(results)} запросов")
+        return results
+
+    async def warm_up(self) -> None:
+        """Прогрев драйвера для /ready: пробный запрос повторяется, пока не пройдет"""
+        config = readiness.config
+        while not readiness.ready:
+            try:
+                await self.pool.warm_up(
+                    config.probe_query, config.probe_category, Deadline(config.probe_timeout_seconds)
+                )
+                readiness.mark_ready("пробный запрос")
+            except Exception as e:
+                readiness.mark_failed(e)
+                await asyncio.sleep(config.retry_seconds)
+
+    async def _scrape(
+        self,
+        query: str,
+        category_slug: str,
+        platform_id: Optional[str],
+        exactmodels: Optional[str],
+        deadline: Deadline,
+    ) -> List[Product]:
+        """Парсинг на свободном драйвере; отстающий запрос хеджируется на другом драйвере"""
+        started = time.monotonic()
+        self.hedging.on_request()
+        args = (query, category_slug, platform_id, exactmodels, deadline)
+
+        primary_stop = threading.Event()
+        primary = asyncio.ensure_future(self.pool.run(await self.pool.acquire(deadline), *args, primary_stop))
+        attempts = {primary: primary_stop}
+        try:
+            hedge_delay = self.hedging.hedge_delay(category_slug) if self.hedging.config.enabled else None
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=deadline.cap(hedge_delay))
+                if not done:
+                    hedge = self._start_hedge(args)
+                    if hedge is not None:
+                        attempts[hedge[0]] = hedge[1]
+
+            # Первый успешный результат побеждает; ошибка одной попытки ждет другую
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedging.hedge_wins += 1
+                            print("🏁 Хедж опередил основной запрос")
+                        self.hedging.record_latency(category_slug, time.monotonic() - started)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Проигравшая попытка останавливается на ближайшей границе этапа
+            for task, stop in attempts.items():
+                if not task.done():
+                    stop.set()
+                    task.cancel()
+
+    def _start_hedge(self, args: tuple) -> Optional[tuple]:
+        """Запускает хедж на другом свободном драйвере, если позволяют лимиты"""
+        # Хедж - дополнительный запрос: он занимает свой слот admission control,
+        # иначе хеджи превышают OZON_MAX_CONCURRENT_SCRAPES
+        if not admission_controller.try_admit_extra():
+            return None
+        parser = self.pool.try_acquire()
+        if parser is None:
+            admission_controller.release_extra()
+            return None
+        # Хедж - дополнительная навигация: только в пределах бюджета исходящих запросов
+        if not outbound_budget.has_headroom() or not self.hedging.try_hedge():
+            admission_controller.release_extra()
+            asyncio.ensure_future(self.pool.release(parser))
+            return None
+        print(f"🪝 Запрос дольше p{self.hedging.config.quantile:.0f}, запускаем хедж на слоте {parser.slot}")
+        stop = threading.Event()
+        # Слот освобождается, когда поток отпустил браузер, а не когда хедж отменен
+        hedge = asyncio.ensure_future(
+            self.pool.run(parser, *args, stop, on_finished=admission_controller.release_extra)
+        )
+        return hedge, stop
+
     async def close(self, force: bool = False) -> None:
         """Закрыть ресурсы парсера (только при принудительном закрытии)"""
         try:
-            if self.parser:
-                await self.parser.close(force=force)
+            if self.pool:
+                await self.pool.close(force=force)
                 if force:
+                    parse_pool.shutdown()
                     print("🔌 Браузер закрыт")
                 else:
                     print("ℹ️ Браузер остается открытым для персистентной работы")
@@ -94,7 +244,7 @@ class OzonParserService(ParserService):
             raise ValueError("Query cannot be empty")
 
         try:
-            products = await self.parser.get_products(query, "videokarty-15721")
+            products = await self._scrape(query, "videokarty-15721", None, None, Deadline())
             return {
                 "status": "success",
                 "data": [product.to_dict() for product in products],
@@ -113,4 +263,4 @@ class OzonParserService(ParserService):
 
     async def is_available(self) -> bool:
         """Проверить доступность парсера"""
-        return self._is_available
+        return self.breaker.is_available()
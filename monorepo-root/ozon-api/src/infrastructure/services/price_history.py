@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Локальная история цен: append-only колонки на диске, чтение через memmap
+"""
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from domain.entities.product import Product
+from utils.logger import ozon_logger
+
+# Колонки и их типы; каждая колонка - отдельный файл <name>.bin
+COLUMNS = {
+    "sku": np.uint32,        # Индекс SKU в skus.txt
+    "category": np.uint16,   # Индекс категории в categories.txt
+    "ts": np.int64,          # Время замера, unix seconds
+    "price": np.uint32,
+    "old_price": np.uint32,  # 0, если старой цены нет
+}
+
+
+@dataclass
+class PriceHistoryConfig:
+    """Конфигурация хранилища истории цен"""
+    directory: Optional[str] = None    # None - история не пишется
+
+    @classmethod
+    def from_env(cls) -> "PriceHistoryConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(directory=os.getenv("OZON_PRICE_HISTORY_DIR") or None)
+
+
+class _Index:
+    """Append-only словарь строка -> номер строки в файле (номер хранится в колонке dtype)"""
+
+    def __init__(self, path: str, dtype: Any) -> None:
+        self.path = path
+        self.capacity = int(np.iinfo(dtype).max) + 1
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._add(line.rstrip("\n"))
+
+    def _add(self, value: str) -> int:
+        self.ids[value] = len(self.values)
+        self.values.append(value)
+        return self.ids[value]
+
+    def get(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+    def get_or_add(self, value: str) -> Optional[int]:
+        """Номер строки; None - словарь заполнен, новый номер не помещается в колонку"""
+        index = self.ids.get(value)
+        if index is None:
+            if len(self.values) >= self.capacity:
+                return None
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(value.replace("\n", " ") + "\n")
+            index = self._add(value)
+        return index
+
+
+class PriceHistoryStore:
+    """Колоночное хранилище замеров цен по SKU"""
+
+    def __init__(self, config: PriceHistoryConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._skus: Optional[_Index] = None
+        self._categories: Optional[_Index] = None
+        if config.directory:
+            os.makedirs(config.directory, exist_ok=True)
+            self._skus = _Index(os.path.join(config.directory, "skus.txt"), COLUMNS["sku"])
+            self._categories = _Index(os.path.join(config.directory, "categories.txt"), COLUMNS["category"])
+            self._rows = self._repair()
+            ozon_logger.logger.info(f"История цен: {config.directory}, {self._rows} замеров")
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.directory is not None
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.config.directory, f"{name}.bin")
+
+    def _repair(self) -> int:
+        """После аварийной остановки колонки могут разойтись по длине - обрезаем по минимальной"""
+        lengths = []
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        rows = min(lengths)
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            with open(path, "ab") as f:
+                f.truncate(rows * np.dtype(dtype).itemsize)
+        return rows
+
+    async def record_async(self, products: List[Product], timestamp: Optional[float] = None) -> None:
+        """record в потоке: запись пяти файлов не должна блокировать event loop"""
+        if not self.enabled or not products:
+            return
+        await asyncio.to_thread(self.record, products, timestamp)
+
+    def record(self, products: List[Product], timestamp: Optional[float] = None) -> None:
+        """Дописывает замер цен (не бросает исключений - история не должна ломать парсинг)"""
+        if not self.enabled or not products:
+            return
+        ts = int(timestamp if timestamp is not None else time.time())
+        with self._lock:
+            try:
+                rows = []
+                for p in products:
+                    sku_id = self._skus.get_or_add(p.id)
+                    category_id = self._categories.get_or_add(p.category)
+                    # Номер не помещается в колонку (uint16 для категорий) - замер не пишем
+                    if sku_id is not None and category_id is not None:
+                        rows.append((p, sku_id, category_id))
+                if len(rows) < len(products):
+                    ozon_logger.logger.warning(
+                        f"История цен: словарь SKU или категорий заполнен, пропущено {len(products) - len(rows)} замеров"
+                    )
+                if not rows:
+                    return
+                columns = {
+                    "sku": np.fromiter((sku_id for _, sku_id, _ in rows), dtype=np.uint32),
+                    "category": np.fromiter((category_id for _, _, category_id in rows), dtype=np.uint16),
+                    "ts": np.full(len(rows), ts, dtype=np.int64),
+                    "price": np.fromiter((int(p.price) for p, _, _ in rows), dtype=np.uint32),
+                    "old_price": np.fromiter(
+                        (int(p.characteristics.get("old_price", 0) or 0) for p, _, _ in rows), dtype=np.uint32
+                    ),
+                }
+                for name, values in columns.items():
+                    with open(self._column_path(name), "ab") as f:
+                        f.write(values.astype(COLUMNS[name], copy=False).tobytes())
+                self._rows += len(rows)
+            except Exception as e:
+                ozon_logger.logger.error(f"Не удалось записать историю цен: {e}")
+                # Часть колонок могла дописаться - выравниваем по самой короткой, как после аварии
+                try:
+                    self._rows = self._repair()
+                except OSError as repair_error:
+                    ozon_logger.logger.error(f"Не удалось выровнять колонки истории цен: {repair_error}")
+
+    def _read(self, name: str, rows: int) -> np.ndarray:
+        """Колонка целиком через memmap (страницы читаются с диска по мере обращения)"""
+        if rows == 0:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._column_path(name), dtype=COLUMNS[name], mode="r", shape=(rows,))
+
+    def _window_mask(self, rows: int, since: Optional[float], until: Optional[float]) -> np.ndarray:
+        ts = self._read("ts", rows)
+        mask = np.ones(rows, dtype=bool)
+        if since is not None:
+            mask &= ts >= int(since)
+        if until is not None:
+            mask &= ts <= int(until)
+        return mask
+
+    def sku_history(
+        self, sku: str, since: Optional[float] = None, until: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """История цен SKU за окно времени, по возрастанию времени"""
+        if not self.enabled:
+            return []
+        sku_id = self._skus.get(sku)
+        if sku_id is None:
+            return []
+        rows = self._rows
+        mask = self._window_mask(rows, since, until) & (self._read("sku", rows) == sku_id)
+        positions = np.flatnonzero(mask)
+        ts = self._read("ts", rows)[positions]
+        price = self._read("price", rows)[positions]
+        old_price = self._read("old_price", rows)[positions]
+        order = np.argsort(ts, kind="stable")
+        return [
+            {"ts": int(ts[i]), "price": int(price[i]), "old_price": int(old_price[i]) or None}
+            for i in order
+        ]
+
+    def category_distribution(
+        self, category: str, since: Optional[float] = None, until: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Распределение цен категории за окно: последняя цена каждого SKU"""
+        if not self.enabled:
+            return None
+        category_id = self._categories.get(category)
+        if category_id is None:
+            return None
+        rows = self._rows
+        mask = self._window_mask(rows, since, until) & (self._read("category", rows) == category_id)
+        positions = np.flatnonzero(mask)
+        if positions.size == 0:
+            return None
+
+        # Записи идут по времени: последняя позиция SKU - его последняя цена
+        skus = self._read("sku", rows)[positions]
+        _, last_from_end = np.unique(skus[::-1], return_index=True)
+        latest = positions[positions.size - 1 - last_from_end]
+        prices = self._read("price", rows)[latest].astype(np.float64)
+
+        p10, p25, median, p75, p90 = np.percentile(prices, [10, 25, 50, 75, 90])
+        return {
+            "category": category,
+            "skus": int(prices.size),
+            "observations": int(positions.size),
+            "min": int(prices.min()),
+            "max": int(prices.max()),
+            "mean": float(prices.mean()),
+            "p10": float(p10),
+            "p25": float(p25),
+            "median": float(median),
+            "p75": float(p75),
+            "p90": float(p90),
+        }
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику хранилища"""
+        return {
+            "enabled": self.enabled,
+            "rows": self._rows,
+            "skus": len(self._skus.values) if self._skus else 0,
+        }
+
+
+# Глобальный экземпляр хранилища истории цен
+price_history = PriceHistoryStore(PriceHistoryConfig.from_env())
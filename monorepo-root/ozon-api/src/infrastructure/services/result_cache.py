@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Кэш результатов парсинга с интервалом обновления по волатильности цен
+"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from domain.entities.product import Product
+
+CacheKey = Tuple[str, str, str, str]
+
+
+def make_cache_key(
+    query: str,
+    category_slug: str,
+    platform_id: Optional[str] = None,
+    exactmodels: Optional[str] = None,
+) -> CacheKey:
+    """Ключ кэша: запрос, слаг категории и фильтры"""
+    return (query.strip().lower(), category_slug.strip(), platform_id or "", exactmodels or "")
+
+
+@dataclass
+class ResultCacheConfig:
+    """Конфигурация кэша результатов"""
+    max_entries: int = 2000
+    min_interval_seconds: float = 300.0        # Самые волатильные запросы - не чаще раза в 5 минут
+    max_interval_seconds: float = 6 * 3600.0   # Стабильные запросы - не реже раза в 6 часов
+    target_change: float = 0.02                # Обновляем, когда ожидаемое изменение цен достигает 2%
+    volatility_alpha: float = 0.3              # Вес нового замера скорости изменения цен
+
+    @classmethod
+    def from_env(cls) -> "ResultCacheConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            max_entries=int(os.getenv("OZON_CACHE_MAX_ENTRIES", "2000")),
+            min_interval_seconds=float(os.getenv("OZON_CRAWLER_MIN_INTERVAL", "300")),
+            max_interval_seconds=float(os.getenv("OZON_CRAWLER_MAX_INTERVAL", str(6 * 3600))),
+            target_change=float(os.getenv("OZON_CRAWLER_TARGET_CHANGE", "0.02")),
+        )
+
+
+@dataclass
+class CacheEntry:
+    """Последний результат по ключу и оценка волатильности его цен"""
+    products: List[Product]
+    fetched_at: float
+    interval_seconds: float
+    change_rate: Optional[float] = None    # Относительное изменение цен в час (EWMA)
+    prices: Dict[str, float] = field(default_factory=dict)
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self) -> bool:
+        """Данные считаются свежими до следующего планового обновления"""
+        return self.age() <= self.interval_seconds
+
+    @property
+    def next_due(self) -> float:
+        return self.fetched_at + self.interval_seconds
+
+
+class ResultCache:
+    """LRU кэш результатов парсинга с адаптивным интервалом обновления"""
+
+    def __init__(self, config: ResultCacheConfig) -> None:
+        self.config = config
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_fresh(self, key: CacheKey) -> Optional[List[Product]]:
+        """Возвращает свежий результат или None"""
+        entry = self._entries.get(key)
+        if entry is None or not entry.is_fresh():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.products
+
+    def get_entry(self, key: CacheKey) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def put(self, key: CacheKey, products: List[Product]) -> CacheEntry:
+        """Сохраняет результат и пересчитывает интервал обновления по изменению цен"""
+        now = time.time()
+        prices = {product.id: product.price for product in products}
+        previous = self._entries.get(key)
+
+        change_rate = previous.change_rate if previous else None
+        if previous is not None:
+            elapsed_hours = max((now - previous.fetched_at) / 3600.0, 1e-3)
+            observed = self._relative_change(previous.prices, prices) / elapsed_hours
+            alpha = self.config.volatility_alpha
+            change_rate = observed if change_rate is None else alpha * observed + (1 - alpha) * change_rate
+
+        entry = CacheEntry(
+            products=products,
+            fetched_at=now,
+            interval_seconds=self._interval_for(change_rate),
+            change_rate=change_rate,
+            prices=prices,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _relative_change(self, old: Dict[str, float], new: Dict[str, float]) -> float:
+        """Среднее относительное изменение цен по общим SKU"""
+        common = [sku for sku in new if sku in old and old[sku] > 0]
+        if not common:
+            # Ассортимент сменился целиком - считаем запрос волатильным
+            return self.config.target_change if (old or new) else 0.0
+        return sum(abs(new[sku] - old[sku]) / old[sku] for sku in common) / len(common)
+
+    def _interval_for(self, change_rate: Optional[float]) -> float:
+        """Интервал, за который ожидаемое изменение цен достигнет target_change"""
+        if change_rate is None:
+            return self.config.min_interval_seconds
+        if change_rate <= 0:
+            return self.config.max_interval_seconds
+        interval = self.config.target_change / change_rate * 3600.0
+        return max(self.config.min_interval_seconds, min(self.config.max_interval_seconds, interval))
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику кэша"""
+        return {
+            "entries": len(self._entries),
+            "fresh_entries": sum(1 for entry in self._entries.values() if entry.is_fresh()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -4,9 +4,12 @@ Ozon API gRPC сервер
 Точка входа в приложение с правильной типизацией и обработкой ошибок
 """
 import asyncio
+import hmac
+import math
 import os
 import signal
 import sys
+import time
 from typing import NoReturn
 from aiohttp import web
 import json
@@ -19,7 +22,12 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Импорты для gRPC сервера
-from infrastructure.grpc.ozon_grpc_service import serve
+from infrastructure.grpc.ozon_grpc_service import get_runtime_statistics, serve
+from infrastructure.services.price_history import price_history
+from utils.admission_control import admission_controller
+from utils.circuit_breaker import parser_circuit_breaker
+from utils.readiness import readiness
+from utils.sampling_profiler import ProfilerBusy, sampling_profiler
 
 # Импорт DDoS защиты (может быть недоступен при первом запуске)
 try:
@@ -67,14 +75,26 @@ async def health_handler(request):
         'Access-Control-Max-Age': '3600'
     }
     
+    # Разомкнутая цепь - сервис жив, но парсинг временно отключен
+    breaker_state = parser_circuit_breaker.get_state()
     return web.json_response({
-        'status': 'ok',
+        'status': 'degraded' if breaker_state['state'] == 'open' else 'ok',
         'timestamp': asyncio.get_event_loop().time(),
         'service': 'ozon-api',
-        'type': 'gRPC'
+        'type': 'gRPC',
+        'circuit_breaker': breaker_state,
     }, headers=headers)
 
 
+async def ready_handler(request):
+    """HTTP readiness check: 200 только после прогрева драйвера и успешного пробного запроса"""
+    state = readiness.get_state()
+    return web.json_response(
+        {'status': 'ready' if state['ready'] else 'warming_up', **state},
+        status=200 if state['ready'] else 503,
+    )
+
+
 async def options_handler(request):
     """Обработчик OPTIONS запросов для CORS preflight"""
     origin = request.headers.get('Origin')
@@ -129,6 +149,110 @@ async def ddos_stats_handler(request):
     return web.json_response(stats, headers=headers)
 
 
+def is_authorized(request) -> bool:
+    """Проверка Bearer токена для служебных эндпоинтов"""
+    auth_header = request.headers.get('Authorization', '')
+    expected_token = os.getenv("OZON_API_TOKEN", "")
+    # Без настроенного токена служебные эндпоинты закрыты: пустой Bearer не должен проходить
+    if not expected_token or not auth_header.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(auth_header[7:].encode(), expected_token.encode())
+
+
+async def stats_handler(request):
+    """HTTP handler для статистики нагрузки сервиса"""
+    # Проверяем аутентификацию для доступа к статистике
+    if not is_authorized(request):
+        return web.json_response(
+            {'error': 'Unauthorized'}, 
+            status=401
+        )
+    
+    stats = {
+        'admission': admission_controller.get_statistics(),
+        'price_history': price_history.get_statistics(),
+        **get_runtime_statistics(),
+    }
+    
+    headers = {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+        'Access-Control-Max-Age': '3600'
+    }
+    
+    return web.json_response(stats, headers=headers)
+
+
+def _history_window(request):
+    """
+    Окно времени из параметра hours (по умолчанию сутки)
+
+    Raises:
+        ValueError: hours не число, nan/inf или не положительное
+    """
+    hours = float(request.query.get('hours', '24'))
+    # nan/inf проходят float(), но ломают int(since) в хранилище
+    if not math.isfinite(hours) or hours <= 0:
+        raise ValueError(f"Invalid hours: {hours}")
+    # Замеры не старше эпохи: огромный hours не должен выйти за int64 колонки ts
+    return max(time.time() - hours * 3600, 0.0), None
+
+
+async def sku_history_handler(request):
+    """HTTP handler истории цен SKU"""
+    if not is_authorized(request):
+        return web.json_response({'error': 'Unauthorized'}, status=401)
+    try:
+        since, until = _history_window(request)
+    except ValueError:
+        return web.json_response({'error': 'Invalid hours'}, status=400)
+    sku = request.match_info['sku']
+    history = price_history.sku_history(sku, since, until)
+    return web.json_response({'sku': sku, 'history': history})
+
+
+async def category_distribution_handler(request):
+    """HTTP handler распределения цен категории"""
+    if not is_authorized(request):
+        return web.json_response({'error': 'Unauthorized'}, status=401)
+    try:
+        since, until = _history_window(request)
+    except ValueError:
+        return web.json_response({'error': 'Invalid hours'}, status=400)
+    distribution = price_history.category_distribution(request.match_info['category'], since, until)
+    if distribution is None:
+        return web.json_response({'error': 'No data'}, status=404)
+    return web.json_response(distribution)
+
+
+async def profile_handler(request):
+    """HTTP handler CPU профилирования: collapsed stacks за N секунд"""
+    if not is_authorized(request):
+        return web.json_response({'error': 'Unauthorized'}, status=401)
+    try:
+        seconds = float(request.query.get('seconds', '10'))
+        interval_ms = float(request.query.get('interval_ms', '10'))
+    except ValueError:
+        return web.json_response({'error': 'Invalid seconds or interval_ms'}, status=400)
+    # nan/inf проходят float() и ломают ограничения min/max профилировщика
+    if not math.isfinite(seconds) or not math.isfinite(interval_ms):
+        return web.json_response({'error': 'Invalid seconds or interval_ms'}, status=400)
+    if sampling_profiler.running:
+        return web.json_response({'error': 'Profiling is already running'}, status=409)
+
+    # Сэмплер работает в отдельном потоке и не блокирует event loop
+    try:
+        collapsed = await asyncio.to_thread(sampling_profiler.profile, seconds, interval_ms / 1000)
+    except ProfilerBusy:
+        return web.json_response({'error': 'Profiling is already running'}, status=409)
+    return web.Response(
+        text=collapsed,
+        content_type='text/plain',
+        headers={'Content-Disposition': 'attachment; filename="ozon-api.collapsed"'},
+    )
+
+
 async def start_http_server():
     """Запуск HTTP сервера для health checks с CORS защитой"""
     app = web.Application()
@@ -152,7 +276,12 @@ async def start_http_server():
     # Добавляем роуты
     app.router.add_get('/health', health_handler)
     app.router.add_options('/health', options_handler)
+    app.router.add_get('/ready', ready_handler)
     app.router.add_get('/ddos-stats', ddos_stats_handler)
+    app.router.add_get('/stats', stats_handler)
+    app.router.add_get('/history/sku/{sku}', sku_history_handler)
+    app.router.add_get('/debug/profile', profile_handler)
+    app.router.add_get('/history/category/{category}', category_distribution_handler)
     
     runner = web.AppRunner(app)
     await runner.setup()
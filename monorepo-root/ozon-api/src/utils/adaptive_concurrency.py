@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Адаптивный лимит одновременных парсингов (AIMD): растет, пока латентность страниц и
+доля блокировок в норме, и резко падает, когда Ozon начинает блокировать.
+Статический OZON_MAX_CONCURRENT_SCRAPES всегда неточен: много - блокировки, мало - простой.
+
+Сигналы приходят из потоков драйверов, лимит читает admission control в event loop
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.env import env_bool
+from utils.logger import ozon_logger
+
+
+@dataclass
+class AdaptiveConcurrencyConfig:
+    """Конфигурация адаптивного лимита"""
+    enabled: bool = False
+    initial_limit: int = 1
+    min_limit: int = 1
+    max_limit: int = 1                  # Больше слотов пула драйверов все равно не запустить
+    latency_tolerance: float = 2.0      # Во сколько раз краткосрочная латентность может превышать базовую
+    block_backoff: float = 0.5          # Множитель лимита при блокировке
+    latency_backoff: float = 0.9        # Множитель при росте латентности и таймаутах
+    cooldown_seconds: float = 30.0      # После снижения лимит не растет
+    warmup_samples: int = 5             # Замеров до первого решения по латентности
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveConcurrencyConfig":
+        """Создает конфигурацию из переменных окружения"""
+        initial = int(os.getenv("OZON_MAX_CONCURRENT_SCRAPES", "1"))
+        return cls(
+            enabled=env_bool("OZON_ADAPTIVE_CONCURRENCY", False),
+            initial_limit=initial,
+            min_limit=int(os.getenv("OZON_ADAPTIVE_MIN", "1")),
+            max_limit=int(os.getenv("OZON_ADAPTIVE_MAX", os.getenv("OZON_DRIVER_POOL_SIZE", str(initial)))),
+            latency_tolerance=float(os.getenv("OZON_ADAPTIVE_LATENCY_TOLERANCE", "2.0")),
+            block_backoff=float(os.getenv("OZON_ADAPTIVE_BLOCK_BACKOFF", "0.5")),
+            cooldown_seconds=float(os.getenv("OZON_ADAPTIVE_COOLDOWN", "30")),
+        )
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Additive increase: +1 к лимиту за каждые `limit` успешных страниц, если лимит
+    действительно использовался. Multiplicative decrease: x0.5 при блокировке,
+    x0.9 при таймауте или когда краткосрочная латентность ушла выше базовой
+    """
+
+    # Вес нового замера в краткосрочной и базовой (долгосрочной) латентности
+    SHORT_ALPHA = 0.3
+    LONG_ALPHA = 0.02
+
+    def __init__(self, config: AdaptiveConcurrencyConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self._max = max(config.min_limit, config.max_limit)
+        self._limit = float(min(max(config.initial_limit, config.min_limit), self._max))
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self._samples = 0
+        self._cooldown_until = 0.0
+        self._block_cooldown_until = 0.0
+        # Максимум одновременных парсингов с прошлого увеличения
+        self._peak_in_flight = 0
+
+        # Statistics
+        self.increases = 0
+        self.decreases = 0
+        self.blocks = 0
+        self.timeouts = 0
+
+        if config.enabled:
+            ozon_logger.logger.info(f"Адаптивный лимит параллельности включен: {config}")
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def on_admit(self, in_flight: int) -> None:
+        """Запрос получил слот; in_flight - занятых слотов вместе с ним"""
+        if not self.config.enabled:
+            return
+        with self._lock:
+            self._peak_in_flight = max(self._peak_in_flight, in_flight)
+
+    def on_success(self, latency_seconds: Optional[float] = None) -> None:
+        """Страница получена; latency_seconds - от навигации до разобранных товаров"""
+        if not self.config.enabled:
+            return
+        with self._lock:
+            if latency_seconds is not None:
+                self._record_latency(latency_seconds)
+                if (
+                    self._samples >= self.config.warmup_samples
+                    and self._short_latency > self._long_latency * self.config.latency_tolerance
+                ):
+                    self._decrease(self.config.latency_backoff, "рост латентности")
+                    return
+            if time.monotonic() < self._cooldown_until or self._limit >= self._max:
+                return
+            # Простаивающий лимит не растет: иначе всплеск нагрузки упрется сразу в блокировку
+            if self._peak_in_flight < self.limit:
+                return
+            previous = self.limit
+            self._limit = min(float(self._max), self._limit + 1.0 / self._limit)
+            if self.limit > previous:
+                self.increases += 1
+                self._peak_in_flight = 0
+                ozon_logger.logger.info(f"📈 Лимит параллельности увеличен до {self.limit}")
+
+    def on_blocked(self) -> None:
+        """Ozon вернул блокировку или капчу - резкое снижение"""
+        if not self.config.enabled:
+            return
+        with self._lock:
+            self.blocks += 1
+            # Запросы в полете блокируются пачкой - одна перегрузка снижает лимит один раз
+            if time.monotonic() < self._block_cooldown_until:
+                return
+            self._decrease(self.config.block_backoff, "блокировка", force=True)
+            self._block_cooldown_until = self._cooldown_until
+
+    def on_timeout(self) -> None:
+        """Страница не загрузилась за отведенное время"""
+        if not self.config.enabled:
+            return
+        with self._lock:
+            self.timeouts += 1
+            self._decrease(self.config.latency_backoff, "таймаут загрузки")
+
+    def _record_latency(self, latency: float) -> None:
+        self._samples += 1
+        if self._short_latency is None:
+            self._short_latency = self._long_latency = latency
+            return
+        self._short_latency += self.SHORT_ALPHA * (latency - self._short_latency)
+        self._long_latency += self.LONG_ALPHA * (latency - self._long_latency)
+
+    def _decrease(self, factor: float, reason: str, force: bool = False) -> None:
+        now = time.monotonic()
+        # Одна перегрузка дает серию сигналов от запросов в полете - снижаем один раз;
+        # блокировка снижает лимит, даже если он только что снижен из-за латентности
+        if now < self._cooldown_until and not force:
+            return
+        previous = self.limit
+        self._limit = max(float(self.config.min_limit), self._limit * factor)
+        self._cooldown_until = now + self.config.cooldown_seconds
+        self._peak_in_flight = 0
+        if self.limit < previous:
+            self.decreases += 1
+            ozon_logger.logger.warning(f"📉 Лимит параллельности снижен до {self.limit} ({reason})")
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику адаптивного лимита"""
+        with self._lock:
+            return {
+                "enabled": self.config.enabled,
+                "limit": self.limit,
+                "min_limit": self.config.min_limit,
+                "max_limit": self._max,
+                "short_latency_seconds": round(self._short_latency, 3) if self._short_latency is not None else None,
+                "baseline_latency_seconds": round(self._long_latency, 3) if self._long_latency is not None else None,
+                "cooling_down": time.monotonic() < self._cooldown_until,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "blocks": self.blocks,
+                "timeouts": self.timeouts,
+            }
+
+
+# Глобальный экземпляр адаптивного лимита
+adaptive_limit = AdaptiveConcurrencyLimit(AdaptiveConcurrencyConfig.from_env())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Admission control для gRPC запросов парсинга: ограниченная очередь и сброс нагрузки
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from utils.adaptive_concurrency import AdaptiveConcurrencyLimit, adaptive_limit
+from utils.logger import ozon_logger
+from utils.priority_scheduler import BACKGROUND, DEFAULT_WEIGHTS, INTERACTIVE, WeightedFairScheduler
+
+
+@dataclass
+class AdmissionConfig:
+    """Конфигурация admission control"""
+    max_concurrent: int = 1                      # Одновременных парсингов (слотов браузера)
+    max_queue_size: int = 20                     # Максимум ожидающих запросов в каждом классе приоритета
+    interactive_weight: int = DEFAULT_WEIGHTS[INTERACTIVE]
+    background_weight: int = DEFAULT_WEIGHTS[BACKGROUND]
+    initial_service_time_seconds: float = 8.0    # Оценка времени парсинга до первых замеров
+    ewma_alpha: float = 0.2                      # Вес нового замера в скользящем среднем
+    max_concurrent_rpcs: int = 100               # Жесткий лимит gRPC сервера на все RPC
+
+    @classmethod
+    def from_env(cls) -> "AdmissionConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            max_concurrent=int(os.getenv("OZON_MAX_CONCURRENT_SCRAPES", "1")),
+            max_queue_size=int(os.getenv("OZON_ADMISSION_QUEUE_SIZE", "20")),
+            interactive_weight=int(os.getenv("OZON_INTERACTIVE_WEIGHT", str(DEFAULT_WEIGHTS[INTERACTIVE]))),
+            background_weight=int(os.getenv("OZON_BACKGROUND_WEIGHT", str(DEFAULT_WEIGHTS[BACKGROUND]))),
+            max_concurrent_rpcs=int(os.getenv("OZON_MAX_CONCURRENT_RPCS", "100")),
+        )
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонен до постановки в очередь"""
+
+    def __init__(self, reason: str, retry_after_seconds: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """Ограниченная очередь перед браузером с оценкой ожидания по недавним временам обслуживания"""
+
+    def __init__(self, config: AdmissionConfig, limiter: Optional[AdaptiveConcurrencyLimit] = None) -> None:
+        self.config = config
+        # Адаптивный лимит заменяет статический max_concurrent
+        self.limiter = limiter
+        # Слоты браузера раздаются классам приоритета по весам
+        self.scheduler = WeightedFairScheduler(
+            config.max_concurrent,
+            {INTERACTIVE: config.interactive_weight, BACKGROUND: config.background_weight},
+        )
+        self._service_time = config.initial_service_time_seconds
+
+        # Statistics
+        self.admitted_requests = 0
+        self.rejected_requests = 0
+        self.extra_admitted = 0
+
+        ozon_logger.logger.info(f"Admission control инициализирован с конфигурацией: {config}")
+
+    def _sync_capacity(self) -> None:
+        """Переносит текущий адаптивный лимит в планировщик (только из event loop)"""
+        if self.limiter is not None and self.limiter.limit != self.scheduler.capacity:
+            self.scheduler.set_capacity(self.limiter.limit)
+
+    def estimate_wait(self, priority: str = INTERACTIVE) -> float:
+        """Оценка ожидания в очереди для нового запроса класса priority, сек"""
+        self._sync_capacity()
+        scheduler = self.scheduler
+        if scheduler.active < scheduler.capacity and scheduler.waiting() == 0:
+            return 0.0
+        # Запросы, которые получат слот раньше, плюс освобождение занятого слота
+        ahead = scheduler.slots_ahead(priority) + max(0, scheduler.active - scheduler.capacity + 1)
+        return ahead * self._service_time / scheduler.capacity
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejected:
+        self.rejected_requests += 1
+        ozon_logger.logger.warning(
+            f"Запрос отклонен admission control: {reason} (retry-after {retry_after:.1f}s)"
+        )
+        return AdmissionRejected(reason, retry_after)
+
+    @asynccontextmanager
+    async def admit(
+        self, time_remaining: Optional[float] = None, priority: str = INTERACTIVE
+    ) -> AsyncIterator[None]:
+        """
+        Занимает слот парсинга или сразу отклоняет запрос
+
+        Args:
+            time_remaining: Остаток дедлайна клиента в секундах (None - без дедлайна)
+            priority: Класс приоритета ('interactive' или 'background')
+
+        Raises:
+            AdmissionRejected: Очередь заполнена или дедлайн заведомо не будет выполнен
+        """
+        expected_wait = self.estimate_wait(priority)
+
+        # Лимит очереди на класс: поток фоновых запросов не вытесняет интерактивные
+        if self.scheduler.waiting(priority) >= self.config.max_queue_size:
+            raise self._reject(f"{priority} queue is full", expected_wait)
+
+        if time_remaining is not None and expected_wait + self._service_time > time_remaining:
+            raise self._reject(
+                f"deadline cannot be met: expected {expected_wait + self._service_time:.1f}s, "
+                f"remaining {time_remaining:.1f}s",
+                expected_wait,
+            )
+
+        if time_remaining is None:
+            await self.scheduler.acquire(priority)
+        else:
+            # Оценка могла ошибиться - не ждем дольше дедлайна клиента
+            try:
+                await asyncio.wait_for(self.scheduler.acquire(priority), timeout=time_remaining)
+            except asyncio.TimeoutError:
+                raise self._reject("deadline expired in queue", self.estimate_wait(priority)) from None
+
+        self.admitted_requests += 1
+        if self.limiter is not None:
+            self.limiter.on_admit(self.scheduler.active)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record_service_time(time.monotonic() - started)
+            self.scheduler.release()
+            self._sync_capacity()
+
+    def try_admit_extra(self, priority: str = INTERACTIVE) -> bool:
+        """
+        Слот для дополнительной попытки уже принятого запроса (хедж) без ожидания:
+        только если он свободен и никто не ждет в очереди. Вернуть - release_extra()
+        """
+        self._sync_capacity()
+        if not self.scheduler.try_acquire(priority):
+            return False
+        self.extra_admitted += 1
+        return True
+
+    def release_extra(self) -> None:
+        """Освобождает слот, выданный try_admit_extra"""
+        self.scheduler.release()
+        self._sync_capacity()
+
+    def _record_service_time(self, duration: float) -> None:
+        """Обновляет скользящее среднее времени обслуживания"""
+        alpha = self.config.ewma_alpha
+        self._service_time = alpha * duration + (1 - alpha) * self._service_time
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику admission control"""
+        return {
+            "active": self.scheduler.active,
+            "waiting": {name: self.scheduler.waiting(name) for name in self.scheduler.weights},
+            "granted": dict(self.scheduler.granted),
+            "max_concurrent": self.scheduler.capacity,
+            "max_queue_size": self.config.max_queue_size,
+            "service_time_seconds": round(self._service_time, 3),
+            "estimated_wait_seconds": round(self.estimate_wait(), 3),
+            "admitted_requests": self.admitted_requests,
+            "rejected_requests": self.rejected_requests,
+            "extra_admitted": self.extra_admitted,
+        }
+
+
+# Глобальный экземпляр admission control
+admission_controller = AdmissionController(
+    AdmissionConfig.from_env(), adaptive_limit if adaptive_limit.config.enabled else None
+)
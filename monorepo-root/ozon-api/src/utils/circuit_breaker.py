@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker для парсера: closed -> open -> half-open -> closed
+"""
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Tuple
+
+from utils.logger import ozon_logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Конфигурация circuit breaker"""
+    window_seconds: float = 60.0          # Окно, по которому считается доля ошибок
+    min_requests: int = 5                 # Меньше запросов в окне - не размыкаемся
+    failure_rate_threshold: float = 0.5   # Доля ошибок, при которой цепь размыкается
+    base_open_seconds: float = 15.0       # Первое размыкание; каждое следующее подряд - вдвое дольше
+    max_open_seconds: float = 300.0
+    half_open_max_probes: int = 1         # Пробных запросов одновременно в half-open
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakerConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            window_seconds=float(os.getenv("OZON_BREAKER_WINDOW", "60")),
+            min_requests=int(os.getenv("OZON_BREAKER_MIN_REQUESTS", "5")),
+            failure_rate_threshold=float(os.getenv("OZON_BREAKER_FAILURE_RATE", "0.5")),
+            base_open_seconds=float(os.getenv("OZON_BREAKER_OPEN_SECONDS", "15")),
+            max_open_seconds=float(os.getenv("OZON_BREAKER_MAX_OPEN_SECONDS", "300")),
+        )
+
+
+class CircuitOpenError(Exception):
+    """Цепь разомкнута: запрос не выполняется"""
+
+    def __init__(self, retry_after_seconds: float):
+        self.retry_after_seconds = retry_after_seconds
+        super().__init__(f"Circuit breaker is open, retry after {retry_after_seconds:.1f}s")
+
+
+class CircuitBreaker:
+    """Размыкается по доле ошибок в окне, восстанавливается через пробные запросы"""
+
+    def __init__(self, config: CircuitBreakerConfig) -> None:
+        self.config = config
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._open_until = 0.0
+        self._consecutive_trips = 0
+        self._probes_in_flight = 0
+
+        # Statistics
+        self.trips = 0
+        self.rejected = 0
+
+        ozon_logger.logger.info(f"Circuit breaker инициализирован с конфигурацией: {config}")
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.config.window_seconds:
+            self._outcomes.popleft()
+
+    def failure_rate(self) -> float:
+        self._prune(time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def retry_after(self) -> float:
+        return max(0.0, self._open_until - time.monotonic())
+
+    def is_available(self) -> bool:
+        """Пропустит ли цепь запрос сейчас (без занятия пробного слота)"""
+        if self.state == OPEN:
+            return self.retry_after() == 0.0
+        if self.state == HALF_OPEN:
+            return self._probes_in_flight < self.config.half_open_max_probes
+        return True
+
+    def before_request(self) -> None:
+        """
+        Резервирует выполнение запроса
+
+        Raises:
+            CircuitOpenError: Цепь разомкнута или пробный слот занят
+        """
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.retry_after())
+            self.state = HALF_OPEN
+            ozon_logger.logger.info("🟡 Circuit breaker: half-open, пропускаем пробный запрос")
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.config.half_open_max_probes:
+                self.rejected += 1
+                raise CircuitOpenError(1.0)
+            self._probes_in_flight += 1
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self.state = CLOSED
+            self._consecutive_trips = 0
+            self._outcomes.clear()
+            ozon_logger.logger.info("🟢 Circuit breaker: пробный запрос успешен, цепь замкнута")
+            return
+        self._record(True)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._trip("пробный запрос не удался")
+            return
+        self._record(False)
+        if (
+            self.state == CLOSED
+            and len(self._outcomes) >= self.config.min_requests
+            and self.failure_rate() >= self.config.failure_rate_threshold
+        ):
+            self._trip(f"доля ошибок {self.failure_rate():.0%}")
+
+    def record_neutral(self) -> None:
+        """Исход не говорит о здоровье парсера (например, клиент отменил запрос)"""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, ok: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        self._prune(now)
+
+    def _trip(self, reason: str) -> None:
+        duration = min(
+            self.config.max_open_seconds,
+            self.config.base_open_seconds * (2 ** self._consecutive_trips),
+        )
+        self._consecutive_trips += 1
+        self.trips += 1
+        self.state = OPEN
+        self._open_until = time.monotonic() + duration
+        self._outcomes.clear()
+        ozon_logger.logger.warning(f"🔴 Circuit breaker разомкнут на {duration:.0f}с: {reason}")
+
+    def get_state(self) -> dict:
+        """Состояние для health endpoint"""
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "consecutive_trips": self._consecutive_trips,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+# Глобальный экземпляр circuit breaker парсера
+parser_circuit_breaker = CircuitBreaker(CircuitBreakerConfig.from_env())
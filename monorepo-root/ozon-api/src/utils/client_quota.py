@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Квоты клиентов по фактической стоимости запросов: браузеро-секунды + исходящие
+запросы к Ozon. Дешевый ответ из кэша почти ничего не стоит, тяжелый парсинг с
+повторами и хеджированием - дорого; лимит по числу запросов этого не различает.
+
+Каждый клиент - token bucket в единицах стоимости (1 единица = 1 секунда занятого
+браузера): пополняется со скоростью доли клиента от мощности пула, копит запас до burst.
+Стоимость известна только после парсинга, поэтому баланс может уйти в минус -
+новые запросы клиента отклоняются, пока долг не погашен пополнением
+"""
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from utils.env import env_bool
+from utils.logger import ozon_logger
+
+# Сколько клиентов отслеживается одновременно (id приходит из metadata)
+MAX_TRACKED_CLIENTS = 1000
+
+
+@dataclass
+class ClientQuotaConfig:
+    """Конфигурация квот клиентов"""
+    enabled: bool = False
+    capacity: float = 1.0                 # Единиц стоимости в секунду на весь сервис (≈ слотов браузера)
+    default_share: float = 0.25           # Доля мощности клиента без явной настройки
+    shares: Dict[str, float] = field(default_factory=dict)  # Доли по client id
+    burst_seconds: float = 120.0          # Запас: сколько секунд пополнения клиент может потратить разом
+    outbound_request_cost: float = 2.0    # Стоимость исходящего запроса в браузеро-секундах
+
+    @staticmethod
+    def _parse_shares(raw: str) -> Dict[str, float]:
+        """'product-filter-service=0.6,crawler=0.1' -> {client: share}"""
+        shares: Dict[str, float] = {}
+        for item in raw.split(","):
+            client, _, share = item.partition("=")
+            if client.strip() and share.strip():
+                shares[client.strip()] = float(share)
+        return shares
+
+    @classmethod
+    def from_env(cls) -> "ClientQuotaConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            enabled=env_bool("OZON_QUOTA_ENABLED", False),
+            # По умолчанию мощность = число параллельных парсингов
+            capacity=float(os.getenv("OZON_QUOTA_CAPACITY", os.getenv("OZON_MAX_CONCURRENT_SCRAPES", "1"))),
+            default_share=float(os.getenv("OZON_QUOTA_DEFAULT_SHARE", "0.25")),
+            shares=cls._parse_shares(os.getenv("OZON_QUOTA_SHARES", "")),
+            burst_seconds=float(os.getenv("OZON_QUOTA_BURST_SECONDS", "120")),
+            outbound_request_cost=float(os.getenv("OZON_QUOTA_OUTBOUND_COST", "2")),
+        )
+
+
+class QuotaExceeded(Exception):
+    """Клиент израсходовал квоту; новый запрос можно будет выполнить через retry_after_seconds"""
+
+    def __init__(self, quota: "ClientQuota", retry_after_seconds: float) -> None:
+        super().__init__(f"Quota exceeded for {quota.client_id}")
+        self.quota = quota
+        self.client_id = quota.client_id
+        self.retry_after_seconds = retry_after_seconds
+
+
+class ClientQuota:
+    """Token bucket одного клиента в единицах стоимости"""
+
+    def __init__(self, client_id: str, rate: float, burst: float) -> None:
+        self.client_id = client_id
+        self.rate = rate
+        self.burst = burst
+        self._balance = burst
+        self._updated_at = time.monotonic()
+
+        # Statistics
+        self.requests = 0
+        self.rejected = 0
+        self.browser_seconds = 0.0
+        self.outbound_requests = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._balance = min(self.burst, self._balance + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    @property
+    def balance(self) -> float:
+        self._refill()
+        return self._balance
+
+    def charge(self, cost: float) -> None:
+        self._refill()
+        self._balance -= cost
+
+
+class RequestCost:
+    """
+    Стоимость одного запроса. Каждое добавление сразу списывается с квоты клиента -
+    в том числе от брошенного хеджа, который досчитывает после ответа клиенту
+    """
+
+    def __init__(self, quotas: "ClientQuotas", quota: ClientQuota) -> None:
+        self._quotas = quotas
+        self.quota = quota
+        self.browser_seconds = 0.0
+        self.outbound_requests = 0
+
+    @property
+    def units(self) -> float:
+        return self.browser_seconds + self.outbound_requests * self._quotas.config.outbound_request_cost
+
+    def add(self, browser_seconds: float, outbound_requests: int) -> None:
+        self.browser_seconds += browser_seconds
+        self.outbound_requests += outbound_requests
+        self.quota.browser_seconds += browser_seconds
+        self.quota.outbound_requests += outbound_requests
+        self.quota.charge(browser_seconds + outbound_requests * self._quotas.config.outbound_request_cost)
+
+
+# Стоимость запроса, который сейчас обслуживается (копируется в задачи парсинга и хеджей)
+current_request_cost: ContextVar[Optional[RequestCost]] = ContextVar("current_request_cost", default=None)
+
+
+class ClientQuotas:
+    """Квоты всех клиентов"""
+
+    def __init__(self, config: ClientQuotaConfig) -> None:
+        self.config = config
+        self._quotas: "OrderedDict[str, ClientQuota]" = OrderedDict()
+
+        if config.enabled:
+            ozon_logger.logger.info(f"Квоты клиентов включены: {config}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    def _quota(self, client_id: str) -> ClientQuota:
+        quota = self._quotas.get(client_id)
+        if quota is None:
+            share = self.config.shares.get(client_id, self.config.default_share)
+            rate = max(self.config.capacity * share, 1e-6)
+            quota = ClientQuota(client_id, rate, rate * self.config.burst_seconds)
+            self._quotas[client_id] = quota
+            if len(self._quotas) > MAX_TRACKED_CLIENTS:
+                self._quotas.popitem(last=False)
+        else:
+            self._quotas.move_to_end(client_id)
+        return quota
+
+    def begin(self, client_id: str) -> RequestCost:
+        """
+        Проверяет квоту клиента и начинает учет стоимости запроса
+
+        Raises:
+            QuotaExceeded: Баланс клиента не положительный
+        """
+        quota = self._quota(client_id)
+        quota.requests += 1
+        balance = quota.balance
+        if balance <= 0:
+            quota.rejected += 1
+            raise QuotaExceeded(quota, -balance / quota.rate)
+        return RequestCost(self, quota)
+
+    @staticmethod
+    def metadata(quota: ClientQuota, cost_units: float = 0.0) -> Tuple[Tuple[str, str], ...]:
+        """Состояние квоты для trailing metadata ответа"""
+        balance = quota.balance
+        return (
+            ("x-quota-remaining", f"{max(balance, 0.0):.1f}"),
+            ("x-quota-limit", f"{quota.burst:.1f}"),
+            ("x-quota-rate", f"{quota.rate:.3f}"),
+            ("x-quota-cost", f"{cost_units:.2f}"),
+            ("x-quota-reset-ms", str(int(max(quota.burst - balance, 0.0) / quota.rate * 1000))),
+        )
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику квот по клиентам"""
+        return {
+            "enabled": self.config.enabled,
+            "capacity": self.config.capacity,
+            "clients": {
+                client_id: {
+                    "share": round(quota.rate / self.config.capacity, 3) if self.config.capacity else 0.0,
+                    "balance": round(quota.balance, 1),
+                    "burst": round(quota.burst, 1),
+                    "requests": quota.requests,
+                    "rejected": quota.rejected,
+                    "browser_seconds": round(quota.browser_seconds, 1),
+                    "outbound_requests": quota.outbound_requests,
+                }
+                for client_id, quota in self._quotas.items()
+            },
+        }
+
+
+# Глобальный экземпляр квот клиентов
+client_quotas = ClientQuotas(ClientQuotaConfig.from_env())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Бюджет времени запроса, передаваемый от gRPC слоя до парсера
+"""
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Бюджет запроса исчерпан или клиент отменил RPC"""
+
+    def __init__(self, stage: str, cancelled: bool = False) -> None:
+        reason = "cancelled" if cancelled else "deadline exceeded"
+        super().__init__(f"Request {reason} before stage '{stage}'")
+        self.stage = stage
+        self.cancelled = cancelled
+
+
+class Deadline:
+    """Дедлайн запроса с проверкой отмены на границах этапов парсинга"""
+
+    def __init__(
+        self,
+        budget_seconds: Optional[float] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        # None - клиент не задал дедлайн, ограничиваемся только отменой
+        self._expires_at = time.monotonic() + budget_seconds if budget_seconds is not None else None
+        self._is_cancelled = is_cancelled
+
+    @classmethod
+    def from_grpc_context(cls, context) -> "Deadline":
+        """Создает дедлайн из context.time_remaining() и context.cancelled()"""
+        return cls(context.time_remaining(), getattr(context, "cancelled", None))
+
+    def remaining(self) -> Optional[float]:
+        """Оставшееся время в секундах (None - без дедлайна)"""
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def cancelled(self) -> bool:
+        """Отменен ли RPC клиентом"""
+        return bool(self._is_cancelled and self._is_cancelled())
+
+    def expired(self) -> bool:
+        """Исчерпан ли бюджет или отменен запрос"""
+        remaining = self.remaining()
+        return self.cancelled() or (remaining is not None and remaining <= 0)
+
+    def check(self, stage: str) -> None:
+        """Прерывает работу на границе этапа, если продолжать бессмысленно"""
+        if self.cancelled():
+            raise DeadlineExceeded(stage, cancelled=True)
+        if self.expired():
+            raise DeadlineExceeded(stage)
+
+    def cap(self, timeout: float) -> float:
+        """Ограничивает таймаут этапа оставшимся бюджетом"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Чтение переменных окружения
+"""
+import os
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Читает булево значение из переменной окружения"""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Хеджирование парсинга: второй запрос на другом драйвере, если первый отстает
+"""
+import os
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+from utils.env import env_bool
+
+
+@dataclass
+class HedgingConfig:
+    """Конфигурация хеджирования"""
+    enabled: bool = False
+    quantile: float = 90.0          # Хедж стартует, когда запрос дольше p90 категории
+    min_samples: int = 10           # До этого числа замеров категория не хеджируется
+    history_size: int = 100         # Замеров на категорию для оценки квантиля
+    max_hedge_ratio: float = 0.1    # Хеджей не больше 10% от запросов в окне
+    window_seconds: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "HedgingConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            enabled=env_bool("OZON_HEDGING_ENABLED", False),
+            quantile=float(os.getenv("OZON_HEDGE_QUANTILE", "90")),
+            max_hedge_ratio=float(os.getenv("OZON_HEDGE_MAX_RATIO", "0.1")),
+        )
+
+
+class HedgingPolicy:
+    """Скользящий квантиль латентности по категориям и лимит доли хеджей"""
+
+    def __init__(self, config: HedgingConfig) -> None:
+        self.config = config
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=config.history_size))
+        self._requests: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+
+        # Statistics
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record_latency(self, category: str, seconds: float) -> None:
+        self._latencies[category].append(seconds)
+
+    def hedge_delay(self, category: str) -> Optional[float]:
+        """Через сколько секунд запускать хедж (None - данных пока мало)"""
+        samples = self._latencies.get(category)
+        if not samples or len(samples) < self.config.min_samples:
+            return None
+        return float(np.percentile(np.fromiter(samples, dtype=np.float64), self.config.quantile))
+
+    def _prune(self, now: float) -> None:
+        for events in (self._requests, self._hedges):
+            while events and now - events[0] > self.config.window_seconds:
+                events.popleft()
+
+    def on_request(self) -> None:
+        now = time.monotonic()
+        self._requests.append(now)
+        self._prune(now)
+
+    def try_hedge(self) -> bool:
+        """Резервирует хедж, если не превышена доля хеджей"""
+        now = time.monotonic()
+        self._prune(now)
+        if len(self._hedges) + 1 > self.config.max_hedge_ratio * len(self._requests):
+            return False
+        self._hedges.append(now)
+        self.hedged += 1
+        return True
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику хеджирования"""
+        return {
+            "enabled": self.config.enabled,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "p90_by_category": {
+                category: round(delay, 2)
+                for category in self._latencies
+                if (delay := self.hedge_delay(category)) is not None
+            },
+        }
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Глобальный бюджет исходящих запросов к Ozon (token bucket)
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from utils.logger import ozon_logger
+
+
+@dataclass
+class OutboundBudgetConfig:
+    """Конфигурация бюджета исходящих запросов"""
+    requests_per_minute: float = 30.0    # Устойчивая скорость запросов к Ozon
+    burst: int = 10                      # Максимальный запас токенов
+    background_reserve: float = 0.5      # Доля запаса, которую фоновая работа не трогает
+
+    @classmethod
+    def from_env(cls) -> "OutboundBudgetConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            requests_per_minute=float(os.getenv("OZON_OUTBOUND_RPM", "30")),
+            burst=int(os.getenv("OZON_OUTBOUND_BURST", "10")),
+            background_reserve=float(os.getenv("OZON_OUTBOUND_BACKGROUND_RESERVE", "0.5")),
+        )
+
+
+class OutboundBudget:
+    """Token bucket на все исходящие навигации браузера"""
+
+    def __init__(self, config: OutboundBudgetConfig) -> None:
+        self.config = config
+        # consume вызывают потоки драйверов, has_headroom - event loop
+        self._lock = threading.Lock()
+        self._tokens = float(config.burst)
+        self._updated_at = time.monotonic()
+
+        # Statistics
+        self.consumed = 0
+        self.denied = 0
+
+        ozon_logger.logger.info(f"Бюджет исходящих запросов инициализирован: {config}")
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        rate = self.config.requests_per_minute / 60.0
+        self._tokens = min(float(self.config.burst), self._tokens + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+    def consume(self, amount: float = 1.0) -> None:
+        """Списывает исходящую навигацию (не блокирует, баланс не уходит ниже нуля)"""
+        with self._lock:
+            self._refill()
+            self._tokens = max(0.0, self._tokens - amount)
+            self.consumed += 1
+
+    def has_headroom(self, amount: float = 1.0) -> bool:
+        """Можно ли запустить фоновую/дополнительную работу, не трогая резерв для клиентов"""
+        with self._lock:
+            self._refill()
+            reserve = self.config.burst * self.config.background_reserve
+            if self._tokens - amount < reserve:
+                self.denied += 1
+                return False
+            return True
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику бюджета"""
+        with self._lock:
+            self._refill()
+            return {
+                "tokens": round(self._tokens, 2),
+                "burst": self.config.burst,
+                "requests_per_minute": self.config.requests_per_minute,
+                "consumed": self.consumed,
+                "denied": self.denied,
+            }
+
+
+# Глобальный экземпляр бюджета исходящих запросов
+outbound_budget = OutboundBudget(OutboundBudgetConfig.from_env())
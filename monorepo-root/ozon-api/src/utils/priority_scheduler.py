@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Взвешенный справедливый планировщик слотов парсинга по классам приоритета
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Deque, Dict, Optional
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Интерактивные запросы (бот) получают 4 слота из 5 при конкуренции,
+# фоновые обновления категорий - минимум 1 из 5 и не голодают
+DEFAULT_WEIGHTS: Dict[str, int] = {INTERACTIVE: 4, BACKGROUND: 1}
+
+
+class WeightedFairScheduler:
+    """Раздает освободившиеся слоты очередям классов по smooth weighted round-robin"""
+
+    def __init__(self, capacity: int, weights: Optional[Dict[str, int]] = None) -> None:
+        self.capacity = capacity
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self._queues: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in self.weights}
+        self._current: Dict[str, int] = {name: 0 for name in self.weights}
+        self._active = 0
+        self.granted: Dict[str, int] = {name: 0 for name in self.weights}
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def waiting(self, priority: Optional[str] = None) -> int:
+        """Количество ожидающих запросов (всего или в классе)"""
+        if priority is not None:
+            return len(self._queues[priority])
+        return sum(len(queue) for queue in self._queues.values())
+
+    def slots_ahead(self, priority: str) -> int:
+        """Сколько слотов будет выдано раньше нового запроса класса priority"""
+        own = len(self._queues[priority])
+        ahead = own
+        for name, queue in self._queues.items():
+            if name == priority or not queue:
+                continue
+            # За время обслуживания own+1 запросов класса другие классы получают долю по весу
+            share = math.ceil((own + 1) * self.weights[name] / self.weights[priority])
+            ahead += min(len(queue), share)
+        return ahead
+
+    async def acquire(self, priority: str) -> None:
+        """Ожидает слот для запроса класса priority"""
+        if self._active < self.capacity and self.waiting() == 0:
+            self._grant(priority)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Слот уже выдан, но ожидающий ушел - отдаем слот следующему
+                self.release()
+            elif future in self._queues[priority]:
+                self._queues[priority].remove(future)
+            raise
+
+    def try_acquire(self, priority: str) -> bool:
+        """Слот без ожидания: только если он свободен и очередь пуста"""
+        if self._active < self.capacity and self.waiting() == 0:
+            self._grant(priority)
+            return True
+        return False
+
+    def set_capacity(self, capacity: int) -> None:
+        """Меняет число слотов; при уменьшении лишние слоты уходят по мере освобождения"""
+        self.capacity = capacity
+        self._dispatch()
+
+    def release(self) -> None:
+        """Освобождает слот и передает его следующему классу по весам"""
+        self._active -= 1
+        self._dispatch()
+
+    def _grant(self, priority: str) -> None:
+        self._active += 1
+        self.granted[priority] += 1
+
+    def _dispatch(self) -> None:
+        while self._active < self.capacity:
+            priority = self._next_class()
+            if priority is None:
+                return
+            future = self._queues[priority].popleft()
+            if future.cancelled():
+                continue
+            self._grant(priority)
+            future.set_result(None)
+
+    def _next_class(self) -> Optional[str]:
+        """Smooth weighted round-robin среди непустых очередей"""
+        candidates = [name for name, queue in self._queues.items() if queue]
+        if not candidates:
+            return None
+        total = sum(self.weights[name] for name in candidates)
+        for name in candidates:
+            self._current[name] += self.weights[name]
+        chosen = max(candidates, key=lambda name: self._current[name])
+        self._current[chosen] -= total
+        return chosen
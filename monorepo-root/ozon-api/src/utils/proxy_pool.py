@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Пул исходящих прокси: лимиты Ozon считаются по IP, и без прокси пропускная
+способность упирается в один адрес, сколько бы браузеров ни работало.
+
+Прокси закрепляется за слотом, запускающим Chrome (sticky: cookies и репутация
+сессии живут на одном IP), и меняется, только когда его оценка плохая:
+блокировка - резкое падение здоровья и экспоненциальный cool-down, сетевые
+ошибки - мягкое падение и cool-down после серии подряд
+"""
+import os
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from utils.logger import ozon_logger
+from utils.retry_policy import BLOCKED, DRIVER, PAGE_LOAD
+
+PROXY_SCHEMES = ("http", "https", "socks4", "socks5")
+
+
+@dataclass
+class ProxyPoolConfig:
+    """Конфигурация пула прокси"""
+    proxies: List[str] = field(default_factory=list)  # Пусто - трафик идет напрямую
+    block_cooldown_seconds: float = 300.0     # Cool-down после первой блокировки, удваивается
+    max_cooldown_seconds: float = 3600.0
+    failure_cooldown_seconds: float = 60.0    # Cool-down после серии сетевых ошибок
+    failures_before_cooldown: int = 3
+    min_health: float = 0.3                   # Ниже - слот переезжает на более здоровый прокси
+
+    @staticmethod
+    def _parse_proxies(raw: str) -> List[str]:
+        """'http://10.0.0.1:3128,socks5://10.0.0.2:1080' -> список адресов"""
+        proxies = []
+        for item in raw.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            parsed = urllib.parse.urlsplit(item if "://" in item else f"http://{item}")
+            if parsed.scheme not in PROXY_SCHEMES or not parsed.hostname or not parsed.port:
+                raise ValueError(f"Некорректный прокси в OZON_PROXIES: {item}")
+            if parsed.username or parsed.password:
+                # --proxy-server Chrome не принимает логин/пароль
+                raise ValueError(f"Прокси с авторизацией не поддерживаются, используйте доступ по IP: {item}")
+            proxies.append(f"{parsed.scheme}://{parsed.hostname}:{parsed.port}")
+        return proxies
+
+    @classmethod
+    def from_env(cls) -> "ProxyPoolConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            proxies=cls._parse_proxies(os.getenv("OZON_PROXIES", "")),
+            block_cooldown_seconds=float(os.getenv("OZON_PROXY_BLOCK_COOLDOWN", "300")),
+            max_cooldown_seconds=float(os.getenv("OZON_PROXY_MAX_COOLDOWN", "3600")),
+            failure_cooldown_seconds=float(os.getenv("OZON_PROXY_FAILURE_COOLDOWN", "60")),
+            failures_before_cooldown=int(os.getenv("OZON_PROXY_FAILURES_BEFORE_COOLDOWN", "3")),
+            min_health=float(os.getenv("OZON_PROXY_MIN_HEALTH", "0.3")),
+        )
+
+
+class Proxy:
+    """Прокси и его оценка: health в [0, 1], блокировки и ошибки подряд, cool-down"""
+
+    def __init__(self, server: str) -> None:
+        self.server = server
+        self.health = 1.0
+        self.consecutive_blocks = 0
+        self.consecutive_failures = 0
+        self.cooling_until = 0.0
+        self.slots: Set[int] = set()
+
+        # Statistics
+        self.successes = 0
+        self.blocks = 0
+        self.failures = 0
+
+    def cooling(self, now: float) -> bool:
+        return now < self.cooling_until
+
+
+class ProxyPool:
+    """Закрепление прокси за слотами и оценка их здоровья (вызывается из потоков драйверов)"""
+
+    def __init__(self, config: ProxyPoolConfig) -> None:
+        self.config = config
+        self._lock = threading.Lock()
+        self.proxies = [Proxy(server) for server in config.proxies]
+        self._assigned: Dict[int, Proxy] = {}
+
+        # Statistics
+        self.rotations = 0
+
+        if self.proxies:
+            ozon_logger.logger.info(f"Пул прокси: {len(self.proxies)} адресов")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.proxies)
+
+    def _refresh(self, now: float) -> None:
+        """Прокси после cool-down снова годен к выдаче с минимальным здоровьем"""
+        for proxy in self.proxies:
+            if proxy.cooling_until and not proxy.cooling(now):
+                proxy.cooling_until = 0.0
+                proxy.health = max(proxy.health, self.config.min_health)
+
+    def _healthy(self, proxy: Proxy, now: float) -> bool:
+        return not proxy.cooling(now) and proxy.health >= self.config.min_health
+
+    def _best(self, now: float, exclude: Optional[Proxy] = None) -> Optional[Proxy]:
+        """Свободный от cool-down прокси: меньше слотов, затем выше здоровье"""
+        candidates = [proxy for proxy in self.proxies if proxy is not exclude and not proxy.cooling(now)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda proxy: (len(proxy.slots), -proxy.health))
+
+    def assign(self, slot: int) -> Optional[Proxy]:
+        """
+        Прокси для запуска Chrome слота. Закрепленный прокси сохраняется, пока здоров;
+        если в cool-down все - берется тот, чей cool-down кончится раньше
+        """
+        if not self.proxies:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+            current = self._assigned.get(slot)
+            if current is not None and self._healthy(current, now):
+                return current
+            proxy = self._best(now) or min(self.proxies, key=lambda proxy: proxy.cooling_until)
+            if proxy is not current:
+                if current is not None:
+                    current.slots.discard(slot)
+                    self.rotations += 1
+                    ozon_logger.logger.info(f"🔀 Слот {slot}: прокси {current.server} -> {proxy.server}")
+                proxy.slots.add(slot)
+                self._assigned[slot] = proxy
+            return proxy
+
+    def needs_rotation(self, slot: int) -> bool:
+        """Закрепленный прокси плох, и есть лучший - Chrome слота стоит перезапустить"""
+        if not self.proxies:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+            current = self._assigned.get(slot)
+            if current is None or self._healthy(current, now):
+                return False
+            best = self._best(now, exclude=current)
+            return best is not None and (current.cooling(now) or best.health > current.health)
+
+    def report(self, proxy: Optional[Proxy], error_class: Optional[str] = None) -> None:
+        """
+        Результат запроса через прокси: None - успех, BLOCKED - блокировка,
+        PAGE_LOAD/DRIVER - сетевая ошибка (прокси недоступен, туннель не открылся).
+        Остальные классы ошибок к прокси не относятся
+        """
+        if proxy is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if error_class is None:
+                proxy.successes += 1
+                proxy.health += 0.2 * (1.0 - proxy.health)
+                proxy.consecutive_blocks = 0
+                proxy.consecutive_failures = 0
+            elif error_class == BLOCKED:
+                proxy.blocks += 1
+                proxy.consecutive_blocks += 1
+                proxy.health *= 0.5
+                cooldown = min(
+                    self.config.max_cooldown_seconds,
+                    self.config.block_cooldown_seconds * 2 ** (proxy.consecutive_blocks - 1),
+                )
+                proxy.cooling_until = now + cooldown
+                ozon_logger.logger.warning(f"🚫 Прокси {proxy.server} заблокирован, cool-down {cooldown:.0f}s")
+            elif error_class in (PAGE_LOAD, DRIVER):
+                proxy.failures += 1
+                proxy.consecutive_failures += 1
+                proxy.health *= 0.8
+                if proxy.consecutive_failures >= self.config.failures_before_cooldown:
+                    proxy.consecutive_failures = 0
+                    proxy.cooling_until = now + self.config.failure_cooldown_seconds
+                    ozon_logger.logger.warning(
+                        f"⚠️ Прокси {proxy.server}: ошибки подряд, cool-down {self.config.failure_cooldown_seconds:.0f}s"
+                    )
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику прокси"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "rotations": self.rotations,
+                "proxies": [
+                    {
+                        "server": proxy.server,
+                        "health": round(proxy.health, 2),
+                        "cooldown_seconds": round(max(0.0, proxy.cooling_until - now), 1),
+                        "slots": sorted(proxy.slots),
+                        "successes": proxy.successes,
+                        "blocks": proxy.blocks,
+                        "failures": proxy.failures,
+                    }
+                    for proxy in self.proxies
+                ],
+            }
+
+
+# Глобальный экземпляр пула прокси
+proxy_pool = ProxyPool(ProxyPoolConfig.from_env())
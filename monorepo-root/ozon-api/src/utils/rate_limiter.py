@@ -3,6 +3,7 @@
 Система rate limiting для парсинга Ozon
 """
 import asyncio
+import threading
 import time
 from typing import Dict, Optional
 from utils.logger import ozon_logger
@@ -12,6 +13,8 @@ class ParsingRateLimiter:
     """Rate limiter для парсинга с задержками между запросами"""
     
     def __init__(self):
+        # Вызывается из потоков драйверов (у каждого свой event loop) - состояние под локом
+        self._lock = threading.Lock()
         self.last_request_time: Dict[str, float] = {}
         self.min_delay_seconds = 1.0  # Минимальная задержка между запросами
         self.max_delay_seconds = 5.0  # Максимальная задержка при блокировке
@@ -21,36 +24,45 @@ class ParsingRateLimiter:
         
     async def wait_before_request(self, query: str) -> None:
         """Ждет перед выполнением запроса"""
-        now = time.time()
-        
-        # Проверяем, прошло ли достаточно времени с последнего запроса
-        if query in self.last_request_time:
-            time_since_last = now - self.last_request_time[query]
-            if time_since_last < self.current_delay:
-                wait_time = self.current_delay - time_since_last
-                ozon_logger.logger.info(f"⏳ Ожидание {wait_time:.1f}s перед запросом: {query}")
-                await asyncio.sleep(wait_time)
-        
-        # Обновляем время последнего запроса
-        self.last_request_time[query] = time.time()
+        with self._lock:
+            now = time.time()
+            wait_time = 0.0
+
+            # Проверяем, прошло ли достаточно времени с последнего запроса
+            if query in self.last_request_time:
+                time_since_last = now - self.last_request_time[query]
+                if time_since_last < self.current_delay:
+                    wait_time = self.current_delay - time_since_last
+
+            # Время запроса резервируется под локом: параллельный поток с тем же
+            # запросом будет ждать уже от него
+            self.last_request_time[query] = now + wait_time
+
+        if wait_time > 0:
+            ozon_logger.logger.info(f"⏳ Ожидание {wait_time:.1f}s перед запросом: {query}")
+            await asyncio.sleep(wait_time)
     
     def on_request_success(self) -> None:
         """Вызывается при успешном запросе"""
         # Уменьшаем задержку при успешных запросах
-        if self.consecutive_blocks > 0:
+        with self._lock:
+            if self.consecutive_blocks == 0:
+                return
             self.consecutive_blocks = 0
             self.current_delay = max(self.min_delay_seconds, self.current_delay * 0.8)
-            ozon_logger.logger.info(f"✅ Запрос успешен, уменьшаем задержку до {self.current_delay:.1f}s")
+        ozon_logger.logger.info(f"✅ Запрос успешен, уменьшаем задержку до {self.current_delay:.1f}s")
     
     def on_request_blocked(self) -> None:
         """Вызывается при блокировке запроса"""
-        self.consecutive_blocks += 1
-        
-        # Увеличиваем задержку при блокировках
-        if self.consecutive_blocks >= self.max_consecutive_blocks:
+        with self._lock:
+            self.consecutive_blocks += 1
+
+            # Увеличиваем задержку при блокировках
+            if self.consecutive_blocks < self.max_consecutive_blocks:
+                return
             self.current_delay = min(self.max_delay_seconds, self.current_delay * 1.5)
-            ozon_logger.logger.warning(f"🚫 Запрос заблокирован, увеличиваем задержку до {self.current_delay:.1f}s")
             self.consecutive_blocks = 0  # Сбрасываем счетчик
+        ozon_logger.logger.warning(f"🚫 Запрос заблокирован, увеличиваем задержку до {self.current_delay:.1f}s")
     
     def get_current_delay(self) -> float:
         """Возвращает текущую задержку"""
@@ -58,8 +70,9 @@ class ParsingRateLimiter:
     
     def reset_delay(self) -> None:
         """Сбрасывает задержку к минимальному значению"""
-        self.current_delay = self.min_delay_seconds
-        self.consecutive_blocks = 0
+        with self._lock:
+            self.current_delay = self.min_delay_seconds
+            self.consecutive_blocks = 0
         ozon_logger.logger.info(f"🔄 Сброс задержки к {self.min_delay_seconds}s")
 
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Готовность реплики принимать трафик (/ready), отдельно от живости (/health):
+реплика готова, когда прогретый драйвер успешно выполнил пробный запрос
+"""
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.logger import ozon_logger
+
+
+@dataclass
+class ReadinessConfig:
+    """Конфигурация пробного запроса"""
+    probe_query: str = "rtx 5070"
+    probe_category: str = "videokarty-15721"
+    probe_timeout_seconds: float = 60.0   # Запуск Chrome + загрузка страницы
+    retry_seconds: float = 15.0           # Пауза между неудачными пробами
+
+    @classmethod
+    def from_env(cls) -> "ReadinessConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            probe_query=os.getenv("OZON_READY_PROBE_QUERY", "rtx 5070"),
+            probe_category=os.getenv("OZON_READY_PROBE_CATEGORY", "videokarty-15721"),
+            probe_timeout_seconds=float(os.getenv("OZON_READY_PROBE_TIMEOUT", "60")),
+            retry_seconds=float(os.getenv("OZON_READY_RETRY_SECONDS", "15")),
+        )
+
+
+class Readiness:
+    """Состояние готовности: один раз став готовой, реплика остается готовой"""
+
+    def __init__(self, config: ReadinessConfig) -> None:
+        self.config = config
+        self._started_at = time.monotonic()
+        self.ready = False
+        self.ready_after_seconds: Optional[float] = None
+        self.failed_probes = 0
+        self.last_error: Optional[str] = None
+
+    def mark_ready(self, source: str) -> None:
+        if self.ready:
+            return
+        self.ready = True
+        self.ready_after_seconds = round(time.monotonic() - self._started_at, 2)
+        ozon_logger.logger.info(f"✅ Реплика готова через {self.ready_after_seconds}s ({source})")
+
+    def mark_failed(self, error: Exception) -> None:
+        self.failed_probes += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        ozon_logger.logger.warning(f"⏳ Пробный запрос не прошел: {self.last_error}")
+
+    def get_state(self) -> dict:
+        """Возвращает состояние готовности"""
+        return {
+            "ready": self.ready,
+            "ready_after_seconds": self.ready_after_seconds,
+            "failed_probes": self.failed_probes,
+            "last_error": self.last_error,
+        }
+
+
+# Глобальный экземпляр готовности
+readiness = Readiness(ReadinessConfig.from_env())
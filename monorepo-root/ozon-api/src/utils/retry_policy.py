@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Политика повторов парсинга: экспоненциальная задержка с decorrelated jitter,
+отдельные правила для классов ошибок и общий бюджет повторов на сервис
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from utils.logger import ozon_logger
+
+# Классы ошибок парсинга
+BLOCKED = "blocked"        # Ozon ограничил доступ - повторять осторожно и редко
+DRIVER = "driver"          # Упал браузер/драйвер - пересоздать и повторить быстро
+JSON = "json"              # Страница загрузилась, но JSON нет или он битый
+PAGE_LOAD = "page_load"    # Таймаут или ошибка загрузки страницы
+UNKNOWN = "unknown"
+
+BLOCK_MARKERS = ("connection_limits", "Too many concurrent connections")
+DRIVER_MARKERS = (
+    "no such window",
+    "target window already closed",
+    "invalid session id",
+    "session deleted",
+    "chrome not reachable",
+    "disconnected",
+    "Драйвер не был инициализирован",
+)
+
+
+class ParseAttemptError(Exception):
+    """Неудачная попытка парсинга с известным классом ошибки"""
+
+    def __init__(self, error_class: str, message: str):
+        self.error_class = error_class
+        super().__init__(message)
+
+
+def classify_error(error: Exception) -> str:
+    """Класс ошибки для выбора политики повтора"""
+    if isinstance(error, ParseAttemptError):
+        return error.error_class
+    message = str(error)
+    if any(marker in message for marker in BLOCK_MARKERS):
+        return BLOCKED
+    if isinstance(error, TimeoutException):
+        return PAGE_LOAD
+    if any(marker in message for marker in DRIVER_MARKERS) or isinstance(error, WebDriverException):
+        return DRIVER
+    if isinstance(error, json.JSONDecodeError):
+        return JSON
+    return UNKNOWN
+
+
+@dataclass
+class BackoffPolicy:
+    """Правило повтора для класса ошибок"""
+    max_attempts: int      # Всего попыток, включая первую
+    base_delay: float      # Минимальная задержка, сек
+    max_delay: float       # Потолок задержки, сек
+
+
+DEFAULT_POLICIES: Dict[str, BackoffPolicy] = {
+    BLOCKED: BackoffPolicy(max_attempts=2, base_delay=5.0, max_delay=30.0),
+    DRIVER: BackoffPolicy(max_attempts=3, base_delay=0.5, max_delay=5.0),
+    JSON: BackoffPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0),
+    PAGE_LOAD: BackoffPolicy(max_attempts=3, base_delay=1.0, max_delay=10.0),
+    UNKNOWN: BackoffPolicy(max_attempts=2, base_delay=2.0, max_delay=10.0),
+}
+
+
+@dataclass
+class RetryBudgetConfig:
+    """Конфигурация бюджета повторов"""
+    retry_ratio: float = 0.1           # Повторов не больше 10% от запросов в окне
+    min_retries_per_window: int = 3    # Запас для редких запросов, чтобы одиночный сбой повторялся
+    window_seconds: float = 60.0
+    max_attempts_per_request: int = 4  # Всего попыток одного запроса, какого бы класса ни были ошибки
+
+    @classmethod
+    def from_env(cls) -> "RetryBudgetConfig":
+        """Создает конфигурацию из переменных окружения"""
+        return cls(
+            retry_ratio=float(os.getenv("OZON_RETRY_BUDGET_RATIO", "0.1")),
+            min_retries_per_window=int(os.getenv("OZON_RETRY_BUDGET_MIN", "3")),
+            window_seconds=float(os.getenv("OZON_RETRY_BUDGET_WINDOW", "60")),
+            max_attempts_per_request=int(os.getenv("OZON_RETRY_MAX_ATTEMPTS", "4")),
+        )
+
+
+class RetryPolicy:
+    """Решает, повторять ли попытку и сколько ждать"""
+
+    def __init__(self, budget: RetryBudgetConfig, policies: Optional[Dict[str, BackoffPolicy]] = None) -> None:
+        self.budget = budget
+        self.policies = policies or DEFAULT_POLICIES
+        # Попытки разных драйверов идут в своих потоках одновременно
+        self._lock = threading.Lock()
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+        # Statistics
+        self.retries_by_class: Dict[str, int] = {}
+        self.budget_exhausted = 0
+
+        ozon_logger.logger.info(f"Политика повторов инициализирована: {budget}")
+
+    def _prune(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.budget.window_seconds:
+                events.popleft()
+
+    def on_request(self) -> None:
+        """Новый запрос на парсинг (пополняет бюджет повторов)"""
+        with self._lock:
+            now = time.monotonic()
+            self._requests.append(now)
+            self._prune(now)
+
+    def _budget_allows(self, now: float) -> bool:
+        self._prune(now)
+        allowed = self.budget.min_retries_per_window + self.budget.retry_ratio * len(self._requests)
+        return len(self._retries) < allowed
+
+    def next_delay(
+        self, error_class: str, attempts: int, previous_delay: float, total_attempts: int = 1
+    ) -> Optional[float]:
+        """
+        Задержка перед следующей попыткой или None, если повторять нельзя
+
+        Args:
+            attempts: Сколько попыток с этим классом ошибки уже сделано
+            previous_delay: Предыдущая задержка (для decorrelated jitter)
+            total_attempts: Сколько попыток запроса сделано всего; чередование классов
+                ошибок не должно давать сумму лимитов всех классов
+        """
+        policy = self.policies.get(error_class, self.policies[UNKNOWN])
+        if attempts >= policy.max_attempts or total_attempts >= self.budget.max_attempts_per_request:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if not self._budget_allows(now):
+                self.budget_exhausted += 1
+                ozon_logger.logger.warning(f"Бюджет повторов исчерпан, ошибка {error_class} не повторяется")
+                return None
+
+            self._retries.append(now)
+            self.retries_by_class[error_class] = self.retries_by_class.get(error_class, 0) + 1
+        # Decorrelated jitter: задержки расходятся, повторы разных запросов не идут в ногу
+        upper = max(policy.base_delay, previous_delay * 3)
+        return min(policy.max_delay, random.uniform(policy.base_delay, upper))
+
+    def get_statistics(self) -> dict:
+        """Возвращает статистику повторов"""
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "requests_in_window": len(self._requests),
+                "retries_in_window": len(self._retries),
+                "retries_by_class": dict(self.retries_by_class),
+                "budget_exhausted": self.budget_exhausted,
+            }
+
+
+# Глобальный экземпляр политики повторов
+retry_policy = RetryPolicy(RetryBudgetConfig.from_env())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Сэмплирующий CPU профайлер живого процесса (collapsed stacks для flamegraph)
+"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from utils.logger import ozon_logger
+
+# Границы, чтобы профилирование под нагрузкой не стало нагрузкой само
+MAX_DURATION_SECONDS = 60.0
+MIN_INTERVAL_SECONDS = 0.005
+MAX_INTERVAL_SECONDS = 1.0
+MAX_STACK_DEPTH = 64
+
+
+class ProfilerBusy(Exception):
+    """Профилирование уже запущено"""
+
+
+class SamplingProfiler:
+    """
+    Снимает стеки всех потоков (event loop и executor) через sys._current_frames.
+    Поток сэмплера существует только на время профилирования
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.runs = 0
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval_seconds: float = 0.01) -> str:
+        """
+        Блокирующее профилирование на seconds секунд.
+        Возвращает collapsed stacks: "поток;функция (файл:строка);... количество"
+
+        Raises:
+            ProfilerBusy: Другое профилирование еще не закончилось
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Profiling is already running")
+        try:
+            seconds = min(max(seconds, 0.0), MAX_DURATION_SECONDS)
+            # Интервал не длиннее самого профилирования: иначе поток сэмплера спит дольше seconds
+            interval_seconds = min(
+                max(interval_seconds, MIN_INTERVAL_SECONDS), MAX_INTERVAL_SECONDS, max(seconds, MIN_INTERVAL_SECONDS)
+            )
+            self.runs += 1
+            ozon_logger.logger.info(f"🔬 Профилирование {seconds:.1f}с, интервал {interval_seconds * 1000:.0f}мс")
+
+            stacks: Counter = Counter()
+            own_ident = threading.get_ident()
+            samples = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = self._thread_names()
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    stacks[self._collapse(names.get(ident, f"thread-{ident}"), frame)] += 1
+                samples += 1
+                time.sleep(interval_seconds)
+
+            ozon_logger.logger.info(f"🔬 Профилирование завершено: {samples} снимков, {len(stacks)} стеков")
+            return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _thread_names() -> Dict[int, str]:
+        return {thread.ident: thread.name for thread in threading.enumerate() if thread.ident is not None}
+
+    @staticmethod
+    def _collapse(thread_name: str, frame: Optional[object]) -> str:
+        """Стек от корня к листу в формате flamegraph.pl (счетчик отделяется последним пробелом)"""
+        parts = []
+        while frame is not None and len(parts) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        parts.append(thread_name.replace(" ", "_"))
+        return ";".join(reversed(parts))
+
+
+# Глобальный экземпляр профайлера
+sampling_profiler = SamplingProfiler()
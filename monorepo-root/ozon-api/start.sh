@@ -23,35 +23,53 @@ else
     exit 1
 fi
 
-# Запускаем виртуальный экран
-echo "🖥️ Запуск виртуального экрана..."
-Xvfb :99 -screen 0 1920x1080x24 -ac +extension GLX +render -noreset > /dev/null 2>&1 &
-XVFB_PID=$!
+# В headless режиме X сервер не нужен - Chrome рендерит без дисплея
+case "${OZON_HEADLESS,,}" in
+    1|true|yes|on) HEADLESS=true ;;
+    *) HEADLESS=false ;;
+esac
 
-# Ждем инициализации экрана
-sleep 3
+if [ "$HEADLESS" = "true" ]; then
+    echo "🕶️ Headless режим: Xvfb и fluxbox не запускаются"
+    unset DISPLAY
+else
+    # Запускаем виртуальный экран
+    echo "🖥️ Запуск виртуального экрана..."
+    Xvfb :99 -screen 0 1920x1080x24 -ac +extension GLX +render -noreset > /dev/null 2>&1 &
+    XVFB_PID=$!
 
-# Проверяем что Xvfb запустился
-if ! kill -0 $XVFB_PID 2>/dev/null; then
-    echo "❌ Ошибка запуска виртуального экрана"
-    exit 1
-fi
+    # Ждем появления сокета дисплея вместо фиксированной паузы (до 5 секунд)
+    for _ in $(seq 1 50); do
+        [ -S /tmp/.X11-unix/X99 ] && break
+        if ! kill -0 $XVFB_PID 2>/dev/null; then
+            break
+        fi
+        sleep 0.1
+    done
 
-# Запускаем оконный менеджер
-echo "🪟 Запуск оконного менеджера..."
-fluxbox > /dev/null 2>&1 &
-FLUXBOX_PID=$!
+    # Проверяем что Xvfb запустился
+    if ! kill -0 $XVFB_PID 2>/dev/null || [ ! -S /tmp/.X11-unix/X99 ]; then
+        echo "❌ Ошибка запуска виртуального экрана"
+        exit 1
+    fi
 
-# Ждем инициализации оконного менеджера
-sleep 2
+    # Запускаем оконный менеджер
+    echo "🪟 Запуск оконного менеджера..."
+    fluxbox > /dev/null 2>&1 &
+    FLUXBOX_PID=$!
 
-# Проверяем что fluxbox запустился
-if ! kill -0 $FLUXBOX_PID 2>/dev/null; then
-    echo "❌ Ошибка запуска оконного менеджера"
-    exit 1
+    # Оконный менеджер не блокирует запуск Chrome, проверяем только что он не упал сразу
+    sleep 0.2
+
+    # Проверяем что fluxbox запустился
+    if ! kill -0 $FLUXBOX_PID 2>/dev/null; then
+        echo "❌ Ошибка запуска оконного менеджера"
+        exit 1
+    fi
+
+    echo "✅ Виртуальный экран готов"
 fi
 
-echo "✅ Виртуальный экран готов"
 echo "🔧 Запуск Ozon API..."
 
 # Запускаем основное приложение
@@ -0,0 +1,29 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Модули сервиса импортируются так же, как в src/main.py: utils.*, infrastructure.*
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+class FakeClock:
+    """Управляемые часы вместо time.monotonic"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.monotonic под управлением теста (только для синхронного кода: event loop тоже его читает)"""
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Адаптивный лимит параллельности (AIMD): рост при нагрузке и снижение при блокировках и таймаутах
+"""
+from utils.adaptive_concurrency import AdaptiveConcurrencyConfig, AdaptiveConcurrencyLimit
+
+
+def make_limit(**overrides) -> AdaptiveConcurrencyLimit:
+    overrides.setdefault("enabled", True)
+    overrides.setdefault("max_limit", 8)
+    return AdaptiveConcurrencyLimit(AdaptiveConcurrencyConfig(**overrides))
+
+
+def busy_success(limit: AdaptiveConcurrencyLimit, latency: float = 1.0) -> None:
+    """Успешная страница при полностью занятом лимите"""
+    limit.on_admit(limit.limit)
+    limit.on_success(latency)
+
+
+def test_disabled_limit_never_changes(clock):
+    limit = make_limit(enabled=False, initial_limit=2)
+    limit.on_admit(2)
+    limit.on_success(1.0)
+    limit.on_blocked()
+    limit.on_timeout()
+    assert limit.limit == 2
+    assert limit.blocks == 0
+
+
+def test_additive_increase_about_one_per_limit_successes(clock):
+    limit = make_limit(initial_limit=1)
+    busy_success(limit)
+    assert limit.limit == 2
+    busy_success(limit)
+    assert limit.limit == 2
+    busy_success(limit)
+    assert limit.limit == 2
+    busy_success(limit)
+    assert limit.limit == 3
+    assert limit.increases == 2
+
+
+def test_idle_limit_does_not_grow(clock):
+    limit = make_limit(initial_limit=3)
+    for _ in range(20):
+        limit.on_admit(1)
+        limit.on_success(1.0)
+    assert limit.limit == 3
+
+
+def test_increase_is_capped_at_max(clock):
+    limit = make_limit(initial_limit=2, max_limit=2)
+    for _ in range(10):
+        busy_success(limit)
+    assert limit.limit == 2
+
+
+def test_block_halves_once_per_cooldown(clock):
+    limit = make_limit(initial_limit=8, cooldown_seconds=30)
+    limit.on_blocked()
+    assert limit.limit == 4
+    # Запросы в полете блокируются пачкой - это одна перегрузка
+    limit.on_blocked()
+    limit.on_blocked()
+    assert limit.limit == 4
+    assert (limit.blocks, limit.decreases) == (3, 1)
+
+    clock.advance(31)
+    limit.on_blocked()
+    assert limit.limit == 2
+
+
+def test_no_increase_during_cooldown(clock):
+    limit = make_limit(initial_limit=4, cooldown_seconds=30)
+    limit.on_blocked()
+    for _ in range(10):
+        busy_success(limit)
+    assert limit.limit == 2
+
+    clock.advance(31)
+    for _ in range(3):
+        busy_success(limit)
+    assert limit.limit == 3
+
+
+def test_timeout_decreases_multiplicatively_down_to_min(clock):
+    limit = make_limit(initial_limit=8, min_limit=2, cooldown_seconds=30)
+    limit.on_timeout()
+    assert limit.limit == 7
+    for _ in range(20):
+        clock.advance(31)
+        limit.on_timeout()
+    assert limit.limit == 2
+
+
+def test_block_overrides_latency_cooldown(clock):
+    limit = make_limit(initial_limit=8, cooldown_seconds=30)
+    limit.on_timeout()
+    limit.on_blocked()
+    assert limit.limit == 3
+
+
+def test_latency_growth_decreases_after_warmup(clock):
+    limit = make_limit(initial_limit=4, warmup_samples=5, latency_tolerance=2.0)
+    for _ in range(5):
+        limit.on_success(1.0)
+    assert limit.limit == 4
+    for _ in range(5):
+        limit.on_success(10.0)
+    assert limit.limit == 3
+    assert limit.get_statistics()["cooling_down"]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Admission control: отказ до очереди и уборка ожидающих, ушедших по таймауту
+"""
+import asyncio
+
+import pytest
+
+from utils.admission_control import AdmissionConfig, AdmissionController, AdmissionRejected
+from utils.priority_scheduler import BACKGROUND, INTERACTIVE
+
+
+def make_controller(**overrides) -> AdmissionController:
+    overrides.setdefault("initial_service_time_seconds", 0.01)
+    return AdmissionController(AdmissionConfig(**overrides))
+
+
+async def hold(controller: AdmissionController, release: asyncio.Event, priority: str = INTERACTIVE) -> None:
+    async with controller.admit(None, priority):
+        await release.wait()
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    async def scenario():
+        controller = make_controller()
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(controller, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected, match="deadline expired in queue"):
+            async with controller.admit(0.05):
+                pass
+        assert controller.scheduler.waiting() == 0
+        assert controller.rejected_requests == 1
+
+        # Слот не потерян: после освобождения следующий запрос проходит сразу
+        release.set()
+        await holder
+        assert controller.scheduler.active == 0
+        async with controller.admit(0.05):
+            assert controller.scheduler.active == 1
+        assert controller.admitted_requests == 2
+
+    asyncio.run(scenario())
+
+
+def test_slot_granted_to_cancelled_waiter_is_passed_on():
+    async def scenario():
+        controller = make_controller()
+        scheduler = controller.scheduler
+        await scheduler.acquire(INTERACTIVE)
+        first = asyncio.ensure_future(scheduler.acquire(INTERACTIVE))
+        second = asyncio.ensure_future(scheduler.acquire(BACKGROUND))
+        await asyncio.sleep(0)
+
+        # Слот выдан первому, но тот отменен раньше, чем успел его забрать
+        scheduler.release()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await second
+        assert scheduler.active == 1
+        assert scheduler.waiting() == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_per_class():
+    async def scenario():
+        controller = make_controller(max_queue_size=1)
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(controller, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert controller.scheduler.waiting(INTERACTIVE) == 1
+
+        with pytest.raises(AdmissionRejected, match="interactive queue is full"):
+            async with controller.admit(None):
+                pass
+        # Очередь фонового класса своя
+        background = asyncio.ensure_future(hold(controller, release, BACKGROUND))
+        await asyncio.sleep(0)
+        assert controller.scheduler.waiting(BACKGROUND) == 1
+
+        release.set()
+        await asyncio.gather(*tasks, background)
+        assert controller.scheduler.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_unmeetable_deadline_is_rejected_before_queueing():
+    async def scenario():
+        controller = make_controller(initial_service_time_seconds=8.0)
+        with pytest.raises(AdmissionRejected, match="deadline cannot be met"):
+            async with controller.admit(5.0):
+                pass
+        assert controller.scheduler.active == 0
+        assert controller.scheduler.waiting() == 0
+
+    asyncio.run(scenario())
+
+
+
+def test_extra_slot_only_when_free_and_nobody_waits():
+    async def scenario():
+        controller = make_controller(max_concurrent=2)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(controller, release))
+        await asyncio.sleep(0)
+
+        assert controller.try_admit_extra()
+        assert not controller.try_admit_extra()
+        controller.release_extra()
+
+        # Ожидающие запросы клиентов важнее дополнительных попыток
+        second = asyncio.ensure_future(hold(controller, release))
+        third = asyncio.ensure_future(hold(controller, release))
+        await asyncio.sleep(0)
+        assert controller.scheduler.waiting() == 1
+        assert not controller.try_admit_extra()
+
+        release.set()
+        await asyncio.gather(holder, second, third)
+        assert controller.extra_admitted == 1
+
+    asyncio.run(scenario())
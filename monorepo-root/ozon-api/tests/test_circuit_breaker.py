@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Переходы circuit breaker: closed -> open -> half-open -> closed/open
+"""
+import pytest
+
+from utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitOpenError,
+)
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    return CircuitBreaker(CircuitBreakerConfig(**overrides))
+
+
+def run(breaker: CircuitBreaker, ok: bool) -> None:
+    breaker.before_request()
+    if ok:
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.config.min_requests):
+        run(breaker, False)
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_below_min_requests(clock):
+    breaker = make_breaker(min_requests=5)
+    for _ in range(4):
+        run(breaker, False)
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate() == 1.0
+
+
+def test_opens_at_failure_rate_threshold(clock):
+    breaker = make_breaker(min_requests=4, failure_rate_threshold=0.5)
+    run(breaker, True)
+    run(breaker, True)
+    run(breaker, False)
+    assert breaker.state == CLOSED
+    run(breaker, False)
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = make_breaker(min_requests=3, window_seconds=60)
+    run(breaker, False)
+    run(breaker, False)
+    clock.advance(61)
+    run(breaker, False)
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate() == 1.0
+
+
+def test_open_rejects_until_timeout(clock):
+    breaker = make_breaker(base_open_seconds=15)
+    trip(breaker)
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_request()
+    assert error.value.retry_after_seconds == pytest.approx(15)
+    assert breaker.rejected == 1
+    assert not breaker.is_available()
+
+    clock.advance(15)
+    assert breaker.is_available()
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = make_breaker(base_open_seconds=15, half_open_max_probes=1)
+    trip(breaker)
+    clock.advance(15)
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert not breaker.is_available()
+
+
+def test_successful_probe_closes_and_resets_backoff(clock):
+    breaker = make_breaker(base_open_seconds=15)
+    trip(breaker)
+    clock.advance(15)
+    run(breaker, True)
+    assert breaker.state == CLOSED
+    assert breaker.get_state()["consecutive_trips"] == 0
+    # Окно очищено: прошлые ошибки не размыкают цепь снова
+    assert breaker.failure_rate() == 0.0
+
+
+def test_failed_probe_reopens_with_doubled_timeout(clock):
+    breaker = make_breaker(base_open_seconds=15, max_open_seconds=40)
+    trip(breaker)
+    clock.advance(15)
+    run(breaker, False)
+    assert breaker.state == OPEN
+    assert breaker.retry_after() == pytest.approx(30)
+
+    clock.advance(30)
+    run(breaker, False)
+    # Удвоение ограничено max_open_seconds
+    assert breaker.retry_after() == pytest.approx(40)
+    assert breaker.trips == 3
+
+
+def test_neutral_outcome_frees_probe_without_transition(clock):
+    breaker = make_breaker(base_open_seconds=15)
+    trip(breaker)
+    clock.advance(15)
+    breaker.before_request()
+    breaker.record_neutral()
+    assert breaker.state == HALF_OPEN
+    assert breaker.is_available()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Квоты клиентов: списание стоимости, долг, пополнение и metadata ответа
+"""
+import pytest
+
+from utils.client_quota import ClientQuotaConfig, ClientQuotas, QuotaExceeded
+
+
+def make_quotas(**overrides) -> ClientQuotas:
+    overrides.setdefault("enabled", True)
+    overrides.setdefault("capacity", 2.0)
+    overrides.setdefault("burst_seconds", 10.0)
+    return ClientQuotas(ClientQuotaConfig(**overrides))
+
+
+def test_parse_shares():
+    assert ClientQuotaConfig._parse_shares(" bot=0.6, crawler=0.1,, broken=") == {"bot": 0.6, "crawler": 0.1}
+
+
+def test_rate_and_burst_follow_share(clock):
+    quotas = make_quotas(shares={"bot": 0.5}, default_share=0.25)
+    bot = quotas.begin("bot").quota
+    other = quotas.begin("other").quota
+    assert (bot.rate, bot.burst) == (1.0, 10.0)
+    assert (other.rate, other.burst) == (0.5, 5.0)
+
+
+def test_cost_counts_browser_seconds_and_outbound_requests(clock):
+    quotas = make_quotas(outbound_request_cost=2.0, shares={"bot": 0.5})
+    cost = quotas.begin("bot")
+    cost.add(1.5, 1)
+    cost.add(0.5, 2)
+    assert cost.units == pytest.approx(2.0 + 3 * 2.0)
+    assert cost.quota.balance == pytest.approx(10.0 - 8.0)
+    assert (cost.quota.browser_seconds, cost.quota.outbound_requests) == (2.0, 3)
+
+
+def test_debt_rejects_until_refilled(clock):
+    quotas = make_quotas(shares={"bot": 0.5})
+    # Стоимость известна после парсинга: баланс уходит в минус
+    quotas.begin("bot").add(13.0, 0)
+    with pytest.raises(QuotaExceeded) as error:
+        quotas.begin("bot")
+    assert error.value.client_id == "bot"
+    assert error.value.retry_after_seconds == pytest.approx(3.0)
+
+    clock.advance(3.5)
+    quotas.begin("bot")
+    stats = quotas.get_statistics()["clients"]["bot"]
+    assert (stats["requests"], stats["rejected"]) == (3, 1)
+
+
+def test_refill_is_capped_at_burst(clock):
+    quotas = make_quotas(shares={"bot": 0.5})
+    cost = quotas.begin("bot")
+    cost.add(4.0, 0)
+    clock.advance(1000)
+    assert cost.quota.balance == pytest.approx(10.0)
+
+
+def test_late_charge_after_response_still_counts(clock):
+    quotas = make_quotas(shares={"bot": 0.5})
+    cost = quotas.begin("bot")
+    cost.add(2.0, 0)
+    metadata = dict(quotas.metadata(cost.quota, cost.units))
+    # Брошенный хедж досчитывает после ответа клиенту
+    cost.add(3.0, 0)
+    assert metadata["x-quota-cost"] == "2.00"
+    assert cost.quota.balance == pytest.approx(5.0)
+
+
+def test_metadata(clock):
+    quotas = make_quotas(shares={"bot": 0.5})
+    cost = quotas.begin("bot")
+    cost.add(12.0, 0)
+    assert dict(quotas.metadata(cost.quota, cost.units)) == {
+        "x-quota-remaining": "0.0",
+        "x-quota-limit": "10.0",
+        "x-quota-rate": "1.000",
+        "x-quota-cost": "12.00",
+        "x-quota-reset-ms": "12000",
+    }
+
+
+def test_least_recent_clients_are_evicted(clock, monkeypatch):
+    monkeypatch.setattr("utils.client_quota.MAX_TRACKED_CLIENTS", 2)
+    quotas = make_quotas()
+    for client_id in ("a", "b", "a", "c"):
+        quotas.begin(client_id)
+    assert list(quotas.get_statistics()["clients"]) == ["a", "c"]
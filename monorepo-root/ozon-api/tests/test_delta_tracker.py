@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Дельта-ответы: токены версий и изменения относительно версии клиента
+"""
+from domain.entities.product import Product
+from infrastructure.services.delta_tracker import DeltaTracker, version_token_for
+
+KEY = ("rtx 5070", "videokarty-15721")
+
+
+def products(**prices: int):
+    return [Product(id=sku, name=f"Товар {sku}", price=price) for sku, price in prices.items()]
+
+
+def test_token_depends_only_on_content():
+    assert version_token_for({"a": 1, "b": 2}) == version_token_for({"b": 2, "a": 1})
+    assert version_token_for({"a": 1}) != version_token_for({"a": 2})
+    assert version_token_for({"a": 1}) != version_token_for({"b": 1})
+
+
+def test_first_request_gets_full_response():
+    tracker = DeltaTracker()
+    result = tracker.diff(KEY, products(a=100, b=200))
+    assert not result.is_delta
+    assert [product.id for product in result.products] == ["a", "b"]
+    assert result.version_token == version_token_for({"a": 100, "b": 200})
+
+
+def test_delta_against_client_version():
+    tracker = DeltaTracker()
+    token = tracker.diff(KEY, products(a=100, b=200, c=300)).version_token
+    result = tracker.diff(KEY, products(a=100, b=250, d=400), token)
+    assert result.is_delta
+    assert [product.id for product in result.products] == ["b", "d"]
+    assert result.removed_ids == ["c"]
+    assert tracker.get_statistics()["products_skipped"] == 1
+
+
+def test_unchanged_result_is_empty_delta_with_same_token():
+    tracker = DeltaTracker()
+    token = tracker.diff(KEY, products(a=100)).version_token
+    result = tracker.diff(KEY, products(a=100), token)
+    assert result.is_delta
+    assert result.products == [] and result.removed_ids == []
+    assert result.version_token == token
+
+
+def test_unknown_or_foreign_token_gets_full_response():
+    tracker = DeltaTracker()
+    token = tracker.diff(KEY, products(a=100)).version_token
+    assert not tracker.diff(KEY, products(a=100), "stale-token").is_delta
+    assert not tracker.diff(("rx 9070", "videokarty-15721"), products(a=100), token).is_delta
+
+
+def test_old_versions_are_evicted():
+    tracker = DeltaTracker(versions_per_key=2)
+    first = tracker.diff(KEY, products(a=1)).version_token
+    second = tracker.diff(KEY, products(a=2)).version_token
+    # Повтор последней версии не вытесняет более старые
+    tracker.diff(KEY, products(a=2))
+    assert tracker.diff(KEY, products(a=2), first).is_delta
+    tracker.diff(KEY, products(a=3))
+    assert not tracker.diff(KEY, products(a=3), first).is_delta
+    assert tracker.diff(KEY, products(a=3), second).is_delta
+
+
+def test_least_recent_keys_are_evicted():
+    tracker = DeltaTracker(max_keys=2)
+    token = tracker.diff("a", products(x=1)).version_token
+    tracker.diff("b", products(x=1))
+    tracker.diff("a", products(x=1))
+    tracker.diff("c", products(x=1))
+    assert tracker.get_statistics()["keys"] == 2
+    assert tracker.diff("a", products(x=1), token).is_delta
+    assert not tracker.diff("b", products(x=1), token).is_delta
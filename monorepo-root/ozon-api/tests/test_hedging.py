@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Хеджирование: квантиль латентности, доля хеджей в окне и слот admission control под хедж
+"""
+import asyncio
+import time
+
+import pytest
+
+from infrastructure.parsers.browser_config import BrowserConfig
+from infrastructure.parsers.driver_pool import DriverPool
+from infrastructure.services import ozon_parser_service as service_module
+from infrastructure.services.ozon_parser_service import OzonParserService
+from utils.admission_control import AdmissionConfig, AdmissionController
+from utils.deadline import Deadline, DeadlineExceeded
+from utils.hedging import HedgingConfig, HedgingPolicy
+
+CATEGORY = "videokarty-15721"
+
+
+def make_policy(**overrides) -> HedgingPolicy:
+    overrides.setdefault("enabled", True)
+    return HedgingPolicy(HedgingConfig(**overrides))
+
+
+def test_no_hedge_delay_until_enough_samples():
+    policy = make_policy(min_samples=10)
+    for latency in range(9):
+        policy.record_latency(CATEGORY, float(latency))
+    assert policy.hedge_delay(CATEGORY) is None
+    policy.record_latency(CATEGORY, 9.0)
+    assert policy.hedge_delay(CATEGORY) == pytest.approx(8.1)
+    assert policy.hedge_delay("other") is None
+
+
+def test_hedge_delay_follows_recent_history():
+    policy = make_policy(min_samples=1, history_size=10, quantile=50)
+    for _ in range(10):
+        policy.record_latency(CATEGORY, 1.0)
+    for _ in range(10):
+        policy.record_latency(CATEGORY, 5.0)
+    assert policy.hedge_delay(CATEGORY) == pytest.approx(5.0)
+
+
+def test_hedge_ratio_within_window(clock):
+    policy = make_policy(max_hedge_ratio=0.1, window_seconds=60)
+    assert not policy.try_hedge()
+    for _ in range(20):
+        policy.on_request()
+    assert policy.try_hedge()
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+    assert policy.hedged == 2
+
+    # Старые запросы и хеджи уходят из окна вместе
+    clock.advance(61)
+    for _ in range(10):
+        policy.on_request()
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+
+
+class Headroom:
+    def __init__(self, available: bool = True) -> None:
+        self.available = available
+
+    def has_headroom(self, amount: float = 1.0) -> bool:
+        return self.available
+
+
+def make_service(monkeypatch, pool_size: int = 2, max_concurrent: int = 2, latency: float = 0.05):
+    controller = AdmissionController(AdmissionConfig(max_concurrent=max_concurrent, initial_service_time_seconds=0.01))
+    headroom = Headroom()
+    monkeypatch.setattr(service_module, "admission_controller", controller)
+    monkeypatch.setattr(service_module, "outbound_budget", headroom)
+
+    pool = DriverPool(pool_size, BrowserConfig())
+    for parser in pool.parsers:
+        async def get_products(*args, slot=parser.slot):
+            time.sleep(latency)
+            return [slot]
+        parser.get_products = get_products
+
+    service = OzonParserService.__new__(OzonParserService)
+    service.pool = pool
+    service.hedging = make_policy(max_hedge_ratio=1.0)
+    service.hedging.on_request()
+    return service, controller, headroom
+
+
+def scrape_args() -> tuple:
+    return "rtx 5070", CATEGORY, None, None, Deadline(5)
+
+
+def test_hedge_takes_and_returns_an_admission_slot(monkeypatch):
+    async def scenario():
+        service, controller, _ = make_service(monkeypatch)
+        async with controller.admit(None):
+            task, stop = service._start_hedge(scrape_args())
+            assert controller.scheduler.active == 2
+            assert await task == [0]
+            await asyncio.sleep(0)
+            assert controller.scheduler.active == 1
+        assert controller.scheduler.active == 0
+        assert controller.extra_admitted == 1
+
+    asyncio.run(scenario())
+
+
+def test_no_hedge_beyond_max_concurrent(monkeypatch):
+    async def scenario():
+        # Свободный драйвер есть, но слоты admission control заняты
+        service, controller, _ = make_service(monkeypatch, pool_size=2, max_concurrent=1)
+        async with controller.admit(None):
+            assert service._start_hedge(scrape_args()) is None
+            assert controller.scheduler.active == 1
+            assert service.pool.idle == 2
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("reason", ["no_driver", "no_headroom", "ratio"])
+def test_refused_hedge_releases_everything(monkeypatch, reason):
+    async def scenario():
+        service, controller, headroom = make_service(monkeypatch)
+        if reason == "no_driver":
+            parsers = [service.pool.try_acquire(), service.pool.try_acquire()]
+        elif reason == "no_headroom":
+            headroom.available = False
+        else:
+            service.hedging = make_policy(max_hedge_ratio=0.0)
+        async with controller.admit(None):
+            assert service._start_hedge(scrape_args()) is None
+            await asyncio.sleep(0)
+            assert controller.scheduler.active == 1
+        if reason == "no_driver":
+            for parser in parsers:
+                await service.pool.release(parser)
+        assert service.pool.idle == 2
+
+    asyncio.run(scenario())
+
+
+def test_stopped_hedge_holds_slot_until_thread_finishes(monkeypatch):
+    async def scenario():
+        service, controller, _ = make_service(monkeypatch, latency=0.2)
+        async with controller.admit(None):
+            task, stop = service._start_hedge(scrape_args())
+            await asyncio.sleep(0.05)
+            stop.set()
+            task.cancel()
+            await asyncio.sleep(0.01)
+            # Поток еще держит браузер - слот не освобожден
+            assert controller.scheduler.active == 2
+            await asyncio.sleep(0.3)
+            assert controller.scheduler.active == 1
+            assert service.pool.idle == 2
+
+    asyncio.run(scenario())
+
+
+def test_driver_acquire_is_bounded_by_deadline():
+    async def scenario():
+        pool = DriverPool(1, BrowserConfig())
+        parser = await pool.acquire(Deadline(1))
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            await pool.acquire(Deadline(0.05))
+        assert time.monotonic() - started < 0.5
+
+        # Драйвер, освободившийся до дедлайна, выдается ожидающему
+        waiter = asyncio.ensure_future(pool.acquire(Deadline(1)))
+        await asyncio.sleep(0)
+        await pool.release(parser)
+        assert await waiter is parser
+
+    asyncio.run(scenario())
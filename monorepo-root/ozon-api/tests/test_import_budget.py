@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Бюджет времени импорта src/main.py
+
+`python -X importtime -c "import main"` в чистом процессе: суммарное время импорта
+укладывается в бюджет (OZON_IMPORT_BUDGET_MS), а браузерный стек при старте не
+загружен - он подгружается при первом запуске Chrome
+"""
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Модули, которых не должно быть в sys.modules после импорта main
+LAZY_MODULES = ("undetected_chromedriver", "selenium.webdriver")
+BUDGET_MS = float(os.getenv("OZON_IMPORT_BUDGET_MS", "500"))
+# Время импорта шумит - берется лучший из замеров
+RUNS = 3
+
+# Логгер сервиса пишет в stdout - результат печатается строкой с маркером
+LOADED_MARKER = "lazy-modules-loaded:"
+IMPORT_MAIN = (
+    "import sys, main; "
+    f"print({LOADED_MARKER!r} + ','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+)
+
+
+def import_main() -> Tuple[float, Dict[str, int], List[str]]:
+    """Время import main (мс), кумулятивное время модулей (мкс) и загруженные ленивые модули"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_MAIN],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert result.returncode == 0, f"import main завершился с ошибкой:\n{result.stderr[-2000:]}"
+
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    marked = [line for line in result.stdout.splitlines() if line.startswith(LOADED_MARKER)]
+    assert marked, f"нет строки {LOADED_MARKER} в выводе:\n{result.stdout[-2000:]}"
+    loaded = [name for name in marked[-1][len(LOADED_MARKER):].split(",") if name]
+    return modules.get("main", 0) / 1000, modules, loaded
+
+
+@pytest.fixture(scope="module")
+def imports() -> Tuple[float, Dict[str, int], List[str]]:
+    return min((import_main() for _ in range(RUNS)), key=lambda measured: measured[0])
+
+
+def test_import_main_within_budget(imports):
+    total_ms, modules, _ = imports
+    # Самые тяжелые модули верхнего уровня - в сообщении, чтобы было видно, что разрослось
+    heaviest = sorted(
+        ((name, us) for name, us in modules.items() if name != "main" and "." not in name),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:10]
+    report = "\n".join(f"   {us / 1000:7.1f} ms  {name}" for name, us in heaviest)
+    assert total_ms <= BUDGET_MS, f"import main {total_ms:.0f} ms > {BUDGET_MS:.0f} ms\n{report}"
+
+
+def test_browser_stack_is_lazy(imports):
+    _, _, loaded = imports
+    assert not loaded, f"при старте загружены ленивые модули: {', '.join(loaded)}"
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Потоковый разбор ответа entrypoint-api на целых и оборванных страницах
+"""
+import asyncio
+import json
+import tracemalloc
+
+import pytest
+
+from infrastructure.parsers import ozon_parser as ozon_parser_module
+from infrastructure.parsers.browser_config import BrowserConfig
+from infrastructure.parsers.json_stream import (
+    find_array,
+    iter_array,
+    iter_items,
+    iter_raw_widget_spans,
+    iter_widget_strings,
+)
+from infrastructure.parsers.ozon_parser import OzonParser
+from utils.retry_policy import JSON, ParseAttemptError
+
+GRID = {"meta": {"page": 1, "note": "items: [\"нет\"]"}, "items": [{"sku": 1}, {"sku": 2}, {"sku": 3}]}
+PAGE = json.dumps(
+    {"widgetStates": {"searchResultsHeader-1": "{\"items\": []}", "tileGridDesktop-2-default-1": json.dumps(GRID)}}
+)
+
+
+def test_widget_string_is_decoded():
+    [(widget_id, widget)] = list(iter_widget_strings(PAGE, "tileGridDesktop"))
+    assert widget_id == "tileGridDesktop-2-default-1"
+    assert json.loads(widget) == GRID
+
+
+def test_items_are_read_one_by_one():
+    widget = json.dumps(GRID)
+    assert list(iter_array(widget, find_array(widget, "items"))) == GRID["items"]
+    assert find_array(json.dumps({"meta": {}}), "items") is None
+    assert list(iter_array("[ ]", 0)) == []
+    assert list(iter_items(widget)) == GRID["items"]
+    assert iter_items(json.dumps({"meta": {}})) is None
+
+
+@pytest.mark.parametrize("cut", [0.5, 0.9, 0.99])
+def test_truncated_page_raises_on_widget(cut):
+    truncated = PAGE[:int(len(PAGE) * cut)]
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_widget_strings(truncated, "tileGridDesktop"))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_raw_widget_spans(truncated, "tileGridDesktop"))
+
+
+def test_truncated_items_yield_complete_items_then_raise():
+    widget = json.dumps(GRID)
+    truncated = widget[:widget.index('{"sku": 3}') + 5]
+    items = iter_array(truncated, find_array(truncated, "items"))
+    assert next(items) == {"sku": 1}
+    assert next(items) == {"sku": 2}
+    with pytest.raises(json.JSONDecodeError):
+        next(items)
+
+
+@pytest.mark.parametrize("text", ["", "{", '{"meta": {"page": 1', '{"meta": 1 "items": []}'])
+def test_truncated_or_broken_object_raises_on_find(text):
+    with pytest.raises(json.JSONDecodeError):
+        find_array(text, "items")
+
+
+def test_truncated_page_is_a_json_error_not_partial_result(monkeypatch):
+    monkeypatch.setattr(ozon_parser_module.parse_pool.config, "processes", 0)
+    parser = OzonParser(BrowserConfig(stream_parse=True))
+    truncated = PAGE[:PAGE.index("sku\\\": 3")]
+    # Частично прочитанные товары не возвращаются: полный разбор показывает ошибку
+    with pytest.raises(ParseAttemptError) as error:
+        asyncio.run(parser._parse_page_text(truncated, "rtx", "videokarty-15721"))
+    assert error.value.error_class == JSON
+
+
+def test_stream_parse_releases_page_before_items(monkeypatch):
+    monkeypatch.setattr(ozon_parser_module.parse_pool.config, "processes", 0)
+    parser = OzonParser(BrowserConfig(stream_parse=True))
+    seen = []
+    monkeypatch.setattr(
+        parser, "_parse_single_product", lambda item, query, category: seen.append(tracemalloc.get_traced_memory()[0])
+    )
+
+    tracemalloc.start()
+    try:
+        # Сетка маленькая, остальные виджеты страницы - несколько мегабайт
+        page = json.dumps({"widgetStates": {"tileGridDesktop-1": json.dumps(GRID), "pdp-1": "x" * 4_000_000}})
+        with_page = tracemalloc.get_traced_memory()[0]
+        parsing = parser._parse_page_text(page, "rtx", "videokarty-15721")
+        del page
+        asyncio.run(parsing)
+    finally:
+        tracemalloc.stop()
+    assert len(seen) == len(GRID["items"])
+    # Пока разбираются товары, страница уже освобождена
+    assert max(seen) < with_page - 3_000_000
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Рыночная статистика и IQR фильтр на малых и вырожденных выборках
+"""
+import numpy as np
+import pytest
+
+from domain.entities.product import Product
+from domain.services.market_stats import MIN_PRODUCTS_FOR_FILTER, compute_market_stats, outlier_mask
+
+
+def products(*prices: float):
+    return [Product(id=str(index), name=f"Товар {index}", price=price) for index, price in enumerate(prices)]
+
+
+def test_empty_result_has_no_stats():
+    assert compute_market_stats([], filter_outliers=True) == ([], None)
+
+
+def test_single_product():
+    kept, stats = compute_market_stats(products(54990), filter_outliers=True)
+    assert len(kept) == 1
+    assert (stats.min, stats.max, stats.median, stats.iqr) == (54990, 54990, 54990.0, (54990, 54990))
+    assert stats.total_count == 1
+    assert stats.product_id == "0"
+
+
+def test_small_sample_is_not_filtered():
+    prices = (500,) + (50000,) * (MIN_PRODUCTS_FOR_FILTER - 2)
+    kept, stats = compute_market_stats(products(*prices), filter_outliers=True)
+    assert len(kept) == len(prices)
+    assert stats.min == 500
+
+
+def test_identical_prices_are_all_kept():
+    kept, stats = compute_market_stats(products(*[49990] * 6), filter_outliers=True)
+    assert len(kept) == 6
+    assert stats.iqr == (49990, 49990)
+    assert stats.mean == pytest.approx(49990)
+
+
+def test_zero_spread_drops_everything_off_the_quartiles():
+    # IQR = 0: любая отличающаяся цена - выброс
+    kept, stats = compute_market_stats(products(100, 100, 100, 100, 1000), filter_outliers=True)
+    assert [product.price for product in kept] == [100] * 4
+    assert stats.max == 100
+
+
+def test_accessories_and_typos_are_filtered():
+    prices = (1490, 52990, 54990, 55990, 56990, 57990, 599990)
+    kept, stats = compute_market_stats(products(*prices), filter_outliers=True)
+    assert [product.price for product in kept] == [52990, 54990, 55990, 56990, 57990]
+    assert stats.min == 52990 and stats.product_id == "1"
+    assert stats.total_count == 5
+
+
+def test_without_filter_everything_counts():
+    prices = (1490, 52990, 54990, 55990, 599990)
+    kept, stats = compute_market_stats(products(*prices))
+    assert len(kept) == len(prices)
+    assert (stats.min, stats.max, stats.median) == (1490, 599990, 54990.0)
+    assert stats.product_id == "0"
+
+
+def test_outlier_mask_multiplier():
+    prices = np.array([10.0, 20.0, 30.0, 40.0, 100.0])
+    assert outlier_mask(prices, 1.5).tolist() == [True, True, True, True, False]
+    assert outlier_mask(prices, 3.0).all()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Классификатор страницы по снимку DOM
+"""
+from infrastructure.parsers.page_classifier import (
+    BLOCKED_PAGE,
+    EMPTY_PAGE,
+    ERROR_PAGE,
+    JSON_PAGE,
+    LOADING_PAGE,
+    PageSnapshot,
+    classify_snapshot,
+    same_document,
+)
+
+URL = "https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url=/category/videokarty-15721/"
+
+
+def snapshot(text: str = "", ready_state: str = "complete", content_type: str = "text/html",
+             has_pre: bool = False, title: str = "", url: str = URL) -> PageSnapshot:
+    return PageSnapshot(ready_state, content_type, url, title, has_pre, text, len(text))
+
+
+def test_complete_json_page():
+    assert classify_snapshot(snapshot('{"widgetStates": {}}', has_pre=True)) == JSON_PAGE
+    assert classify_snapshot(snapshot('{"widgetStates": {}}', content_type="application/json")) == JSON_PAGE
+
+
+def test_json_still_streaming_keeps_waiting():
+    # page_load_strategy="none": начало JSON уже видно, документ еще грузится
+    partial = snapshot('{"widgetStates": {"tileGridDesktop', ready_state="interactive", has_pre=True)
+    assert classify_snapshot(partial) == LOADING_PAGE
+
+
+def test_block_and_captcha_pages():
+    assert classify_snapshot(snapshot("Доступ ограничен")) == BLOCKED_PAGE
+    assert classify_snapshot(snapshot("", title="Antibot Challenge Page", ready_state="loading")) == BLOCKED_PAGE
+
+
+def test_error_pages():
+    assert classify_snapshot(snapshot("502 Bad Gateway")) == ERROR_PAGE
+    assert classify_snapshot(snapshot("", url="chrome-error://chromewebdata/")) == ERROR_PAGE
+    assert classify_snapshot(snapshot("<html>витрина</html>")) == ERROR_PAGE
+
+
+def test_empty_and_loading_pages():
+    assert classify_snapshot(snapshot("")) == EMPTY_PAGE
+    assert classify_snapshot(snapshot("", ready_state="loading")) == LOADING_PAGE
+
+
+def test_document_of_another_navigation_is_not_accepted():
+    # Переиспользуемая вкладка еще показывает JSON прошлого запроса
+    stale = snapshot('{"widgetStates": {}}', has_pre=True, url=URL.replace("videokarty", "processory"))
+    assert classify_snapshot(stale, expected_url=URL) == LOADING_PAGE
+    assert classify_snapshot(snapshot('{"widgetStates": {}}', has_pre=True), expected_url=URL) == JSON_PAGE
+    # Ошибка навигации меняет адрес на chrome-error - ждать нечего
+    failed = snapshot("", url="chrome-error://chromewebdata/")
+    assert classify_snapshot(failed, expected_url=URL) == ERROR_PAGE
+
+
+def test_same_document_ignores_percent_encoding():
+    expected = "https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url=/category/x/?text=rtx+5070&q=видеокарта"
+    actual = "https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url=/category/x/?text=rtx+5070&q=%D0%B2%D0%B8%D0%B4%D0%B5%D0%BE%D0%BA%D0%B0%D1%80%D1%82%D0%B0"
+    assert same_document(actual, expected)
+    assert not same_document(actual.replace("5070", "5080"), expected)
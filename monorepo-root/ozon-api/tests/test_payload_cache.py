@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Пропуск парсинга неизменившейся выдачи: хэш сырой строки tileGridDesktop
+сверяется до любого декодирования JSON
+"""
+import asyncio
+import json
+
+import pytest
+
+from infrastructure.parsers import ozon_parser as ozon_parser_module
+from infrastructure.parsers.browser_config import BrowserConfig
+from infrastructure.parsers.json_stream import iter_raw_widget_spans
+from infrastructure.parsers.ozon_parser import OzonParser
+
+
+def make_page(*skus: int) -> str:
+    items = [
+        {
+            "sku": sku,
+            "action": {"link": f"/product/{sku}/"},
+            "mainState": [
+                {"type": "textAtom", "id": "name", "textAtom": {"text": f"Товар \"{sku}\""}},
+                {"type": "priceV2", "priceV2": {"price": [{"textStyle": "PRICE", "text": f"{sku} ₽"}]}},
+            ],
+        }
+        for sku in skus
+    ]
+    grid = json.dumps({"items": items}, ensure_ascii=False)
+    return json.dumps({"widgetStates": {"tileGridDesktop-1-default-1": grid, "other-2": "{}"}}, ensure_ascii=False)
+
+
+@pytest.fixture(params=[False, True], ids=["tree", "stream"])
+def parser(request, monkeypatch):
+    monkeypatch.setattr(ozon_parser_module.parse_pool.config, "processes", 0)
+    return OzonParser(BrowserConfig(stream_parse=request.param))
+
+
+def parse(parser: OzonParser, page: str, query: str = "rtx"):
+    return asyncio.run(parser._parse_page_text(page, query, "videokarty-15721"))
+
+
+def test_raw_widget_is_not_decoded():
+    page = make_page(101)
+    [(widget_id, start, end)] = list(iter_raw_widget_spans(page, "tileGridDesktop"))
+    raw = page[start:end]
+    assert widget_id == "tileGridDesktop-1-default-1"
+    # Литерал строки как есть: в кавычках, экранированные кавычки не раскрыты
+    assert '\\"' in raw and raw.startswith('"') and raw.endswith('"')
+    assert json.loads(raw) == json.loads(page)["widgetStates"][widget_id]
+
+
+def test_unchanged_grid_skips_all_decoding(parser, monkeypatch):
+    page = make_page(101, 202)
+    first = parse(parser, page)
+    assert [product.id for product in first] == ["101", "202"]
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("JSON декодирован для неизменившейся выдачи")
+
+    monkeypatch.setattr(ozon_parser_module.json, "loads", no_decode)
+    monkeypatch.setattr(ozon_parser_module, "iter_widget_strings", no_decode)
+    again = parse(parser, page)
+    assert [product.id for product in again] == ["101", "202"]
+    assert parser.payload_cache_hits == 1
+
+
+def test_changed_grid_or_query_is_parsed(parser):
+    parse(parser, make_page(101))
+    assert [product.id for product in parse(parser, make_page(101, 303))] == ["101", "303"]
+    parse(parser, make_page(101), query="rx")
+    assert parser.payload_cache_hits == 0
+
+
+def test_offloaded_page_checks_cache_before_pool(parser, monkeypatch):
+    page = make_page(101)
+    parse(parser, page)
+    monkeypatch.setattr(ozon_parser_module.parse_pool, "should_offload", lambda size: True)
+
+    async def offload(*args):
+        raise AssertionError("неизменившаяся выдача отправлена в пул процессов")
+
+    monkeypatch.setattr(ozon_parser_module.parse_pool, "parse", offload)
+    assert [product.id for product in parse(parser, page)] == ["101"]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Взвешенный справедливый планировщик: порядок выдачи слотов классам приоритета
+"""
+import asyncio
+from typing import List
+
+from utils.priority_scheduler import BACKGROUND, INTERACTIVE, WeightedFairScheduler
+
+
+async def grant_order(scheduler: WeightedFairScheduler, queued: List[str]) -> List[str]:
+    """Занимает все слоты, ставит queued в очередь и освобождает слоты по одному"""
+    for _ in range(scheduler.capacity):
+        await scheduler.acquire(INTERACTIVE)
+
+    order: List[str] = []
+
+    async def waiter(priority: str) -> None:
+        await scheduler.acquire(priority)
+        order.append(priority)
+
+    tasks = [asyncio.ensure_future(waiter(priority)) for priority in queued]
+    await asyncio.sleep(0)
+    for _ in queued:
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_free_slot_is_granted_immediately():
+    async def scenario():
+        scheduler = WeightedFairScheduler(2)
+        await scheduler.acquire(BACKGROUND)
+        assert scheduler.active == 1
+        assert scheduler.try_acquire(INTERACTIVE)
+        assert not scheduler.try_acquire(INTERACTIVE)
+        assert scheduler.granted == {INTERACTIVE: 1, BACKGROUND: 1}
+
+    asyncio.run(scenario())
+
+
+def test_slots_follow_weights_under_contention():
+    queued = [BACKGROUND] * 5 + [INTERACTIVE] * 8
+    order = asyncio.run(grant_order(WeightedFairScheduler(1), queued))
+    # Smooth weighted round-robin 4:1 - фоновый класс получает слот в каждой пятерке
+    assert order[:10] == [INTERACTIVE, INTERACTIVE, BACKGROUND, INTERACTIVE, INTERACTIVE] * 2
+    assert order[10:] == [BACKGROUND] * 3
+
+
+def test_background_does_not_starve():
+    queued = [BACKGROUND] + [INTERACTIVE] * 20
+    order = asyncio.run(grant_order(WeightedFairScheduler(1), queued))
+    assert order.index(BACKGROUND) < 5
+
+
+def test_fifo_within_class():
+    async def scenario():
+        scheduler = WeightedFairScheduler(1)
+        await scheduler.acquire(INTERACTIVE)
+        order = []
+
+        async def waiter(name: str) -> None:
+            await scheduler.acquire(INTERACTIVE)
+            order.append(name)
+            scheduler.release()
+
+        tasks = [asyncio.ensure_future(waiter(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c"]
+
+    asyncio.run(scenario())
+
+
+def test_waiter_does_not_jump_the_queue():
+    async def scenario():
+        scheduler = WeightedFairScheduler(1)
+        await scheduler.acquire(INTERACTIVE)
+        queued = asyncio.ensure_future(scheduler.acquire(BACKGROUND))
+        await asyncio.sleep(0)
+        scheduler.release()
+        # Освободившийся слот уже передан ожидающему - новый запрос его не перехватит
+        assert not scheduler.try_acquire(INTERACTIVE)
+        await queued
+        assert scheduler.granted[BACKGROUND] == 1
+
+    asyncio.run(scenario())
+
+
+def test_capacity_change_dispatches_waiters():
+    async def scenario():
+        scheduler = WeightedFairScheduler(1)
+        await scheduler.acquire(INTERACTIVE)
+        waiters = [asyncio.ensure_future(scheduler.acquire(INTERACTIVE)) for _ in range(2)]
+        await asyncio.sleep(0)
+        scheduler.set_capacity(3)
+        await asyncio.gather(*waiters)
+        assert scheduler.active == 3
+        assert scheduler.waiting() == 0
+
+    asyncio.run(scenario())
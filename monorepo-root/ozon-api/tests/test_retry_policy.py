@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Политика повторов: лимиты классов, общий лимит попыток запроса и бюджет повторов в окне
+"""
+import json
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils.retry_policy import (
+    BLOCKED,
+    DEFAULT_POLICIES,
+    DRIVER,
+    JSON,
+    PAGE_LOAD,
+    UNKNOWN,
+    ParseAttemptError,
+    RetryBudgetConfig,
+    RetryPolicy,
+    classify_error,
+)
+
+
+def make_policy(**overrides) -> RetryPolicy:
+    overrides.setdefault("min_retries_per_window", 100)
+    return RetryPolicy(RetryBudgetConfig(**overrides))
+
+
+def test_classify_error():
+    assert classify_error(ParseAttemptError(BLOCKED, "403")) == BLOCKED
+    assert classify_error(RuntimeError("Too many concurrent connections")) == BLOCKED
+    assert classify_error(TimeoutException("page load")) == PAGE_LOAD
+    assert classify_error(RuntimeError("invalid session id")) == DRIVER
+    assert classify_error(json.JSONDecodeError("bad", "{", 0)) == JSON
+    assert classify_error(RuntimeError("???")) == UNKNOWN
+
+
+def test_delay_within_class_bounds(clock):
+    policy = make_policy()
+    bounds = DEFAULT_POLICIES[PAGE_LOAD]
+    delay = 0.0
+    for attempts in range(1, bounds.max_attempts):
+        delay = policy.next_delay(PAGE_LOAD, attempts, delay, total_attempts=attempts)
+        assert bounds.base_delay <= delay <= bounds.max_delay
+
+
+def test_class_limit(clock):
+    policy = make_policy()
+    limit = DEFAULT_POLICIES[BLOCKED].max_attempts
+    assert policy.next_delay(BLOCKED, limit - 1, 0.0, total_attempts=limit - 1) is not None
+    assert policy.next_delay(BLOCKED, limit, 0.0, total_attempts=limit) is None
+
+
+def test_alternating_classes_hit_the_request_cap(clock):
+    policy = make_policy(max_attempts_per_request=4)
+    # Каждый класс еще не исчерпал свой лимит, но всего попыток уже 4
+    assert policy.next_delay(DRIVER, 1, 0.0, total_attempts=3) is not None
+    assert policy.next_delay(JSON, 1, 0.0, total_attempts=4) is None
+    assert policy.next_delay(PAGE_LOAD, 1, 0.0, total_attempts=5) is None
+
+
+def test_budget_limits_retries_in_window(clock):
+    policy = make_policy(retry_ratio=0.1, min_retries_per_window=2, window_seconds=60)
+    for _ in range(10):
+        policy.on_request()
+    # 2 + 10% от 10 запросов = 3 повтора
+    assert [policy.next_delay(DRIVER, 1, 0.0) is not None for _ in range(4)] == [True, True, True, False]
+    assert policy.budget_exhausted == 1
+    assert policy.get_statistics()["retries_by_class"] == {DRIVER: 3}
+
+
+def test_budget_refills_after_window(clock):
+    policy = make_policy(retry_ratio=0.0, min_retries_per_window=1, window_seconds=60)
+    assert policy.next_delay(DRIVER, 1, 0.0) is not None
+    assert policy.next_delay(DRIVER, 1, 0.0) is None
+    clock.advance(61)
+    assert policy.next_delay(DRIVER, 1, 0.0) is not None
+
+
+def test_rejected_retry_does_not_consume_budget(clock):
+    policy = make_policy(retry_ratio=0.0, min_retries_per_window=1)
+    assert policy.next_delay(BLOCKED, DEFAULT_POLICIES[BLOCKED].max_attempts, 0.0) is None
+    assert policy.get_statistics()["retries_in_window"] == 0
+    assert policy.next_delay(DRIVER, 1, 0.0) is not None
+
+
+@pytest.mark.parametrize("previous", [0.0, 2.0, 100.0])
+def test_decorrelated_jitter_is_capped(clock, previous):
+    policy = make_policy()
+    bounds = DEFAULT_POLICIES[DRIVER]
+    delay = policy.next_delay(DRIVER, 1, previous)
+    assert bounds.base_delay <= delay <= min(bounds.max_delay, max(bounds.base_delay, previous * 3))
@@ -113,7 +113,8 @@ export class ParsingController {
           queries: [queryText],
           category: request.categoryKey, // Используем ключ категории для валидации
           platform_id: undefined, // Будет определено в ProductAggregatorService
-          exactmodels: undefined // Будет определено в ProductAggregatorService
+          exactmodels: undefined, // Будет определено в ProductAggregatorService
+          priority: 'background' // Обновление категории не должно мешать интерактивным запросам
         };
         
         const result = await this.productsService.getProducts(queryRequest);
@@ -68,4 +68,10 @@ export class ProductRequestDto {
   })
   platform_id?: string;
 
+  // Класс приоритета для Ozon API: интерактивные запросы обслуживаются раньше фоновых
+  @IsOptional()
+  @IsString()
+  @IsIn(['interactive', 'background'])
+  priority?: string;
+
 } 
\ No newline at end of file
@@ -147,6 +147,7 @@ export class ProductAggregatorService {
             category,
             exactmodels: extra.exactmodels,
             platform_id: extra.platform_id,
+            priority: request.priority,
             exclude_keywords: request.exclude_keywords || []
           });
           if (response.products && Array.isArray(response.products) && response.products.length > 0) {